@@ -1,6 +1,7 @@
 from django.contrib import admin
+from apps.common.admin import EstimatedCountAdmin
 from .models import Plan, Subscription, Payment
 
 admin.site.register(Plan)
-admin.site.register(Subscription)
-admin.site.register(Payment)
+admin.site.register(Subscription, EstimatedCountAdmin)
+admin.site.register(Payment, EstimatedCountAdmin)
@@ -6,6 +6,13 @@ class Plan(models.Model):
     description = models.TextField(blank=True)
     price = models.DecimalField(max_digits=8, decimal_places=2)
     is_active = models.BooleanField(default=True)
+    # Per-tenant request budget for tenants on this plan; null uses RATE_LIMIT_DEFAULT_PER_MINUTE, 0 is unlimited
+    rate_limit_per_minute = models.PositiveIntegerField(null=True, blank=True)
+    rate_limit_burst = models.PositiveIntegerField(null=True, blank=True)
+    # Database resource policy for tenants on this plan; null falls back to TENANT_DB_* settings
+    statement_timeout_ms = models.PositiveIntegerField(null=True, blank=True)
+    lock_timeout_ms = models.PositiveIntegerField(null=True, blank=True)
+    work_mem = models.CharField(max_length=16, blank=True, help_text='e.g. 4MB, 64MB')
 
     def __str__(self):
         return f"{self.name} (${self.price})"
@@ -3,6 +3,7 @@ from django.contrib import messages
 from .models import Plan, Subscription, Payment
 from datetime import timedelta, date
 from django.contrib.auth.decorators import login_required
+from apps.common.decorators import conditional_on_data
 
 #type: ignore
 
@@ -35,6 +36,7 @@ def mock_checkout(request, plan_id):
     return redirect('billing:subscribe', plan_id=plan.id)
 
 
+@conditional_on_data('plans')
 def plans_view(request):
     plans = Plan.objects.filter(is_active=True)  # type: ignore
     return render(request, 'billing/plans.html', {'plans': plans})
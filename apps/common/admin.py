@@ -1,5 +1,12 @@
 from django.contrib import admin
-from .models import SystemSetting
+from .counting import EstimatedCountPaginator
+from .models import RowCount, SystemSetting
+
+
+class EstimatedCountAdmin(admin.ModelAdmin):
+    """ModelAdmin for large tables: page counts come from planner estimates past a threshold."""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(SystemSetting)
@@ -7,4 +14,11 @@ class SystemSettingAdmin(admin.ModelAdmin):
     list_display = ("key", "value", "description")
     search_fields = ("key", "value", "description")
 
+
+@admin.register(RowCount)
+class RowCountAdmin(admin.ModelAdmin):
+    list_display = ("key", "rows")
+    search_fields = ("key",)
+    readonly_fields = ("key", "rows")
+
 # Register your models here.
@@ -0,0 +1,40 @@
+from django.urls import path
+from rest_framework.routers import SimpleRouter
+from .api_views import (
+    top_tenants_api,
+    rate_limit_stats_api,
+    analytics_series_api,
+    projects_api,
+    users_api,
+    user_profile_api,
+    tenant_info_api,
+    bulk_operation_api,
+    token_obtain_api,
+    token_refresh_api,
+    token_revoke_api,
+    SystemSettingViewSet,
+)
+from .async_views import status_async, health_check_async, cache_stats_async
+
+app_name = 'api'
+
+router = SimpleRouter()
+router.register('settings', SystemSettingViewSet, basename='system-setting')
+
+urlpatterns = [
+    path('usage/top-tenants/', top_tenants_api, name='top_tenants'),
+    path('ratelimit/stats/', rate_limit_stats_api, name='rate_limit_stats'),
+    path('analytics/series/', analytics_series_api, name='analytics_series'),
+    path('projects/', projects_api, name='projects'),
+    path('users/', users_api, name='users'),
+    path('profile/', user_profile_api, name='user_profile'),
+    path('tenant/', tenant_info_api, name='tenant_info'),
+    path('bulk/<str:target>/', bulk_operation_api, name='bulk_operation'),
+    path('token/', token_obtain_api, name='token_obtain'),
+    path('token/refresh/', token_refresh_api, name='token_refresh'),
+    path('token/revoke/', token_revoke_api, name='token_revoke'),
+    # Native async views (apps.common.async_views)
+    path('status/', status_async, name='status'),
+    path('health/', health_check_async, name='health'),
+    path('cache/stats/', cache_stats_async, name='cache_stats'),
+] + router.urls
@@ -3,18 +3,25 @@ API views for common app functionality.
 """
 
 from rest_framework import viewsets, status, permissions
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.decorators import action, api_view, authentication_classes, permission_classes, renderer_classes
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.response import Response
 from django.core.cache import cache
 from django.conf import settings
 from django.db import connection
+from django.db.models import Q
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from .models import SystemSetting
+from . import counting
+from .renderers import FAST_RENDERERS
+from .response_cache import cache_response
+from .counting import EstimatedCountPaginator
 from .serializers import (
     SystemSettingSerializer, UserProfileSerializer, TenantInfoSerializer,
-    CacheStatsSerializer, HealthCheckSerializer, MetricsSerializer
+    CacheStatsSerializer, HealthCheckSerializer, MetricsSerializer, BulkOperationSerializer
 )
+from datetime import datetime, timezone as dt_timezone
 import time
 import json
 
@@ -22,22 +29,57 @@ import json
 User = get_user_model()
 
 
+class SystemSettingCursorPagination(CursorPagination):
+    # `key` is unique, so it is a stable cursor; each page is an index range scan
+    ordering = 'key'
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
 class SystemSettingViewSet(viewsets.ModelViewSet):
-    """ViewSet for managing system settings via API."""
+    """ViewSet for managing system settings via API.
+
+    Lists are cursor paginated by key. `?key=` (key substring) and `?q=`
+    (key or description substring) are served by trigram GIN indexes;
+    `prefix/?q=` and `key/<key>/` by the btree indexes on key.
+    """
     
     queryset = SystemSetting.objects.all()
     serializer_class = SystemSettingSerializer
     permission_classes = [permissions.IsAuthenticated, permissions.IsAdminUser]
+    pagination_class = SystemSettingCursorPagination
     
     def get_queryset(self):
         """Filter queryset based on query parameters."""
         queryset = super().get_queryset()
         key_filter = self.request.query_params.get('key', None)
+        search = self.request.query_params.get('q', None)
         
         if key_filter:
             queryset = queryset.filter(key__icontains=key_filter)
+        if search and self.action == 'list':
+            queryset = queryset.filter(Q(key__icontains=search) | Q(description__icontains=search))
         
         return queryset.order_by('key')
+
+    @action(detail=False, methods=['get'])
+    def prefix(self, request):
+        """Settings whose key starts with ?q=, cursor paginated."""
+        prefix = request.query_params.get('q', '')
+        if not prefix:
+            return create_error_response('q is required')
+        queryset = SystemSetting.objects.filter(key__startswith=prefix).order_by('key')
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    @action(detail=False, methods=['get'], url_path=r'key/(?P<key>[^/]+)')
+    def by_key(self, request, key=None):
+        """Exact lookup by key through the unique index."""
+        setting = SystemSetting.objects.filter(key=key).first()
+        if setting is None:
+            return create_error_response(f'Setting {key} not found', status.HTTP_404_NOT_FOUND)
+        return Response(self.get_serializer(setting).data)
     
     @action(detail=False, methods=['post'])
     def bulk_update(self, request):
@@ -97,15 +139,32 @@ class SystemSettingViewSet(viewsets.ModelViewSet):
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def user_profile_api(request):
-    """Get current user's profile information."""
-    serializer = UserProfileSerializer(request.user)
+    """Get current user's profile information; supports ?fields= / ?exclude=."""
+    selected = UserProfileSerializer.selected_fields(request)
+    user = request.user
+    if not isinstance(user, User):
+        # Token-authenticated: load only the columns that will be rendered
+        columns = [f.attname for f in User._meta.concrete_fields if f.name in selected]
+        user = User.objects.only('pk', *columns).get(pk=user.pk)
+    serializer = UserProfileSerializer(user, context={'request': request})
     return Response(serializer.data)
 
 
+TENANT_INFO_COLUMNS = ('schema_name', 'name', 'is_active', 'on_trial', 'paid_until', 'created_on')
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@renderer_classes(FAST_RENDERERS)
+@cache_response('tenant_info', families=('tenants', 'users'))
 def tenant_info_api(request):
-    """Get current tenant information."""
+    """Get current tenant information; supports ?fields= / ?exclude=.
+
+    Plain tenant fields come from the tenant the middleware already loaded;
+    domain_count and user_count cost one query each, only when selected.
+    """
+    # Outside the try below, so unknown field names stay a 400
+    selected = TenantInfoSerializer.selected_fields(request)
     try:
         from apps.tenants.models import Client
         
@@ -119,28 +178,17 @@ def tenant_info_api(request):
                 'message': 'Currently in public schema'
             })
         
-        try:
-            tenant = Client.objects.get(schema_name=schema_name)
-            
-            # Get additional stats
-            domain_count = tenant.domains.count()
-            user_count = User.objects.count()  # Users in current tenant schema
-            
-            data = {
-                'schema_name': tenant.schema_name,
-                'name': tenant.name,
-                'is_active': tenant.is_active,
-                'on_trial': tenant.on_trial,
-                'paid_until': tenant.paid_until,
-                'created_on': tenant.created_on,
-                'domain_count': domain_count,
-                'user_count': user_count,
-            }
-            
-            serializer = TenantInfoSerializer(data)
-            return Response(serializer.data)
-            
-        except Client.DoesNotExist:
+        tenant = getattr(request, 'tenant', None)
+        if tenant is None or tenant.schema_name != schema_name:
+            tenant = Client.objects.filter(schema_name=schema_name).first()
+        if tenant is not None:
+            row = {name: getattr(tenant, name) for name in TENANT_INFO_COLUMNS if name in selected}
+            if 'domain_count' in selected:
+                row['domain_count'] = tenant.domains.count()
+            if 'user_count' in selected:
+                row['user_count'] = counting.count(User)
+            return Response(TenantInfoSerializer.fast(row, fields=selected))
+        else:
             return Response(
                 {'error': f'Tenant with schema {schema_name} not found'},
                 status=status.HTTP_404_NOT_FOUND
@@ -183,31 +231,7 @@ def cache_stats_api(request):
         
         # Add Redis-specific stats if available
         if 'redis' in backend_type.lower():
-            try:
-                import redis
-                from django_redis import get_redis_connection
-                
-                redis_conn = get_redis_connection("default")
-                info = redis_conn.info()
-                
-                data['redis_info'] = {
-                    'used_memory_human': info.get('used_memory_human', 'N/A'),
-                    'connected_clients': info.get('connected_clients', 0),
-                    'total_commands_processed': info.get('total_commands_processed', 0),
-                    'keyspace_hits': info.get('keyspace_hits', 0),
-                    'keyspace_misses': info.get('keyspace_misses', 0),
-                }
-                
-                # Calculate hit rate
-                hits = info.get('keyspace_hits', 0)
-                misses = info.get('keyspace_misses', 0)
-                total = hits + misses
-                
-                data['hit_rate'] = round((hits / total * 100), 2) if total > 0 else 0
-                data['miss_rate'] = round((misses / total * 100), 2) if total > 0 else 0
-                
-            except Exception as redis_error:
-                data['redis_error'] = str(redis_error)
+            data.update(redis_stats())
         
         serializer = CacheStatsSerializer(data)
         return Response(serializer.data)
@@ -219,88 +243,55 @@ def cache_stats_api(request):
         )
 
 
+def redis_stats():
+    """Redis server stats and hit rates for cache_stats_api; blocks on the Redis connection."""
+    try:
+        import redis
+        from django_redis import get_redis_connection
+        
+        redis_conn = get_redis_connection("default")
+        info = redis_conn.info()
+        
+        data = {
+            'redis_info': {
+                'used_memory_human': info.get('used_memory_human', 'N/A'),
+                'connected_clients': info.get('connected_clients', 0),
+                'total_commands_processed': info.get('total_commands_processed', 0),
+                'keyspace_hits': info.get('keyspace_hits', 0),
+                'keyspace_misses': info.get('keyspace_misses', 0),
+            }
+        }
+        
+        # Calculate hit rate
+        hits = info.get('keyspace_hits', 0)
+        misses = info.get('keyspace_misses', 0)
+        total = hits + misses
+        
+        data['hit_rate'] = round((hits / total * 100), 2) if total > 0 else 0
+        data['miss_rate'] = round((misses / total * 100), 2) if total > 0 else 0
+        return data
+        
+    except Exception as redis_error:
+        return {'redis_error': str(redis_error)}
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def health_check_api(request):
-    """Comprehensive health check endpoint."""
+    """Comprehensive health check endpoint.
+
+    Checks run concurrently with a per-check timeout and are memoized for
+    HEALTH_CHECK_CACHE_SECONDS (see apps.common.health).
+    """
+    from .health import CHECKS, run_checks
+
     component = request.query_params.get('component', 'all')
-    
-    results = {}
-    overall_health = True
-    
-    # Database health check
-    if component in ['database', 'all']:
-        try:
-            start_time = time.time()
-            with connection.cursor() as cursor:
-                cursor.execute("SELECT 1")
-            response_time = (time.time() - start_time) * 1000
-            
-            results['database'] = {
-                'healthy': True,
-                'response_time_ms': round(response_time, 2),
-                'details': {'connection': 'OK'},
-                'issues': []
-            }
-        except Exception as e:
-            results['database'] = {
-                'healthy': False,
-                'response_time_ms': 0,
-                'details': {'error': str(e)},
-                'issues': [f'Database error: {str(e)}']
-            }
-            overall_health = False
-    
-    # Cache health check
-    if component in ['cache', 'all']:
-        try:
-            start_time = time.time()
-            test_key = 'health_check_cache_test'
-            cache.set(test_key, 'test', 60)
-            cache.get(test_key)
-            cache.delete(test_key)
-            response_time = (time.time() - start_time) * 1000
-            
-            results['cache'] = {
-                'healthy': True,
-                'response_time_ms': round(response_time, 2),
-                'details': {'operations': 'OK'},
-                'issues': []
-            }
-        except Exception as e:
-            results['cache'] = {
-                'healthy': False,
-                'response_time_ms': 0,
-                'details': {'error': str(e)},
-                'issues': [f'Cache error: {str(e)}']
-            }
-            overall_health = False
-    
-    # Application health check
-    if component in ['application', 'all']:
-        try:
-            user_count = User.objects.count()
-            
-            results['application'] = {
-                'healthy': True,
-                'response_time_ms': 0,
-                'details': {
-                    'user_count': user_count,
-                    'schema': connection.schema_name,
-                    'debug_mode': settings.DEBUG
-                },
-                'issues': []
-            }
-        except Exception as e:
-            results['application'] = {
-                'healthy': False,
-                'response_time_ms': 0,
-                'details': {'error': str(e)},
-                'issues': [f'Application error: {str(e)}']
-            }
-            overall_health = False
-    
-    # Overall response
+    try:
+        results = run_checks(CHECKS if component == 'all' else [component])
+    except ValueError as e:
+        return create_error_response(str(e))
+
+    overall_health = all(result['healthy'] for result in results.values())
     response_data = {
         'overall_health': overall_health,
         'timestamp': timezone.now(),
@@ -314,56 +305,39 @@ def health_check_api(request):
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def metrics_api(request):
-    """Get application metrics and KPIs."""
+    """Get application metrics and KPIs.
+
+    Reads the business gauges of the shared /metrics snapshot, so calls are
+    not live aggregate queries; values are at most METRICS_INTERVAL old.
+    """
+    from .metrics import get_snapshot
+
     try:
-        from apps.billing.models import Subscription, Payment
-        from apps.tenants.models import Client
-        from django.db.models import Count, Sum
-        from datetime import date, timedelta
-        
-        # Calculate metrics
-        today = date.today()
-        last_30_days = today - timedelta(days=30)
-        
+        snapshot = get_snapshot()
+        generated_at = datetime.fromtimestamp(snapshot['built_at'], tz=dt_timezone.utc)
+        gauges = snapshot['business']
+        units_and_tags = {
+            'total_users': ('count', {'category': 'users'}),
+            'active_subscriptions': ('count', {'category': 'billing'}),
+            'total_tenants': ('count', {'category': 'tenants'}),
+            'monthly_revenue': ('currency', {'category': 'billing', 'period': '30_days'}),
+        }
         metrics = [
             {
-                'metric_name': 'total_users',
-                'metric_value': User.objects.count(),
-                'metric_unit': 'count',
-                'timestamp': timezone.now(),
-                'tags': {'category': 'users'}
-            },
-            {
-                'metric_name': 'active_subscriptions',
-                'metric_value': Subscription.objects.filter(active=True).count(),
-                'metric_unit': 'count',
-                'timestamp': timezone.now(),
-                'tags': {'category': 'billing'}
-            },
-            {
-                'metric_name': 'total_tenants',
-                'metric_value': Client.objects.count(),
-                'metric_unit': 'count',
-                'timestamp': timezone.now(),
-                'tags': {'category': 'tenants'}
-            },
-            {
-                'metric_name': 'monthly_revenue',
-                'metric_value': float(
-                    Payment.objects.filter(
-                        date__gte=last_30_days
-                    ).aggregate(total=Sum('amount'))['total'] or 0
-                ),
-                'metric_unit': 'currency',
-                'timestamp': timezone.now(),
-                'tags': {'category': 'billing', 'period': '30_days'}
+                'metric_name': name,
+                'metric_value': gauges[name],
+                'metric_unit': unit,
+                'timestamp': generated_at,
+                'tags': tags,
             }
+            for name, (unit, tags) in units_and_tags.items()
+            # Missing when the snapshot's business source failed (see saas_metrics_source_errors)
+            if name in gauges
         ]
         
-        serializer = MetricsSerializer(metrics, many=True)
         return Response({
-            'metrics': serializer.data,
-            'generated_at': timezone.now()
+            'metrics': MetricsSerializer.fast(metrics, many=True),
+            'generated_at': generated_at
         })
         
     except Exception as e:
@@ -401,6 +375,239 @@ def status_api(request):
     })
 
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated, permissions.IsAdminUser])
+def top_tenants_api(request):
+    """Rank tenants by resource usage over a recent window (noisy neighbours)."""
+    from apps.tenants.usage import top_tenants, flush
+
+    try:
+        minutes = int(request.query_params.get('minutes', 60))
+        limit = min(int(request.query_params.get('limit', 10)), 100)
+        metric = request.query_params.get('metric', 'db_ms')
+        # Include this worker's unflushed usage in the report
+        flush()
+        rows = top_tenants(minutes=minutes, metric=metric, limit=limit)
+    except ValueError as e:
+        return create_error_response(str(e))
+
+    return Response({
+        'metric': metric,
+        'minutes': minutes,
+        'tenants': rows,
+        'generated_at': timezone.now(),
+    })
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated, permissions.IsAdminUser])
+def rate_limit_stats_api(request):
+    """Allowed/limited request counters for this worker process."""
+    from .ratelimit import get_counters
+
+    return Response({
+        'counters': get_counters(),
+        'generated_at': timezone.now(),
+    })
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def analytics_series_api(request):
+    """Columnar time series for one metric: ?metric=&from=&to=&granularity=day|week|month.
+
+    Responds 304 when If-None-Match matches the cached series' ETag.
+    """
+    from django.utils.cache import get_conditional_response
+    from apps.dashboard.analytics import get_series, parse_series_params
+
+    try:
+        metric, start, end, granularity = parse_series_params(request.query_params)
+    except ValueError as e:
+        return create_error_response(str(e))
+
+    payload, etag = get_series(metric, start, end, granularity)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = Response(payload)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+@cache_response('projects', families=('projects',), per_user=True)
+def projects_api(request):
+    """Keyset-paginated project listing: ?q=&owner=&limit=&cursor=.
+
+    `q` is a full-text (websearch) query over name and description; follow
+    `next` until it is null.
+    """
+    from apps.dashboard.projects import list_projects
+
+    params = request.query_params
+    try:
+        owner = int(params['owner']) if params.get('owner') else None
+        rows, next_cursor = list_projects(
+            request.user,
+            q=params.get('q', '').strip() or None,
+            owner=owner,
+            cursor=params.get('cursor'),
+            limit=params.get('limit'),
+        )
+    except ValueError as e:
+        return create_error_response(str(e))
+
+    return Response({'results': rows, 'next': next_cursor})
+
+
+class UserPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    # Past ADMIN_ESTIMATED_COUNT_THRESHOLD users, `count` is the planner estimate
+    django_paginator_class = EstimatedCountPaginator
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated, permissions.IsAdminUser])
+@cache_response('users', families=('users', 'subscriptions', 'plans', 'tenants'))
+def users_api(request):
+    """Paginated user list with subscription status: ?page=&page_size=&fields=&exclude=.
+
+    A page is a fixed number of queries (count, users, subscriptions with
+    plans, tenant count) regardless of page size; the subscription prefetch
+    and tenant count are skipped when their fields are not selected.
+    """
+    selected = UserProfileSerializer.selected_fields(request)
+    paginator = UserPagination()
+    columns = [f.attname for f in User._meta.concrete_fields if f.name in selected]
+    queryset = User.objects.only('pk', *columns).order_by('pk')
+    if 'subscription_status' in selected:
+        queryset = UserProfileSerializer.with_subscriptions(queryset)
+    page = paginator.paginate_queryset(queryset, request)
+    context = {'request': request}
+    if 'tenant_count' in selected:
+        context['tenant_count'] = UserProfileSerializer.count_tenants()
+    serializer = UserProfileSerializer(page, many=True, context=context)
+    return paginator.get_paginated_response(serializer.data)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated, permissions.IsAdminUser])
+def bulk_operation_api(request, target):
+    """Run a BulkOperationSerializer operation on users, plans, subscriptions or projects.
+
+    The whole request is one transaction of set-based statements; the
+    response lists the outcome of every ID (or created object). Callers need
+    the target model's add/change/delete permission, as in the admin; only
+    superusers may touch superusers or change is_staff.
+    """
+    from django.core.exceptions import ValidationError
+    from django.db import IntegrityError
+    from . import bulk
+
+    if target not in bulk.TARGETS:
+        return create_error_response(f'Unknown bulk target "{target}"', status.HTTP_404_NOT_FOUND)
+    serializer = BulkOperationSerializer(data=request.data)
+    if not serializer.is_valid():
+        return create_error_response('Invalid bulk operation', details=serializer.errors)
+
+    params = serializer.validated_data
+    user = request.user
+    if not isinstance(user, User):
+        # Token users carry no permissions; check the account's
+        user = User.objects.get(pk=user.pk)
+    if not user.has_perm(bulk.required_permission(target, params['operation'])):
+        return create_error_response('You do not have permission to perform this action.', status.HTTP_403_FORBIDDEN)
+
+    # Admins cannot lock themselves out through a bulk request
+    protected = {user.pk} if target == 'users' else set()
+    if target == 'users' and not user.is_superuser:
+        if 'is_staff' in (params.get('data') or {}):
+            return create_error_response('Only superusers can change staff status.', status.HTTP_403_FORBIDDEN)
+        protected |= set(
+            User.objects.filter(pk__in=params.get('object_ids', ()), is_superuser=True).values_list('pk', flat=True)
+        )
+    try:
+        results = bulk.run(
+            target, params['operation'], ids=params.get('object_ids', ()), data=params.get('data'),
+            objects=params.get('objects', ()), protected=protected,
+        )
+    except ValidationError as e:
+        details = e.message_dict if hasattr(e, 'error_dict') else e.messages
+        return create_error_response('Invalid bulk operation', details=details)
+    except IntegrityError as e:
+        return create_error_response('Bulk operation rejected by a database constraint', status.HTTP_409_CONFLICT, str(e))
+
+    if target == 'users' and params['operation'] in ('deactivate', 'delete'):
+        from .authentication import revoke_user
+        revoke_user(*(r['id'] for r in results if r['status'] in ('deactivated', 'deleted')))
+
+    summary = {}
+    for result in results:
+        summary[result['status']] = summary.get(result['status'], 0) + 1
+    return Response({'operation': params['operation'], 'target': target, 'summary': summary, 'results': results})
+
+
+@api_view(['POST'])
+@authentication_classes([])
+@permission_classes([permissions.AllowAny])
+def token_obtain_api(request):
+    """Exchange email and password for a refresh/access token pair bound to this tenant."""
+    from django.contrib.auth import authenticate
+    from .authentication import TenantRefreshToken
+
+    user = authenticate(request, username=request.data.get('email'), password=request.data.get('password'))
+    if user is None or not user.is_active:
+        return create_error_response('Invalid credentials', status.HTTP_401_UNAUTHORIZED)
+    refresh = TenantRefreshToken.for_tenant_user(user)
+    return Response({'refresh': str(refresh), 'access': str(refresh.access_token)})
+
+
+@api_view(['POST'])
+@authentication_classes([])
+@permission_classes([permissions.AllowAny])
+def token_refresh_api(request):
+    """Mint a new access token from a refresh token, with entitlements re-read from the database."""
+    from rest_framework_simplejwt.exceptions import TokenError
+    from rest_framework_simplejwt.settings import api_settings as jwt_settings
+    from .authentication import TenantRefreshToken, entitlement_claims, is_refresh_revoked
+
+    try:
+        refresh = TenantRefreshToken(request.data.get('refresh', ''))
+    except TokenError as e:
+        return create_error_response(str(e), status.HTTP_401_UNAUTHORIZED)
+    if refresh.get('schema') != connection.schema_name:
+        return create_error_response('Token is not valid for this tenant or was revoked', status.HTTP_401_UNAUTHORIZED)
+    user = User.objects.filter(pk=refresh[jwt_settings.USER_ID_CLAIM], is_active=True).first()
+    if user is None:
+        return create_error_response('User is inactive or no longer exists', status.HTTP_401_UNAUTHORIZED)
+    if is_refresh_revoked(refresh, user):
+        return create_error_response('Token is not valid for this tenant or was revoked', status.HTTP_401_UNAUTHORIZED)
+
+    access = refresh.access_token
+    for claim, value in entitlement_claims(user).items():
+        access[claim] = value
+    return Response({'access': str(access)})
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def token_revoke_api(request):
+    """Revoke the caller's token family, or every token of the caller with {"all": true}."""
+    from .authentication import revoke, revoke_user
+
+    if request.data.get('all'):
+        revoke_user(request.user.pk)
+    elif request.auth is not None and 'sid' in request.auth:
+        revoke(request.auth)
+    else:
+        return create_error_response('Only token-authenticated requests can revoke their token')
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 # Utility function for API responses
 def create_error_response(message, status_code=status.HTTP_400_BAD_REQUEST, details=None):
     """Create a standardized error response."""
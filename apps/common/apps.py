@@ -1,6 +1,24 @@
 from django.apps import AppConfig
+from django.db.models.signals import pre_migrate
+
+
+def create_extensions(using='default', **kwargs):
+    """Install the PostgreSQL extensions our indexes need before tables are created."""
+    from django.db import connections
+    from django_tenants.utils import get_public_schema_name
+
+    with connections[using].cursor() as cursor:
+        # pg_trgm: trigram GIN indexes behind SystemSetting substring search
+        cursor.execute(f'CREATE EXTENSION IF NOT EXISTS pg_trgm SCHEMA {get_public_schema_name()}')
 
 
 class CommonConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.common'
+
+    def ready(self):
+        from . import authentication, counting, versioning
+        versioning.connect_signals()
+        counting.connect_signals()
+        authentication.connect_signals()
+        pre_migrate.connect(create_extensions, sender=self, dispatch_uid='common_create_extensions')
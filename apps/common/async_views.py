@@ -0,0 +1,111 @@
+"""
+Native async views for I/O-bound API endpoints.
+
+Async counterparts of status_api, health_check_api and cache_stats_api. DRF
+views are sync, so under ASGI each one takes a thread from the request's
+sync executor for its whole run; these are plain Django `async def` views
+that await the async ORM and cache APIs instead, so a worker's event loop
+keeps serving other requests while they wait on PostgreSQL or Redis. Under
+WSGI they still work, run through async_to_sync.
+
+Responses match the sync endpoints: the same payloads and error format,
+rendered with ORJSONRenderer. Callers authenticate with a Bearer token or
+a session (see authentication.aauthenticate).
+"""
+
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils import timezone
+from django.views.decorators.http import require_GET
+
+from .api_views import redis_stats
+from .authentication import aauthenticate
+from .health import CHECKS, arun_checks
+from .renderers import ORJSONRenderer
+from .serializers import CacheStatsSerializer
+
+
+def json_response(data, status=200):
+    return HttpResponse(ORJSONRenderer().render(data), status=status, content_type='application/json')
+
+
+def error_response(message, status=400):
+    """Same shape as api_views.create_error_response()."""
+    return json_response({'error': message, 'timestamp': timezone.now()}, status=status)
+
+
+@require_GET
+async def status_async(request):
+    """Simple status endpoint for load balancers."""
+    return json_response({
+        'status': 'OK',
+        'timestamp': timezone.now().isoformat(),
+        'version': '1.0.0'
+    })
+
+
+@require_GET
+async def health_check_async(request):
+    """Comprehensive health check endpoint; see health.arun_checks()."""
+    if await aauthenticate(request) is None:
+        return error_response('Authentication credentials were not provided.', 401)
+
+    component = request.GET.get('component', 'all')
+    try:
+        results = await arun_checks(CHECKS if component == 'all' else [component])
+    except ValueError as e:
+        return error_response(str(e))
+
+    overall_health = all(result['healthy'] for result in results.values())
+    return json_response({
+        'overall_health': overall_health,
+        'timestamp': timezone.now(),
+        'checks': results
+    }, status=200 if overall_health else 503)
+
+
+@require_GET
+async def cache_stats_async(request):
+    """Get cache statistics and health information."""
+    user = await aauthenticate(request)
+    if user is None:
+        return error_response('Authentication credentials were not provided.', 401)
+    if not user.is_staff:
+        return error_response('You do not have permission to perform this action.', 403)
+
+    try:
+        cache_config = settings.CACHES['default']
+        backend_type = cache_config['BACKEND'].split('.')[-1]
+
+        # Test cache operations
+        start_time = time.time()
+        test_key = 'api_cache_test'
+        await cache.aset(test_key, 'test_value', 60)
+        await cache.aget(test_key)
+        await cache.adelete(test_key)
+        response_time = (time.time() - start_time) * 1000
+
+        data = {
+            'backend_type': backend_type,
+            'response_time_ms': round(response_time, 2),
+            'configuration': {
+                'backend': cache_config['BACKEND'],
+                'location': cache_config.get('LOCATION', 'N/A'),
+                'timeout': cache_config.get('TIMEOUT', 300),
+            },
+            'health': 'OK' if response_time < 100 else 'SLOW',
+            'timestamp': timezone.now()
+        }
+
+        if 'redis' in backend_type.lower():
+            # INFO needs no DB connection, so keep it off the request's sync thread
+            data.update(await sync_to_async(redis_stats, thread_sensitive=False)())
+
+        return json_response(CacheStatsSerializer(data).data)
+
+    except Exception as e:
+        return json_response({'error': str(e)}, status=500)
@@ -0,0 +1,231 @@
+"""
+Tenant-bound JWT authentication for the API.
+
+Tokens are issued per tenant by /api/token/ and carry everything the API
+needs about the caller: user id, staff flags, the schema they were issued
+for and the plan entitlements at issue time. Authenticating a request is a
+signature check plus one cache get_many against the denylist, with no
+session, user or subscription query. Access tokens are short-lived, so
+entitlement changes show up on the next refresh, which re-reads the user.
+
+Revocations are durable: a revoked refresh token family (`sid`, shared by
+every access token minted from it) is a RevokedTokenFamily row, and a
+user's "revoked before" time is User.tokens_revoked_at, compared at
+millisecond precision against the `iat_ms` claim. Refresh checks both and
+re-reads is_active, so a revoked or deactivated user gets no new access
+token. Saving a user with a new password revokes their earlier tokens.
+
+Access tokens are checked against the cache only, to keep requests free of
+queries: with a shared cache (CACHE_IS_SHARED) revocations also land in a
+denylist there and take effect at once; without one, a revoked access token
+stays usable until it expires (ACCESS_TOKEN_LIFETIME).
+"""
+
+from datetime import date, timedelta
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.models.signals import post_save, pre_save
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import RevokedTokenFamily
+
+
+def _family_key(sid):
+    return f'jwt:deny:{sid}'
+
+
+def _user_key(user_id):
+    return f'jwt:deny_user:{user_id}'
+
+
+def entitlement_claims(user):
+    """Claims describing what `user` may do; copied into every access token."""
+    from apps.billing.models import Subscription
+
+    subscription = (
+        Subscription.objects.filter(user=user, active=True, end_date__gte=date.today())
+        .select_related('plan').order_by('-end_date').first()
+    )
+    plan = subscription.plan if subscription else None
+    return {
+        'email': user.email,
+        'is_staff': user.is_staff,
+        'is_superuser': user.is_superuser,
+        'plan_id': plan.pk if plan else None,
+        'plan': plan.name if plan else None,
+        'subscription_until': subscription.end_date.isoformat() if subscription and subscription.end_date else None,
+    }
+
+
+class TenantRefreshToken(RefreshToken):
+    @classmethod
+    def for_tenant_user(cls, user, schema_name=None):
+        token = cls.for_user(user)
+        # `iat` has whole seconds; revocations compare against this (copied into access tokens)
+        token['iat_ms'] = _epoch_ms(token.current_time)
+        token['schema'] = schema_name or connection.schema_name
+        # Every access token minted from this refresh token shares its family id
+        token['sid'] = token[api_settings.JTI_CLAIM]
+        for claim, value in entitlement_claims(user).items():
+            token[claim] = value
+        return token
+
+
+def _epoch_ms(moment):
+    return int(moment.timestamp() * 1000)
+
+
+def _issued_ms(token):
+    # Tokens minted before `iat_ms` existed only have whole seconds
+    return token.get('iat_ms', token.get('iat', 0) * 1000)
+
+
+def _cache_keys(token):
+    return [_family_key(token.get('sid')), _user_key(token.get(api_settings.USER_ID_CLAIM))]
+
+
+def _cache_denies(token, found):
+    family_key, user_key = _cache_keys(token)
+    return family_key in found or (user_key in found and found[user_key] >= _issued_ms(token))
+
+
+def is_revoked(token):
+    """True if the shared cache denylist has the token's family or a later revocation of its user."""
+    if not getattr(settings, 'CACHE_IS_SHARED', False):
+        return False
+    return _cache_denies(token, cache.get_many(_cache_keys(token)))
+
+
+async def ais_revoked(token):
+    """is_revoked() for native async views."""
+    if not getattr(settings, 'CACHE_IS_SHARED', False):
+        return False
+    return _cache_denies(token, await cache.aget_many(_cache_keys(token)))
+
+
+def is_refresh_revoked(token, user):
+    """Durable check for refresh: the token's family row and `user`'s revocation time."""
+    revoked_at = user.tokens_revoked_at
+    if revoked_at is not None and _epoch_ms(revoked_at) >= _issued_ms(token):
+        return True
+    return RevokedTokenFamily.objects.filter(sid=token.get('sid')).exists()
+
+
+def revoke(token):
+    """Deny the refresh token family of `token` until its refresh token would expire."""
+    if token.get(api_settings.TOKEN_TYPE_CLAIM) == 'refresh':
+        ttl = token['exp'] - int(time.time())
+    else:
+        # The family's refresh token expiry is unknown here; its full lifetime bounds it
+        ttl = int(api_settings.REFRESH_TOKEN_LIFETIME.total_seconds())
+    ttl = max(1, ttl)
+    now = timezone.now()
+    RevokedTokenFamily.objects.filter(expires_at__lt=now).delete()
+    RevokedTokenFamily.objects.update_or_create(
+        sid=token['sid'], defaults={'expires_at': now + timedelta(seconds=ttl)}
+    )
+    if getattr(settings, 'CACHE_IS_SHARED', False):
+        cache.set(_family_key(token['sid']), 1, ttl)
+
+
+def _deny_users_in_cache(user_ids, revoked_at):
+    if getattr(settings, 'CACHE_IS_SHARED', False):
+        ttl = int(api_settings.REFRESH_TOKEN_LIFETIME.total_seconds())
+        cache.set_many({_user_key(user_id): _epoch_ms(revoked_at) for user_id in user_ids}, ttl)
+
+
+def revoke_user(*user_ids):
+    """Deny every token issued to `user_ids` until now (revoke-all, bulk deactivation or deletion)."""
+    now = timezone.now()
+    get_user_model().objects.filter(pk__in=user_ids).update(tokens_revoked_at=now)
+    _deny_users_in_cache(user_ids, now)
+
+
+def _on_user_pre_save(sender, instance, **kwargs):
+    # set_password() keeps the raw password on the instance until save() finishes
+    if not instance._state.adding and instance._password is not None:
+        instance.tokens_revoked_at = timezone.now()
+
+
+def _on_user_save(sender, instance, created, **kwargs):
+    if created:
+        return
+    if instance._password is not None:
+        _deny_users_in_cache([instance.pk], instance.tokens_revoked_at)
+    elif not instance.is_active:
+        # Refresh already refuses inactive users; this only cuts off live access tokens
+        _deny_users_in_cache([instance.pk], timezone.now())
+
+
+def connect_signals():
+    pre_save.connect(_on_user_pre_save, sender=settings.AUTH_USER_MODEL, dispatch_uid='jwt_revoke_user_pre_save')
+    post_save.connect(_on_user_save, sender=settings.AUTH_USER_MODEL, dispatch_uid='jwt_revoke_user_save')
+
+
+def validated_token(request):
+    """The request's Bearer token, validated once per request; None if absent or invalid."""
+    request = getattr(request, '_request', request)
+    if not hasattr(request, '_tenant_jwt'):
+        token = None
+        try:
+            auth = TenantJWTAuthentication()
+            raw = auth.get_raw_token(auth.get_header(request) or b'')
+            if raw is not None:
+                token = auth.get_validated_token(raw)
+        except (AuthenticationFailed, TokenError):
+            pass
+        request._tenant_jwt = token
+    return request._tenant_jwt
+
+
+class TenantJWTAuthentication(JWTStatelessUserAuthentication):
+    """JWT authentication without a user query, bound to the request's tenant and denylist-aware."""
+
+    def authenticate(self, request):
+        # Reuse the token RateLimitMiddleware already validated for this request
+        token = getattr(request._request, '_tenant_jwt', None)
+        if token is not None:
+            user = self.get_user(token)
+        else:
+            result = super().authenticate(request)
+            if result is None:
+                return None
+            user, token = result
+        if token.get('schema') != connection.schema_name:
+            raise AuthenticationFailed(_('Token was not issued for this tenant.'), code='wrong_tenant')
+        if 'sid' not in token or is_revoked(token):
+            raise AuthenticationFailed(_('Token has been revoked.'), code='token_revoked')
+        request._request._tenant_jwt = token
+        return user, token
+
+
+async def aauthenticate(request):
+    """The caller of a native async view: its Bearer token's user, else the session user.
+
+    Applies TenantJWTAuthentication's tenant and denylist checks; returns None
+    for anonymous callers and rejected tokens. The tenant comes from
+    request.tenant, as `connection` belongs to the request's sync thread.
+    """
+    token = validated_token(request)
+    if token is not None:
+        tenant = getattr(request, 'tenant', None)
+        if tenant is None or token.get('schema') != tenant.schema_name:
+            return None
+        if 'sid' not in token or await ais_revoked(token):
+            return None
+        try:
+            return TenantJWTAuthentication().get_user(token)
+        except AuthenticationFailed:
+            return None
+    user = await request.auser()
+    return user if user.is_authenticated else None
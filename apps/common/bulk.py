@@ -0,0 +1,149 @@
+"""
+Set-based bulk operations behind /api/bulk/<target>/.
+
+Every operation runs in one transaction, chunk by chunk (BULK_OPERATION_CHUNK_SIZE
+IDs per statement): the existing rows of a chunk are locked and read with one
+SELECT ... FOR UPDATE, then changed with one UPDATE or DELETE; creates are a
+single bulk_create. Row counters and data versions are adjusted once per
+operation (counting.deferred / versioning.deferred), not once per row.
+"""
+
+from typing import NamedTuple
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+
+from . import counting, versioning
+
+
+class Target(NamedTuple):
+    model: str
+    fields: tuple  # writable by update/create
+    active_field: str = None  # flipped by activate/deactivate
+    can_create: bool = True
+    tenant_scoped: bool = False  # rows carry tenant_schema_name
+
+
+TARGETS = {
+    # Users need hashed passwords, so they are not created in bulk
+    'users': Target('users.User', ('full_name', 'is_active', 'is_staff'), 'is_active', can_create=False),
+    'plans': Target('billing.Plan', ('name', 'description', 'price', 'is_active',
+                                     'rate_limit_per_minute', 'rate_limit_burst'), 'is_active'),
+    'subscriptions': Target('billing.Subscription', ('user_id', 'plan_id', 'end_date', 'active'), 'active'),
+    'projects': Target('dashboard.Project', ('name', 'description', 'owner_id'), tenant_scoped=True),
+}
+
+OUTCOMES = {'update': 'updated', 'delete': 'deleted', 'activate': 'activated', 'deactivate': 'deactivated'}
+PERMISSION_ACTIONS = {'create': 'add', 'delete': 'delete'}  # everything else needs change
+
+
+def required_permission(target_name, operation):
+    """The model permission ('app_label.codename') an operation on `target_name` needs, as in the admin."""
+    opts = apps.get_model(TARGETS[target_name].model)._meta
+    return f'{opts.app_label}.{PERMISSION_ACTIONS.get(operation, "change")}_{opts.model_name}'
+
+
+def max_ids():
+    return getattr(settings, 'BULK_OPERATION_MAX_IDS', 1000)
+
+
+def _chunk_size():
+    return getattr(settings, 'BULK_OPERATION_CHUNK_SIZE', 500)
+
+
+def _chunks(items):
+    size = _chunk_size()
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _clean_values(model, fields, data):
+    """Validate `data` against the model fields; raises ValidationError."""
+    unknown = set(data) - set(fields)
+    if unknown:
+        raise ValidationError(f'Fields not writable in bulk: {", ".join(sorted(unknown))}')
+    cleaned, errors = {}, {}
+    for name, value in data.items():
+        field = model._meta.get_field(name)
+        try:
+            # Foreign keys are checked by the database constraint, not one query per value
+            cleaned[name] = field.to_python(value) if field.is_relation else field.clean(value, None)
+        except ValidationError as e:
+            errors[name] = e.messages
+    if errors:
+        raise ValidationError(errors)
+    return cleaned
+
+
+def _queryset(target, model):
+    queryset = model._base_manager.all()
+    if target.tenant_scoped:
+        queryset = queryset.filter(tenant_schema_name=connection.schema_name)
+    return queryset
+
+
+def _create(target, model, objects):
+    relations = [f.name for f in model._meta.concrete_fields if f.is_relation]
+    instances = []
+    for data in objects:
+        instance = model(**_clean_values(model, target.fields, data))
+        if target.tenant_scoped:
+            instance.tenant_schema_name = connection.schema_name
+        instance.full_clean(exclude=relations, validate_unique=False, validate_constraints=False)
+        instances.append(instance)
+    created = model.objects.bulk_create(instances, batch_size=_chunk_size())
+    counting.add(model, len(created))
+    versioning.bump(*versioning.families_of(model))
+    return [{'index': i, 'id': obj.pk, 'status': 'created'} for i, obj in enumerate(created)]
+
+
+def _apply(target, model, operation, ids, data, protected):
+    if operation in ('activate', 'deactivate'):
+        if not target.active_field:
+            raise ValidationError(f'{model._meta.verbose_name_plural} cannot be activated or deactivated')
+        values = {target.active_field: operation == 'activate'}
+    elif operation == 'update':
+        if not data:
+            raise ValidationError('update requires data')
+        values = _clean_values(model, target.fields, data)
+
+    results = {pk: 'not_found' for pk in ids}
+    for pk in protected & set(ids):
+        results[pk] = 'skipped'
+    todo = [pk for pk in ids if pk not in protected]
+    for chunk in _chunks(todo):
+        queryset = _queryset(target, model).filter(pk__in=chunk)
+        found = list(queryset.select_for_update().values_list('pk', flat=True))
+        if not found:
+            continue
+        queryset = _queryset(target, model).filter(pk__in=found)
+        if operation == 'delete':
+            # Per-row delete signals only accumulate into the deferred counters/versions
+            queryset.delete()
+        else:
+            queryset.update(**values)
+        for pk in found:
+            results[pk] = OUTCOMES[operation]
+    if operation != 'delete':
+        versioning.bump(*versioning.families_of(model))
+    return [{'id': pk, 'status': status} for pk, status in results.items()]
+
+
+def run(target_name, operation, ids=(), data=None, objects=(), protected=frozenset()):
+    """Run one bulk operation and return per-ID (or per-object, for create) outcomes.
+
+    IDs in `protected` are reported as 'skipped'. Raises KeyError for an
+    unknown target, ValidationError for invalid input and IntegrityError when
+    a constraint rejects the change; the transaction is then rolled back.
+    """
+    target = TARGETS[target_name]
+    model = apps.get_model(target.model)
+    with versioning.deferred():
+        with transaction.atomic(), counting.deferred():
+            if operation == 'create':
+                if not target.can_create:
+                    raise ValidationError(f'{model._meta.verbose_name_plural} cannot be created in bulk')
+                return _create(target, model, objects)
+            return _apply(target, model, operation, list(ids), data or {}, set(protected))
@@ -0,0 +1,58 @@
+"""
+Cache backends that report each operation to per-tenant usage accounting.
+"""
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+from apps.tenants.usage import count_cache_op
+
+
+class CountingCacheMixin:
+    """Counts get/set/add/delete/touch/incr calls.
+
+    The BaseCache *_many and decr fallbacks are built on these, so they are
+    counted once per key as well.
+    """
+
+    def get(self, *args, **kwargs):
+        count_cache_op()
+        return super().get(*args, **kwargs)
+
+    def set(self, *args, **kwargs):
+        count_cache_op()
+        return super().set(*args, **kwargs)
+
+    def add(self, *args, **kwargs):
+        count_cache_op()
+        return super().add(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        count_cache_op()
+        return super().delete(*args, **kwargs)
+
+    def touch(self, *args, **kwargs):
+        count_cache_op()
+        return super().touch(*args, **kwargs)
+
+    def incr(self, *args, **kwargs):
+        count_cache_op()
+        return super().incr(*args, **kwargs)
+
+
+class CountingLocMemCache(CountingCacheMixin, LocMemCache):
+    pass
+
+
+class CountingRedisCache(CountingCacheMixin, RedisCache):
+    # RedisCache batches the *_many calls into a single round trip
+    def get_many(self, *args, **kwargs):
+        count_cache_op()
+        return super().get_many(*args, **kwargs)
+
+    def set_many(self, *args, **kwargs):
+        count_cache_op()
+        return super().set_many(*args, **kwargs)
+
+    def delete_many(self, *args, **kwargs):
+        count_cache_op()
+        return super().delete_many(*args, **kwargs)
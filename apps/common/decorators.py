@@ -1,5 +1,8 @@
+from functools import wraps
 from django.http import HttpResponseForbidden
+from django.utils.cache import get_conditional_response, patch_cache_control
 from apps.billing.models import Subscription
+from apps.common import versioning
 from datetime import date
 
 def subscription_required(view_func):
@@ -9,3 +12,32 @@ def subscription_required(view_func):
             return HttpResponseForbidden("Subscription required.")
         return view_func(request, *args, **kwargs)
     return wrapper
+
+
+def conditional_on_data(*families, per_user=True, daily=False):
+    """
+    Answer GET/HEAD with 304 when none of `families` changed since the client's copy.
+
+    The ETag comes from the tenant's data version vector (one cache read), so a
+    matching If-None-Match returns before the view runs any query. Pass
+    daily=True for pages that also depend on today's date. Without a shared
+    cache the view always runs: another worker's writes would never change
+    the ETag.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            # Pending flash messages are consumed by the render, so never skip it
+            if (request.method not in ('GET', 'HEAD') or len(getattr(request, '_messages', ()))
+                    or not versioning.shared()):
+                return view_func(request, *args, **kwargs)
+            etag = versioning.etag_for(request, families, per_user=per_user, daily=daily)
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+                if response.status_code == 200 and not response.has_header('ETag'):
+                    response['ETag'] = etag
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,188 @@
+"""
+Health checks shared by health_check_api, /readyz and the health_check command.
+
+Checks run concurrently, each on its own thread (and DB connection), and a
+check that does not finish within its timeout is reported unhealthy instead
+of holding up the response. Results are memoized per process for
+HEALTH_CHECK_CACHE_SECONDS and concurrent callers wait for the run in
+flight, so a flood of probes costs one execution per window.
+
+arun_checks() is the same for native async views: the database and cache
+checks use the async ORM and cache APIs, other checks run on a worker
+thread, and all of them are awaited together on the event loop. It shares
+the memo with run_checks().
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, wait
+import threading
+import time
+import uuid
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from . import counting
+
+
+def check_database():
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    return {'connection': 'OK'}
+
+
+def check_cache():
+    key = f'health_check:{uuid.uuid4().hex}'
+    cache.set(key, 'ok', 10)
+    value = cache.get(key)
+    cache.delete(key)
+    if value != 'ok':
+        raise RuntimeError('Cache set/get round trip failed')
+    return {'operations': 'OK'}
+
+
+async def acheck_database():
+    from .models import SystemSetting
+
+    await SystemSetting.objects.aexists()
+    return {'connection': 'OK'}
+
+
+async def acheck_cache():
+    key = f'health_check:{uuid.uuid4().hex}'
+    await cache.aset(key, 'ok', 10)
+    value = await cache.aget(key)
+    await cache.adelete(key)
+    if value != 'ok':
+        raise RuntimeError('Cache set/get round trip failed')
+    return {'operations': 'OK'}
+
+
+def check_application():
+    from apps.users.models import User
+
+    return {
+        'user_count': counting.count(User, counting.ESTIMATED),
+        'debug_mode': settings.DEBUG,
+    }
+
+
+CHECKS = {
+    'database': check_database,
+    'cache': check_cache,
+    'application': check_application,
+}
+# Native async variants; checks without one run on a worker thread
+ASYNC_CHECKS = {
+    'database': acheck_database,
+    'cache': acheck_cache,
+}
+READINESS_CHECKS = ('database', 'cache')
+
+_memo = {}
+_memo_lock = threading.Lock()
+_key_locks = {}
+_async_locks = weakref.WeakKeyDictionary()  # event loop -> {names: asyncio.Lock}
+
+
+def _timed_out(timeout):
+    return {'healthy': False, 'details': {}, 'response_time_ms': timeout * 1000,
+            'issues': [f'Timed out after {timeout}s']}
+
+
+def _validate(names):
+    names = tuple(sorted(names))
+    unknown = set(names) - set(CHECKS)
+    if unknown:
+        raise ValueError(f'Unknown health check(s): {", ".join(sorted(unknown))}')
+    return names
+
+
+def _run_one(check):
+    start = time.perf_counter()
+    try:
+        details = check()
+        return {'healthy': True, 'details': details, 'issues': [],
+                'response_time_ms': round((time.perf_counter() - start) * 1000, 2)}
+    except Exception as e:
+        return {'healthy': False, 'details': {'error': str(e)}, 'issues': [str(e)],
+                'response_time_ms': round((time.perf_counter() - start) * 1000, 2)}
+    finally:
+        # Pool threads open their own connection; don't leak it
+        connection.close()
+
+
+def run_concurrently(checks, timeout):
+    """Run {name: callable} in parallel; returns {name: result} within about `timeout` seconds."""
+    pool = ThreadPoolExecutor(max_workers=len(checks) or 1, thread_name_prefix='health')
+    futures = {name: pool.submit(_run_one, check) for name, check in checks.items()}
+    wait(futures.values(), timeout=timeout)
+    # Don't wait for stragglers: their threads finish in the background
+    pool.shutdown(wait=False, cancel_futures=True)
+    results = {}
+    for name, future in futures.items():
+        if future.done():
+            results[name] = future.result()
+        else:
+            results[name] = _timed_out(timeout)
+    return results
+
+
+def run_checks(names, timeout=None):
+    """Memoized, single-flight run of the named CHECKS."""
+    names = _validate(names)
+    timeout = timeout or getattr(settings, 'HEALTH_CHECK_TIMEOUT', 2)
+    ttl = getattr(settings, 'HEALTH_CHECK_CACHE_SECONDS', 5)
+
+    with _memo_lock:
+        lock = _key_locks.setdefault(names, threading.Lock())
+    with lock:
+        cached = _memo.get(names)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        results = run_concurrently({name: CHECKS[name] for name in names}, timeout)
+        _memo[names] = (time.monotonic() + ttl, results)
+        return results
+
+
+async def _atimed(check):
+    start = time.perf_counter()
+    try:
+        details = await check()
+        return {'healthy': True, 'details': details, 'issues': [],
+                'response_time_ms': round((time.perf_counter() - start) * 1000, 2)}
+    except Exception as e:
+        return {'healthy': False, 'details': {'error': str(e)}, 'issues': [str(e)],
+                'response_time_ms': round((time.perf_counter() - start) * 1000, 2)}
+
+
+async def _arun_one(name, timeout):
+    check = ASYNC_CHECKS.get(name)
+    if check is None:
+        # Off the request's thread, like run_concurrently(); _run_one closes its connection
+        run = sync_to_async(_run_one, thread_sensitive=False)(CHECKS[name])
+    else:
+        run = _atimed(check)
+    try:
+        return await asyncio.wait_for(run, timeout)
+    except asyncio.TimeoutError:
+        return _timed_out(timeout)
+
+
+async def arun_checks(names, timeout=None):
+    """Async run_checks(): memoized, single-flight per event loop, checks awaited concurrently."""
+    names = _validate(names)
+    timeout = timeout or getattr(settings, 'HEALTH_CHECK_TIMEOUT', 2)
+    ttl = getattr(settings, 'HEALTH_CHECK_CACHE_SECONDS', 5)
+
+    locks = _async_locks.setdefault(asyncio.get_running_loop(), {})
+    async with locks.setdefault(names, asyncio.Lock()):
+        cached = _memo.get(names)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        results = dict(zip(names, await asyncio.gather(*(_arun_one(name, timeout) for name in names))))
+        _memo[names] = (time.monotonic() + ttl, results)
+        return results
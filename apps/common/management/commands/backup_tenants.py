@@ -0,0 +1,92 @@
+"""
+Django management command to back up tenant schemas one dump per schema.
+Usage: python manage.py backup_tenants [acme ...] [--output backups/tenants] [--workers N] [--force]
+
+Schemas unchanged since their last dump (per pg_stat_user_tables write
+counters) are skipped. Dumps, sizes and SHA-256 checksums are recorded in
+<output>/manifest.json; restore one with restore_tenant. What a dump
+covers is described in apps.tenants.backup.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django_tenants.utils import get_public_schema_name, schema_context
+from apps.tenants.backup import backup_tenants
+from apps.tenants.models import Client
+
+
+class Command(BaseCommand):
+    help = 'Dump each changed tenant schema with pg_dump on a worker pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'schemas',
+            nargs='*',
+            help='Schemas to back up (default: every tenant)'
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            default=getattr(settings, 'TENANT_BACKUP_DIR', 'backups/tenants'),
+            help='Backup directory holding the dumps and manifest.json'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=getattr(settings, 'TENANT_BACKUP_WORKERS', 4),
+            help='Concurrent pg_dump processes'
+        )
+        parser.add_argument(
+            '--compress',
+            type=int,
+            default=6,
+            help='pg_dump compression level 0-9 (default: 6)'
+        )
+        parser.add_argument(
+            '--keep',
+            type=int,
+            default=getattr(settings, 'TENANT_BACKUP_KEEP', 7),
+            help='Dumps kept per schema'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Dump every schema even if unchanged'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report which schemas would be dumped'
+        )
+
+    def handle(self, *args, **options):
+        with schema_context(get_public_schema_name()):
+            schemas = options['schemas'] or list(
+                Client.objects.exclude(schema_name=get_public_schema_name())
+                .values_list('schema_name', flat=True)
+            )
+            if not schemas:
+                self.stdout.write('No tenant schemas to back up')
+                return
+
+            results = backup_tenants(
+                options['output'],
+                schemas,
+                workers=options['workers'],
+                compress=options['compress'],
+                keep=max(1, options['keep']),
+                force=options['force'],
+                dry_run=options['dry_run'],
+            )
+
+        totals = {}
+        for schema_name, status in sorted(results.items()):
+            key = 'failed' if status.startswith('failed') else status
+            totals[key] = totals.get(key, 0) + 1
+            if options['verbosity'] > 1 or key == 'failed':
+                self.stdout.write(f'{schema_name}: {status}')
+
+        summary = ', '.join(f'{status}: {count}' for status, count in sorted(totals.items()))
+        if totals.get('failed'):
+            raise CommandError(summary)
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,316 @@
+"""
+Django management command to onboard many tenants from a CSV or JSONL file.
+Usage: python manage.py bulk_create_tenants tenants.csv [--chunk-size N] [--workers N] [--resume]
+
+Each row needs `name` and `schema_name` (or `schema`); `domain` defaults to
+{schema}.localhost and `on_trial` defaults to true. Rows are validated and
+inserted a chunk at a time, schemas are provisioned on a process pool, and a
+per-row report is written so an interrupted run can be resumed.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django_tenants.utils import get_public_schema_name, schema_context
+from apps.common import counting, versioning
+from apps.tenants.models import Client, Domain
+from itertools import islice
+import csv
+import json
+import multiprocessing
+import os
+import re
+
+
+SCHEMA_NAME_RE = re.compile(r'^[a-z][a-z0-9_]*$')
+RESERVED_SCHEMA_NAMES = {
+    'public', 'information_schema', 'pg_catalog', 'pg_toast',
+    'pg_temp', 'pg_toast_temp', 'template0', 'template1',
+}
+REPORT_FIELDS = ['line', 'schema_name', 'domain', 'status', 'message']
+DONE_STATUSES = {'created', 'exists'}
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def provision_schema(schema_name):
+    """Create and migrate one tenant schema. Runs inside a pool worker."""
+    try:
+        connection.set_schema_to_public()
+        client = Client.objects.get(schema_name=schema_name)
+        client.create_schema(check_if_exists=True, verbosity=0)
+        return schema_name, None
+    except Exception as exc:
+        # Drop the half-built schema so the next run starts clean
+        try:
+            connection.set_schema_to_public()
+            with connection.cursor() as cursor:
+                cursor.execute(f'DROP SCHEMA IF EXISTS {connection.ops.quote_name(schema_name)} CASCADE')
+        except Exception:
+            pass
+        return schema_name, str(exc)
+
+
+class Command(BaseCommand):
+    help = 'Create tenants in bulk from a CSV or JSONL file'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'input',
+            type=str,
+            help='Path to a .csv or .jsonl file of tenants'
+        )
+        parser.add_argument(
+            '--format',
+            type=str,
+            choices=['csv', 'jsonl'],
+            help='Input format (default: from the file extension)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Rows validated and inserted per batch (default: 500)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=getattr(settings, 'TENANT_MULTIPROCESSING_MAX_PROCESSES', 4),
+            help='Parallel schema provisioning processes'
+        )
+        parser.add_argument(
+            '--report',
+            type=str,
+            help='Per-row result report path (default: <input>.report.csv)'
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Skip rows already recorded as created/exists in the report'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate rows and write the report without creating anything'
+        )
+
+    def handle(self, *args, **options):
+        path = options['input']
+        if not os.path.exists(path):
+            raise CommandError(f'Input file "{path}" does not exist')
+
+        fmt = options.get('format') or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+        report_path = options.get('report') or f'{path}.report.csv'
+        chunk_size = options['chunk_size']
+        dry_run = options['dry_run']
+
+        done = self.load_done(report_path) if options['resume'] else set()
+        if done:
+            self.stdout.write(f'Resuming: {len(done)} rows already done')
+
+        totals = {}
+        pool = None
+        with schema_context(get_public_schema_name()):
+            if options['workers'] > 1 and not dry_run:
+                # Workers must not inherit the parent's open connection
+                connections.close_all()
+                pool = multiprocessing.Pool(processes=options['workers'])
+
+            try:
+                mode = 'a' if options['resume'] and os.path.exists(report_path) else 'w'
+                with open(report_path, mode, newline='', encoding='utf-8') as report_file:
+                    writer = csv.DictWriter(report_file, fieldnames=REPORT_FIELDS)
+                    if mode == 'w':
+                        writer.writeheader()
+
+                    rows = (row for row in self.read_rows(path, fmt) if row['schema_name'] not in done)
+                    for chunk in chunked(rows, chunk_size):
+                        results = self.process_chunk(chunk, pool, dry_run)
+                        writer.writerows(results)
+                        report_file.flush()
+                        for result in results:
+                            totals[result['status']] = totals.get(result['status'], 0) + 1
+                        self.stdout.write(
+                            ', '.join(f'{status}: {count}' for status, count in sorted(totals.items()))
+                        )
+            finally:
+                if pool is not None:
+                    pool.close()
+                    pool.join()
+
+        self.stdout.write(self.style.SUCCESS(f'Done. Report written to {report_path}'))
+
+    def load_done(self, report_path):
+        if not os.path.exists(report_path):
+            return set()
+        with open(report_path, newline='', encoding='utf-8') as report_file:
+            return {
+                row['schema_name'] for row in csv.DictReader(report_file)
+                if row.get('status') in DONE_STATUSES
+            }
+
+    def read_rows(self, path, fmt):
+        """Stream normalized rows from the input file."""
+        with open(path, newline='', encoding='utf-8') as input_file:
+            if fmt == 'csv':
+                # Header is line 1
+                records = ((idx + 2, rec) for idx, rec in enumerate(csv.DictReader(input_file)))
+            else:
+                records = self.parse_jsonl(input_file)
+
+            for line, record in records:
+                if isinstance(record, str):
+                    # Unparseable line: reported as invalid by validate_row
+                    yield {
+                        'line': line,
+                        'name': '',
+                        'schema_name': '',
+                        'domain': '',
+                        'on_trial': False,
+                        'error': record,
+                    }
+                    continue
+                schema_name = (record.get('schema_name') or record.get('schema') or '').strip().lower()
+                domain = (record.get('domain') or f'{schema_name}.localhost').strip().lower()
+                on_trial = record.get('on_trial', True)
+                if isinstance(on_trial, str):
+                    on_trial = on_trial.strip().lower() not in ('0', 'false', 'no', '')
+                yield {
+                    'line': line,
+                    'name': (record.get('name') or '').strip(),
+                    'schema_name': schema_name,
+                    'domain': domain,
+                    'on_trial': bool(on_trial),
+                }
+
+    def parse_jsonl(self, input_file):
+        """Yield (line, record) pairs; record is an error message for bad lines."""
+        for idx, text in enumerate(input_file):
+            if not text.strip():
+                continue
+            try:
+                record = json.loads(text)
+            except json.JSONDecodeError as exc:
+                record = f'Invalid JSON: {exc.msg}'
+            else:
+                if not isinstance(record, dict):
+                    record = 'Record must be a JSON object'
+            yield idx + 1, record
+
+    def validate_row(self, row):
+        if row.get('error'):
+            return row['error']
+        schema_name = row['schema_name']
+        if not row['name']:
+            return 'Name is required'
+        if not SCHEMA_NAME_RE.match(schema_name):
+            return 'Schema name must start with a letter and contain only lowercase letters, numbers, and underscores'
+        if len(schema_name) > 63:
+            return 'Schema name must be 63 characters or less'
+        if schema_name in RESERVED_SCHEMA_NAMES or schema_name.startswith('pg_'):
+            return f'Schema name "{schema_name}" is reserved'
+        if not row['domain'] or len(row['domain']) > 253:
+            return 'Invalid domain'
+        return None
+
+    def process_chunk(self, chunk, pool, dry_run):
+        results = {}
+
+        def record(row, status, message=''):
+            results[row['line']] = {
+                'line': row['line'],
+                'schema_name': row['schema_name'],
+                'domain': row['domain'],
+                'status': status,
+                'message': message,
+            }
+
+        # Row-level validation, including duplicates within the chunk
+        candidates = []
+        seen_schemas, seen_domains = set(), set()
+        for row in chunk:
+            error = self.validate_row(row)
+            if not error and row['schema_name'] in seen_schemas:
+                error = 'Duplicate schema name in input'
+            if not error and row['domain'] in seen_domains:
+                error = 'Duplicate domain in input'
+            if error:
+                record(row, 'invalid', error)
+                continue
+            seen_schemas.add(row['schema_name'])
+            seen_domains.add(row['domain'])
+            candidates.append(row)
+
+        # One query per table for the whole chunk
+        existing_schemas = set(
+            Client.objects.filter(schema_name__in=seen_schemas).values_list('schema_name', flat=True)
+        )
+        existing_domains = dict(
+            Domain.objects.filter(domain__in=seen_domains).values_list('domain', 'tenant__schema_name')
+        )
+        present_schemas = self.existing_schemas(existing_schemas)
+
+        new_rows, to_provision = [], []
+        for row in candidates:
+            owner = existing_domains.get(row['domain'])
+            if owner is not None and owner != row['schema_name']:
+                record(row, 'invalid', f'Domain already belongs to "{owner}"')
+            elif row['schema_name'] in existing_schemas:
+                if owner is None:
+                    record(row, 'invalid', 'Schema exists with a different domain')
+                elif row['schema_name'] in present_schemas:
+                    record(row, 'exists')
+                else:
+                    # Inserted by an earlier run that failed before provisioning
+                    to_provision.append(row)
+            else:
+                new_rows.append(row)
+
+        if dry_run:
+            for row in new_rows + to_provision:
+                record(row, 'valid')
+            return [results[row['line']] for row in chunk]
+
+        if new_rows:
+            with transaction.atomic():
+                # bulk_create bypasses Client.save(), so no schema is created here
+                clients = Client.objects.bulk_create([
+                    Client(schema_name=row['schema_name'], name=row['name'], on_trial=row['on_trial'])
+                    for row in new_rows
+                ])
+                Domain.objects.bulk_create([
+                    Domain(domain=row['domain'], tenant=client, is_primary=True)
+                    for row, client in zip(new_rows, clients)
+                ])
+                counting.add(Client, len(clients))
+                versioning.bump('tenants')
+            to_provision.extend(new_rows)
+
+        by_schema = {row['schema_name']: row for row in to_provision}
+        if pool is not None:
+            outcomes = pool.imap_unordered(provision_schema, list(by_schema))
+        else:
+            outcomes = map(provision_schema, list(by_schema))
+        for schema_name, error in outcomes:
+            row = by_schema[schema_name]
+            if error:
+                record(row, 'failed', error)
+            else:
+                record(row, 'created')
+
+        return [results[row['line']] for row in chunk]
+
+    def existing_schemas(self, schema_names):
+        """Return which of schema_names already exist in the database."""
+        if not schema_names:
+            return set()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nspname FROM pg_namespace WHERE nspname = ANY(%s)",
+                [list(schema_names)]
+            )
+            return {row[0] for row in cursor.fetchall()}
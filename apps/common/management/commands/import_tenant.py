@@ -0,0 +1,51 @@
+"""
+Django management command to load an export_tenant export into a tenant schema.
+Usage: python manage.py import_tenant exports/acme.jsonl.gz [--schema acme] [--replace]
+
+Accepts a JSONL bundle (<schema>.jsonl.gz) or a CSV export directory. Rows are
+streamed into COPY in one transaction; the target schema must already exist
+(create the tenant first) and sequences are moved past the imported ids.
+Only the schema tables are loaded; see apps.tenants.transfer.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+from apps.tenants.transfer import import_schema
+import os
+
+
+class Command(BaseCommand):
+    help = 'Import the schema tables of a tenant export into an existing schema using COPY'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            type=str,
+            help='Path to a .jsonl.gz bundle or a CSV export directory'
+        )
+        parser.add_argument(
+            '--schema',
+            type=str,
+            help='Target schema (default: the schema recorded in the export)'
+        )
+        parser.add_argument(
+            '--replace',
+            action='store_true',
+            help='Truncate the target tables before loading'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'Export "{path}" does not exist')
+
+        try:
+            counts = import_schema(path, options.get('schema'), replace=options['replace'])
+        except (ValueError, DatabaseError) as e:
+            raise CommandError(str(e))
+
+        for table, rows in counts.items():
+            self.stdout.write(f'{table}: {rows} rows')
+        self.stdout.write(
+            self.style.SUCCESS(f'Imported {sum(counts.values())} rows into {len(counts)} tables')
+        )
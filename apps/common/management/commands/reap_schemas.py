@@ -0,0 +1,108 @@
+"""
+Django management command to drop schemas of deleted tenants in the background.
+Usage: python manage.py reap_schemas [--batch-size N] [--orphans] [--drop-orphans] [--loop]
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django_tenants.utils import get_public_schema_name, schema_context
+from apps.tenants.models import Client
+from apps.tenants.reaper import find_orphan_schemas, reap_orphans, reap_pending
+import time
+
+
+class Command(BaseCommand):
+    help = 'Drop schemas of tenants pending deletion and report orphan schemas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=getattr(settings, 'SCHEMA_REAPER_BATCH_SIZE', 5),
+            help='Maximum number of schemas to drop per run'
+        )
+        parser.add_argument(
+            '--lock-timeout',
+            type=int,
+            default=getattr(settings, 'SCHEMA_REAPER_LOCK_TIMEOUT_MS', 5000),
+            help='lock_timeout for each DROP SCHEMA in milliseconds'
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=getattr(settings, 'SCHEMA_REAPER_PAUSE_SECONDS', 1.0),
+            help='Seconds to sleep between drops'
+        )
+        parser.add_argument(
+            '--orphans',
+            action='store_true',
+            help='List former tenant schemas that have no Client row'
+        )
+        parser.add_argument(
+            '--drop-orphans',
+            action='store_true',
+            help='Also drop former tenant schemas that have no Client row'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would be dropped without dropping anything'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running, reaping one batch every --interval seconds'
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=60,
+            help='Seconds between batches in --loop mode (default: 60)'
+        )
+
+    def handle(self, *args, **options):
+        with schema_context(get_public_schema_name()):
+            while True:
+                self.run_once(options)
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+
+    def run_once(self, options):
+        batch_size = options['batch_size']
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('DRY RUN MODE - No changes will be made'))
+            pending = (
+                Client.objects.filter(pending_drop_since__isnull=False)
+                .order_by('pending_drop_since')
+                .values_list('schema_name', flat=True)[:batch_size]
+            )
+            for schema_name in pending:
+                self.stdout.write(f'  Would drop pending schema: {schema_name}')
+        else:
+            results = reap_pending(batch_size, options['lock_timeout'], options['pause'])
+            self.report(results, 'pending')
+
+        if options['orphans'] or options['drop_orphans']:
+            orphans = find_orphan_schemas()
+            self.stdout.write(f'Orphan schemas: {len(orphans)}')
+            for schema_name in orphans:
+                self.stdout.write(f'  {schema_name}')
+
+            if options['drop_orphans'] and not options['dry_run']:
+                results = reap_orphans(batch_size, options['lock_timeout'], options['pause'])
+                self.report(results, 'orphan')
+
+    def report(self, results, kind):
+        dropped = 0
+        for schema_name, error in results:
+            if error:
+                self.stdout.write(self.style.ERROR(f'  Failed to drop {kind} schema {schema_name}: {error}'))
+            else:
+                dropped += 1
+                self.stdout.write(f'  Dropped {kind} schema: {schema_name}')
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Dropped {dropped} of {len(results)} {kind} schemas')
+        )
@@ -0,0 +1,43 @@
+"""
+Django management command to resynchronise maintained row counters.
+Usage: python manage.py recount_rows [--model users.User ...]
+
+This is what creates the counters: run it once after deploying and after
+changing ROW_COUNT_SLOTS. Counters drift only through writes that bypass
+signals (raw SQL, bulk_create without counting.add()); run it after such
+imports or from a nightly job. Each table is briefly locked against writes
+while it is counted.
+"""
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from apps.common import counting
+
+
+class Command(BaseCommand):
+    help = 'Recount the tables listed in ROW_COUNTED_MODELS and reset their counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            action='append',
+            default=[],
+            help='Model label to recount (repeatable; default: every counted model)'
+        )
+
+    def handle(self, *args, **options):
+        models = counting.counted_models()
+        if options['model']:
+            try:
+                requested = [apps.get_model(label) for label in options['model']]
+            except (LookupError, ValueError) as e:
+                raise CommandError(str(e))
+            unknown = [m._meta.label for m in requested if m not in models]
+            if unknown:
+                raise CommandError(f'Not in ROW_COUNTED_MODELS: {", ".join(unknown)}')
+            models = requested
+
+        for model in models:
+            rows = counting.recount(model)
+            self.stdout.write(f'  {model._meta.label}: {rows}')
+        self.stdout.write(self.style.SUCCESS(f'Recounted {len(models)} tables'))
@@ -0,0 +1,79 @@
+"""
+Django management command to restore one tenant schema from backup_tenants.
+Usage: python manage.py restore_tenant acme --as acme_restored [--at 2025-01-31T00:00] [--domain acme-restored.localhost]
+
+The schema is restored under a new name via a scratch database, so the live
+schema and every other tenant stay untouched. With --domain the restored
+schema is also registered as a tenant. See apps.tenants.backup for what a
+dump covers.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django_tenants.utils import get_public_schema_name, schema_context
+from apps.tenants.backup import find_backup, restore_schema, verify_backup
+from apps.tenants.models import Client, Domain
+
+
+class Command(BaseCommand):
+    help = 'Restore a single tenant schema from its per-schema backup under a new name'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'schema',
+            type=str,
+            help='Schema that was backed up'
+        )
+        parser.add_argument(
+            '--as',
+            dest='target',
+            type=str,
+            required=True,
+            help='Name of the schema to restore into (must not exist)'
+        )
+        parser.add_argument(
+            '--at',
+            type=str,
+            help='Use the newest backup taken at or before this ISO timestamp (default: latest)'
+        )
+        parser.add_argument(
+            '--backup-dir',
+            type=str,
+            default=getattr(settings, 'TENANT_BACKUP_DIR', 'backups/tenants'),
+            help='Backup directory holding the dumps and manifest.json'
+        )
+        parser.add_argument(
+            '--domain',
+            type=str,
+            help='Register the restored schema as a tenant with this domain'
+        )
+
+    def handle(self, *args, **options):
+        schema_name, target = options['schema'], options['target']
+        backup = find_backup(options['backup_dir'], schema_name, options.get('at'))
+        if backup is None:
+            raise CommandError(f'No backup of "{schema_name}" found in {options["backup_dir"]}')
+
+        try:
+            path = verify_backup(options['backup_dir'], backup)
+            self.stdout.write(f'Restoring {backup["file"]} ({backup["created_at"]}) as "{target}"')
+            with schema_context(get_public_schema_name()):
+                restore_schema(path, schema_name, target)
+        except (ValueError, RuntimeError) as e:
+            raise CommandError(str(e))
+
+        if options.get('domain'):
+            with schema_context(get_public_schema_name()), transaction.atomic():
+                source = Client.objects.filter(schema_name=schema_name).first()
+                client = Client(
+                    schema_name=target,
+                    name=f'{source.name if source else schema_name} (restored)',
+                    plan=source.plan if source else None,
+                )
+                # The schema already exists; don't let save() create and migrate it
+                client.auto_create_schema = False
+                client.save()
+                Domain.objects.create(domain=options['domain'], tenant=client, is_primary=True)
+
+        self.stdout.write(self.style.SUCCESS(f'Restored "{schema_name}" as "{target}"'))
@@ -0,0 +1,63 @@
+"""
+Django management command to generate queued report jobs.
+Usage: python manage.py run_report_jobs [--max-jobs N] [--loop] [--interval 5]
+
+Several workers can run at once; each claims jobs with SKIP LOCKED.
+"""
+
+from django.core.management.base import BaseCommand
+from django_tenants.utils import get_public_schema_name, schema_context
+from apps.dashboard.jobs import claim_next, purge_expired, requeue_stale, run_job
+import time
+
+
+class Command(BaseCommand):
+    help = 'Generate queued report artifacts under MEDIA_ROOT/reports'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-jobs',
+            type=int,
+            default=0,
+            help='Stop after this many jobs per pass (default: 0, drain the queue)'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling for new jobs every --interval seconds'
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=5,
+            help='Seconds between polls in --loop mode (default: 5)'
+        )
+
+    def handle(self, *args, **options):
+        with schema_context(get_public_schema_name()):
+            while True:
+                self.run_once(options)
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+
+    def run_once(self, options):
+        requeued = requeue_stale()
+        if requeued:
+            self.stdout.write(self.style.WARNING(f'Requeued {requeued} stale jobs'))
+
+        processed = 0
+        while not options['max_jobs'] or processed < options['max_jobs']:
+            job = claim_next()
+            if job is None:
+                break
+            job = run_job(job)
+            processed += 1
+            if job.error:
+                self.stdout.write(self.style.ERROR(f'  Job {job.pk} failed: {job.error}'))
+            else:
+                self.stdout.write(f'  Job {job.pk}: {job.rows} rows, {job.size} bytes')
+
+        purged = purge_expired()
+        if processed or purged:
+            self.stdout.write(self.style.SUCCESS(f'Processed {processed} jobs, purged {purged} expired'))
@@ -0,0 +1,61 @@
+"""
+Django management command to report the tenants using the most resources.
+Usage: python manage.py top_tenants [--minutes 60] [--metric db_ms] [--limit 10]
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django_tenants.utils import get_public_schema_name, schema_context
+from apps.tenants.usage import USAGE_FIELDS, top_tenants
+
+
+class Command(BaseCommand):
+    help = 'Show the noisiest tenants by request, DB, and cache usage'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--minutes',
+            type=int,
+            default=60,
+            help='Window to aggregate over, in minutes (default: 60)'
+        )
+        parser.add_argument(
+            '--metric',
+            type=str,
+            choices=USAGE_FIELDS,
+            default='db_ms',
+            help='Metric to rank tenants by (default: db_ms)'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=10,
+            help='Number of tenants to show (default: 10)'
+        )
+
+    def handle(self, *args, **options):
+        with schema_context(get_public_schema_name()):
+            try:
+                rows = top_tenants(options['minutes'], options['metric'], options['limit'])
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Top tenants by {options["metric"]} over the last {options["minutes"]} minutes'
+            )
+        )
+        if not rows:
+            self.stdout.write('No usage recorded in this window')
+            return
+
+        self.stdout.write(
+            f'{"schema":<24}{"requests":>10}{"wall_ms":>12}{"db_ms":>12}'
+            f'{"queries":>10}{"bytes":>14}{"cache_ops":>11}'
+        )
+        for row in rows:
+            self.stdout.write(
+                f'{row["schema_name"]:<24}{row["total_requests"]:>10}'
+                f'{row["total_wall_ms"]:>12.0f}{row["total_db_ms"]:>12.0f}'
+                f'{row["total_queries"]:>10}{row["total_response_bytes"]:>14}'
+                f'{row["total_cache_ops"]:>11}'
+            )
@@ -0,0 +1,125 @@
+"""
+Django management command to precompute dashboard and analytics payloads.
+Usage: python manage.py warm_caches [--concurrency 4] [--limit N] [--loop] [--interval 60] [--jitter 0.1]
+
+Active tenants are visited most recently active first (TenantUsage), and a
+payload is rebuilt once it is past CACHE_WARM_REFRESH_RATIO of its TTL, so
+requests keep reading warm entries across expiry and worker restarts. Each
+pass reports coverage: the share of payloads that were already warm.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import F, Max, OuterRef, Subquery
+from django_tenants.utils import get_public_schema_name, schema_context, tenant_context
+from apps.dashboard.widgets import PAYLOADS, warm
+from apps.tenants.models import Client, TenantUsage
+import random
+import time
+
+
+def tenants_by_recent_activity(limit=0):
+    last_active = (
+        TenantUsage.objects.filter(schema_name=OuterRef('schema_name'))
+        .values('schema_name').annotate(last=Max('minute')).values('last')
+    )
+    clients = (
+        Client.objects.filter(is_active=True, pending_drop_since__isnull=True)
+        .exclude(schema_name=get_public_schema_name())
+        .annotate(last_active=Subquery(last_active))
+        .order_by(F('last_active').desc(nulls_last=True), 'pk')
+    )
+    return list(clients[:limit] if limit else clients)
+
+
+def warm_tenant(client, refresh_ratio, jitter):
+    """Warm every payload of one tenant; runs on a pool thread."""
+    try:
+        with tenant_context(client):
+            return client.schema_name, {
+                name: warm(name, refresh_ratio=refresh_ratio, jitter=jitter) for name in PAYLOADS
+            }, None
+    except Exception as e:
+        return client.schema_name, {}, str(e)
+    finally:
+        # Each pool thread has its own connection
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = 'Precompute dashboard and analytics caches for active tenants, most recently active first'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=4,
+            help='Tenants warmed in parallel (default: 4)'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=0,
+            help='Only warm the N most recently active tenants per pass (default: 0, all)'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep warming every --interval seconds'
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=60,
+            help='Seconds between passes in --loop mode (default: 60)'
+        )
+        parser.add_argument(
+            '--jitter',
+            type=float,
+            default=0.1,
+            help='Random spread applied to refresh points and the interval (default: 0.1)'
+        )
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1:
+            raise CommandError('--concurrency must be at least 1')
+        if not 0 <= options['jitter'] < 1:
+            raise CommandError('--jitter must be between 0 and 1')
+
+        while True:
+            self.run_once(options)
+            if not options['loop']:
+                break
+            jitter = options['jitter']
+            time.sleep(options['interval'] * random.uniform(1 - jitter, 1 + jitter))
+
+    def run_once(self, options):
+        refresh_ratio = getattr(settings, 'CACHE_WARM_REFRESH_RATIO', 0.8)
+        with schema_context(get_public_schema_name()):
+            clients = tenants_by_recent_activity(options['limit'])
+
+        started = time.monotonic()
+        totals = {'fresh': 0, 'stale': 0, 'miss': 0}
+        failed = 0
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            outcomes = pool.map(lambda c: warm_tenant(c, refresh_ratio, options['jitter']), clients)
+            for schema_name, results, error in outcomes:
+                if error:
+                    failed += 1
+                    self.stdout.write(self.style.ERROR(f'  {schema_name}: {error}'))
+                    continue
+                for outcome in results.values():
+                    totals[outcome] += 1
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'  {schema_name}: ' + ', '.join(f'{k}={v}' for k, v in results.items()))
+
+        payloads = sum(totals.values())
+        # Stale entries were still being served, so only misses were cold
+        coverage = (totals['fresh'] + totals['stale']) / payloads * 100 if payloads else 100.0
+        self.stdout.write(self.style.SUCCESS(
+            f'Warmed {len(clients) - failed}/{len(clients)} tenants in {time.monotonic() - started:.1f}s: '
+            f'{totals["miss"]} cold, {totals["stale"]} refreshed, {totals["fresh"]} fresh '
+            f'(coverage {coverage:.1f}%)'
+        ))
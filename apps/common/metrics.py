@@ -0,0 +1,228 @@
+"""
+OpenMetrics exposition for /metrics.
+
+A scrape reads one pre-rendered snapshot from the shared cache. The snapshot
+is rebuilt at most once per METRICS_INTERVAL by whichever worker first sees
+it expire (a cache.add() lock keeps the others serving the previous one), so
+the gauge queries run once per interval for the whole deployment, however
+many scrapers or workers there are.
+
+Request latency histograms are kept in process by TimingMiddleware and
+published to the cache per worker at most once per interval; the snapshot
+sums the workers that published recently. Per-tenant series are limited to
+the METRICS_TENANT_LABEL_LIMIT busiest tenants, the rest are folded into
+tenant="other".
+"""
+
+from datetime import timedelta
+import logging
+import os
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Sum
+from django.utils import timezone
+from django_tenants.utils import get_public_schema_name, schema_context
+
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+SNAPSHOT_KEY = 'metrics:snapshot'
+LOCK_KEY = 'metrics:snapshot:lock'
+WORKERS_KEY = 'metrics:workers'
+
+_worker_id = f'{socket.gethostname()}:{os.getpid()}'
+# (method, status class) -> [count per bucket..., +Inf count, sum in microseconds]
+_requests: dict[tuple[str, str], list] = {}
+_lock = threading.Lock()
+_last_publish = 0.0
+
+
+def _interval():
+    return getattr(settings, 'METRICS_INTERVAL', 15)
+
+
+def observe_request(method, status_code, seconds):
+    """Record one finished request; called by TimingMiddleware."""
+    key = (method if method in METHODS else 'OTHER', f'{status_code // 100}xx')
+    with _lock:
+        series = _requests.get(key)
+        if series is None:
+            series = _requests[key] = [0] * (len(BUCKETS) + 2)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                series[i] += 1
+                break
+        else:
+            series[len(BUCKETS)] += 1
+        series[-1] += int(seconds * 1_000_000)
+
+
+def publish_due():
+    return time.monotonic() - _last_publish >= _interval()
+
+
+def maybe_publish():
+    if publish_due():
+        publish()
+
+
+def publish():
+    """Write this worker's cumulative request histograms to the shared cache."""
+    global _last_publish
+    with _lock:
+        snapshot = {key: list(series) for key, series in _requests.items()}
+        _last_publish = time.monotonic()
+    cache.set(f'metrics:worker:{_worker_id}', snapshot, _interval() * 10)
+    workers = cache.get(WORKERS_KEY) or []
+    if _worker_id not in workers:
+        # Lost updates are harmless: a worker re-registers on its next publish
+        cache.set(WORKERS_KEY, workers + [_worker_id], None)
+
+
+def _labels(**labels):
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _request_lines():
+    workers = cache.get(WORKERS_KEY) or []
+    snapshots = cache.get_many([f'metrics:worker:{w}' for w in workers])
+    live = [w for w in workers if f'metrics:worker:{w}' in snapshots]
+    if live != workers:
+        cache.set(WORKERS_KEY, live, None)
+
+    totals = {}
+    for snapshot in snapshots.values():
+        for key, series in snapshot.items():
+            total = totals.setdefault(key, [0] * len(series))
+            for i, value in enumerate(series):
+                total[i] += value
+
+    name = 'saas_http_request_duration_seconds'
+    lines = [f'# TYPE {name} histogram', f'# UNIT {name} seconds',
+             f'# HELP {name} Request latency measured by TimingMiddleware.']
+    for (method, status), series in sorted(totals.items()):
+        cumulative = 0
+        for bound, count in zip(BUCKETS + ('+Inf',), series[:-1]):
+            cumulative += count
+            le = bound if bound == '+Inf' else repr(bound)
+            lines.append(f'{name}_bucket{_labels(method=method, status=status, le=le)} {cumulative}')
+        lines.append(f'{name}_count{_labels(method=method, status=status)} {cumulative}')
+        lines.append(f'{name}_sum{_labels(method=method, status=status)} {series[-1] / 1_000_000}')
+    lines += ['# TYPE saas_metrics_workers gauge', f'saas_metrics_workers {len(live)}']
+    return lines
+
+
+def business_gauges():
+    from apps.billing.models import Payment, Subscription
+    from apps.tenants.models import Client
+    from apps.users.models import User
+    from . import counting
+
+    since = timezone.now() - timedelta(days=30)
+    return {
+        'total_users': counting.count(User),
+        'active_subscriptions': Subscription.objects.filter(active=True).count(),
+        'total_tenants': counting.count(Client),
+        'monthly_revenue': float(Payment.objects.filter(date__gte=since).aggregate(total=Sum('amount'))['total'] or 0),
+    }
+
+
+def _cache_lines():
+    backend = getattr(cache, '_cache', None)
+    if not hasattr(backend, 'get_client'):
+        return []
+    info = backend.get_client().info()
+    return [
+        '# TYPE saas_cache_hits counter', f'saas_cache_hits_total {info.get("keyspace_hits", 0)}',
+        '# TYPE saas_cache_misses counter', f'saas_cache_misses_total {info.get("keyspace_misses", 0)}',
+        '# TYPE saas_cache_used_memory_bytes gauge', f'saas_cache_used_memory_bytes {info.get("used_memory", 0)}',
+        '# TYPE saas_cache_connected_clients gauge', f'saas_cache_connected_clients {info.get("connected_clients", 0)}',
+    ]
+
+
+def _db_lines():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT coalesce(state, 'unknown'), count(*) FROM pg_stat_activity "
+            "WHERE datname = current_database() GROUP BY 1"
+        )
+        states = cursor.fetchall()
+        cursor.execute("SELECT current_setting('max_connections')::int")
+        max_connections = cursor.fetchone()[0]
+    lines = ['# TYPE saas_db_connections gauge', '# HELP saas_db_connections Server connections by state.']
+    lines += [f'saas_db_connections{_labels(state=state)} {count}' for state, count in sorted(states)]
+    lines += ['# TYPE saas_db_max_connections gauge', f'saas_db_max_connections {max_connections}']
+    return lines
+
+
+def _tenant_lines():
+    from apps.tenants.models import TenantUsage
+    from apps.tenants.usage import top_tenants
+
+    limit = getattr(settings, 'METRICS_TENANT_LABEL_LIMIT', 50)
+    since = timezone.now() - timedelta(minutes=5)
+    rows = top_tenants(minutes=5, metric='requests', limit=limit)
+    totals = TenantUsage.objects.filter(minute__gte=since).aggregate(requests=Sum('requests'), db_ms=Sum('db_ms'))
+    other = {
+        'total_requests': (totals['requests'] or 0) - sum(r['total_requests'] for r in rows),
+        'total_db_ms': (totals['db_ms'] or 0) - sum(r['total_db_ms'] for r in rows),
+    }
+    series = [(r['schema_name'], r) for r in rows]
+    if other['total_requests'] > 0:
+        series.append(('other', other))
+
+    lines = ['# TYPE saas_tenant_requests_5m gauge',
+             f'# HELP saas_tenant_requests_5m Requests in the last 5 minutes, top {limit} tenants.']
+    lines += [f'saas_tenant_requests_5m{_labels(tenant=t)} {r["total_requests"]}' for t, r in series]
+    lines += ['# TYPE saas_tenant_db_seconds_5m gauge']
+    lines += [f'saas_tenant_db_seconds_5m{_labels(tenant=t)} {r["total_db_ms"] / 1000:.3f}' for t, r in series]
+    return lines
+
+
+def build_snapshot():
+    started = time.perf_counter()
+    business = {}
+
+    def _business_lines():
+        business.update(business_gauges())
+        return [line for name, value in business.items()
+                for line in (f'# TYPE saas_{name} gauge', f'saas_{name} {value}')]
+
+    lines, failed = [], []
+    with schema_context(get_public_schema_name()):
+        for section in (_request_lines, _business_lines, _cache_lines, _db_lines, _tenant_lines):
+            try:
+                lines += section()
+            except Exception:
+                # A failing source drops its own series, never the scrape
+                logger.warning('Metrics source %s failed', section.__name__, exc_info=True)
+                failed.append(section.__name__.strip('_').replace('_lines', ''))
+    lines.append('# TYPE saas_metrics_source_errors gauge')
+    lines += [f'saas_metrics_source_errors{_labels(source=name)} 1' for name in failed]
+    lines += ['# TYPE saas_metrics_build_seconds gauge', f'saas_metrics_build_seconds {time.perf_counter() - started:.6f}']
+    lines.append('# EOF')
+    return {'built_at': time.time(), 'text': '\n'.join(lines) + '\n', 'business': business}
+
+
+def get_snapshot():
+    """Return the shared snapshot, rebuilding it if it is older than METRICS_INTERVAL."""
+    snapshot = cache.get(SNAPSHOT_KEY)
+    interval = _interval()
+    if snapshot is not None and time.time() - snapshot['built_at'] < interval:
+        return snapshot
+    # One worker rebuilds; the others keep serving the previous snapshot meanwhile
+    if snapshot is None or cache.add(LOCK_KEY, _worker_id, interval):
+        snapshot = build_snapshot()
+        cache.set(SNAPSHOT_KEY, snapshot, interval * 20)
+    return snapshot
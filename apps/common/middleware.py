@@ -1,12 +1,158 @@
+import math
 import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.http import JsonResponse
+from rest_framework_simplejwt.settings import api_settings
+from apps.tenants import usage
+from . import authentication, metrics, ratelimit
+
 
 class TimingMiddleware:
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self.track_usage = getattr(settings, 'TENANT_USAGE_ENABLED', True)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        if not self.track_usage:
+            start = time.time()
+            response = self.get_response(request)
+            duration = time.time() - start
+            self.finish(request, response, duration, None)
+            metrics.maybe_publish()
+            return response
+
+        # Per-tenant accounting: DB time/queries via execute_wrapper, cache ops
+        # via the counting cache backends (see apps.tenants.usage)
+        request_usage, token = usage.start_request()
+        start = time.time()
+        try:
+            with connection.execute_wrapper(request_usage):
+                response = self.get_response(request)
+        finally:
+            usage.end_request(token)
+        duration = time.time() - start
+        self.finish(request, response, duration, request_usage)
+        metrics.maybe_publish()
+        usage.maybe_flush()
+        return response
+
+    async def __acall__(self, request):
+        # Under ASGI, queries run on the request's sync thread, not this one, so
+        # DB time and query counts are not recorded; everything else is
+        request_usage, token = (usage.start_request() if self.track_usage else (None, None))
         start = time.time()
-        response = self.get_response(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            if token is not None:
+                usage.end_request(token)
         duration = time.time() - start
+        self.finish(request, response, duration, request_usage)
+        # Publishing and flushing block on the cache/database; only hop threads when due
+        if metrics.publish_due():
+            await sync_to_async(metrics.publish)()
+        if self.track_usage and usage.flush_due():
+            await sync_to_async(usage.flush)()
+        return response
+
+    def finish(self, request, response, duration, request_usage):
+        self.log_duration(request, duration)
+        metrics.observe_request(request.method, response.status_code, duration)
+        if request_usage is None:
+            return
+        tenant = getattr(request, 'tenant', None)
+        schema_name = tenant.schema_name if tenant is not None else connection.schema_name
+        response_bytes = 0 if response.streaming else len(response.content)
+        usage.record(schema_name, duration * 1000, request_usage, response_bytes)
+
+    def log_duration(self, request, duration):
         print(f"⏱️ Request to {request.path} took {duration:.2f}s")
+
+
+class RateLimitMiddleware:
+    """Token-bucket rate limiting per tenant, route class and optionally user.
+
+    Must come after TenantMainMiddleware (and AuthenticationMiddleware when
+    RATE_LIMIT_PER_USER is on). See apps.common.ratelimit for the policy.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'RATE_LIMIT_ENABLED', True)
+        self.per_user = getattr(settings, 'RATE_LIMIT_PER_USER', False)
+        self.exempt_prefixes = tuple(getattr(settings, 'RATE_LIMIT_EXEMPT_PREFIXES', ()))
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        decision = self.decide(request)
+        if decision is None:
+            return self.get_response(request)
+        response = self.limited_response(decision) if not decision.allowed else self.get_response(request)
+        return self.add_headers(response, decision)
+
+    async def __acall__(self, request):
+        decision = None
+        if self.applies_to(request):
+            # Policy lookup, the bucket update and a session user may all block
+            decision = await sync_to_async(self.decide)(request)
+        if decision is None:
+            return await self.get_response(request)
+        response = self.limited_response(decision) if not decision.allowed else await self.get_response(request)
+        return self.add_headers(response, decision)
+
+    def applies_to(self, request):
+        return (self.enabled and getattr(request, 'tenant', None) is not None
+                and not request.path.startswith(self.exempt_prefixes))
+
+    def decide(self, request):
+        """Consume a token for `request`; None when the request is not rate limited."""
+        if not self.applies_to(request):
+            return None
+        tenant = request.tenant
+        policy = ratelimit.get_policy(tenant)
+        if policy is None:
+            return None
+
+        route_class, share = ratelimit.route_class_for(request.path)
+        per_minute = max(1, int(policy[0] * share))
+        burst = max(1, int(policy[1] * share))
+        user_id = None
+        if self.per_user:
+            # API clients are keyed by their JWT's user id, which needs no session or user query
+            token = authentication.validated_token(request)
+            if token is not None:
+                user_id = token.get(api_settings.USER_ID_CLAIM)
+            elif request.user.is_authenticated:
+                user_id = request.user.pk
+
+        return ratelimit.consume(tenant.schema_name, route_class, per_minute, burst, user_id)
+
+    def limited_response(self, decision):
+        retry_after = max(1, math.ceil(decision.retry_after))
+        response = JsonResponse(
+            {'error': 'Rate limit exceeded', 'retry_after': retry_after},
+            status=429,
+        )
+        response['Retry-After'] = str(retry_after)
+        return response
+
+    def add_headers(self, response, decision):
+        response['X-RateLimit-Limit'] = str(decision.limit)
+        response['X-RateLimit-Remaining'] = str(decision.remaining)
         return response
@@ -1,4 +1,6 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 
 class TimestampedModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -24,5 +26,31 @@ class SystemSetting(models.Model):
     value = models.TextField(blank=True)
     description = models.CharField(max_length=255, blank=True)
 
+    class Meta:
+        indexes = [
+            # Trigram indexes on UPPER(col) match the SQL of `__icontains`
+            GinIndex(OpClass(Upper('key'), name='gin_trgm_ops'), name='systemsetting_key_trgm'),
+            GinIndex(OpClass(Upper('description'), name='gin_trgm_ops'), name='systemsetting_desc_trgm'),
+            # `key__startswith` uses the varchar_pattern_ops index Django adds for unique CharFields
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.key}"
+
+
+class RevokedTokenFamily(models.Model):
+    """A refresh token family (`sid`) revoked before it expired; see apps.common.authentication."""
+    sid = models.CharField(max_length=64, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self) -> str:
+        return self.sid
+
+
+class RowCount(models.Model):
+    """Exact row count of one table, maintained by apps.common.counting."""
+    key = models.CharField(max_length=200, unique=True, help_text='<schema>:<app_label.model>#<slot>/<slots>')
+    rows = models.BigIntegerField(default=0)
+
     def __str__(self) -> str:
-        return f"{self.key}"
\ No newline at end of file
+        return f"{self.key}: {self.rows}"
@@ -0,0 +1,165 @@
+"""
+Per-tenant token-bucket rate limiting.
+
+Buckets are keyed by tenant schema, route class and (optionally) user, and use
+GCRA, the "virtual scheduling" form of a token bucket: one stored timestamp
+per bucket (the theoretical arrival time, TAT) instead of a token count plus a
+refill time. On Redis the read-modify-write is made atomic with WATCH/MULTI,
+so no Lua script is needed; with any other cache backend the buckets live in
+process-local memory behind a lock, like LocMemCache but without pickling.
+
+Limits come from, in order: a `ratelimit_<schema>` SystemSetting, the tenant's
+Plan, a `ratelimit_default` SystemSetting, then RATE_LIMIT_DEFAULT_PER_MINUTE.
+Setting values are "<per_minute>" or "<per_minute>,<burst>"; 0 means unlimited.
+"""
+
+from collections import defaultdict
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .utils import get_setting_cached
+
+
+_local_lock = threading.Lock()
+_local_buckets = {}  # key -> (tat, expires_at)
+_counters_lock = threading.Lock()
+_counters = defaultdict(lambda: [0, 0])  # (schema, route_class) -> [allowed, limited]
+_policies = {}  # schema -> (expires_at, (per_minute, burst) | None)
+
+
+class Decision:
+    __slots__ = ('allowed', 'limit', 'remaining', 'retry_after')
+
+    def __init__(self, allowed, limit, remaining, retry_after):
+        self.allowed = allowed
+        self.limit = limit
+        self.remaining = remaining
+        self.retry_after = retry_after
+
+
+def _parse_limit(value):
+    if value in (None, ''):
+        return None
+    per_minute, _, burst = str(value).partition(',')
+    per_minute = int(per_minute)
+    return per_minute, int(burst) if burst else per_minute
+
+
+def _resolve_policy(tenant):
+    schema_name = tenant.schema_name
+    policy = _parse_limit(get_setting_cached(f'ratelimit_{schema_name}'))
+    if policy is None and getattr(tenant, 'plan_id', None):
+        plan = tenant.plan
+        if plan.rate_limit_per_minute is not None:
+            policy = (plan.rate_limit_per_minute, plan.rate_limit_burst or plan.rate_limit_per_minute)
+    if policy is None:
+        policy = _parse_limit(get_setting_cached('ratelimit_default'))
+    if policy is None:
+        per_minute = getattr(settings, 'RATE_LIMIT_DEFAULT_PER_MINUTE', 600)
+        policy = (per_minute, getattr(settings, 'RATE_LIMIT_DEFAULT_BURST', None) or per_minute)
+    return None if policy[0] == 0 else policy
+
+
+def get_policy(tenant):
+    """Return (per_minute, burst) for the tenant, or None if unlimited.
+
+    Memoized per process for RATE_LIMIT_POLICY_TTL seconds so the hot path
+    never touches the cache or database.
+    """
+    now = time.monotonic()
+    entry = _policies.get(tenant.schema_name)
+    if entry is None or entry[0] < now:
+        entry = (now + getattr(settings, 'RATE_LIMIT_POLICY_TTL', 60), _resolve_policy(tenant))
+        _policies[tenant.schema_name] = entry
+    return entry[1]
+
+
+def route_class_for(path):
+    """Map a request path to (route_class, share of the tenant limit)."""
+    for prefix, route_class, share in getattr(settings, 'RATE_LIMIT_ROUTE_CLASSES', ()):
+        if path.startswith(prefix):
+            return route_class, share
+    return 'web', 1.0
+
+
+def _gcra(tat, now, interval, tolerance):
+    """Return (allowed, new_tat, remaining, retry_after) for one request."""
+    tat = max(tat, now)
+    new_tat = tat + interval
+    excess = new_tat - now - tolerance
+    if excess > 0:
+        return False, tat, 0, excess
+    return True, new_tat, int((tolerance - (new_tat - now)) / interval), 0.0
+
+
+def _consume_local(key, interval, tolerance, ttl):
+    with _local_lock:
+        now = time.time()
+        entry = _local_buckets.get(key)
+        tat = entry[0] if entry is not None else now
+        allowed, new_tat, remaining, retry_after = _gcra(tat, now, interval, tolerance)
+        if allowed:
+            _local_buckets[key] = (new_tat, now + ttl)
+            if len(_local_buckets) > getattr(settings, 'RATE_LIMIT_LOCAL_MAX_BUCKETS', 10000):
+                for stale in [k for k, (_, expires) in _local_buckets.items() if expires < now]:
+                    del _local_buckets[stale]
+    return allowed, remaining, retry_after
+
+
+def _consume_redis(key, interval, tolerance, ttl):
+    from redis.exceptions import WatchError
+
+    key = cache.make_and_validate_key(key)
+    # Django's RedisCache only exposes the raw client through its private client wrapper
+    client = cache._cache.get_client(key, write=True)
+    with client.pipeline() as pipe:
+        for _ in range(getattr(settings, 'RATE_LIMIT_REDIS_RETRIES', 3)):
+            try:
+                pipe.watch(key)
+                stored = pipe.get(key)
+                now = time.time()
+                tat = float(stored) if stored is not None else now
+                allowed, new_tat, remaining, retry_after = _gcra(tat, now, interval, tolerance)
+                if not allowed:
+                    pipe.unwatch()
+                    return allowed, remaining, retry_after
+                pipe.multi()
+                pipe.set(key, repr(new_tat), ex=ttl)
+                pipe.execute()
+                return allowed, remaining, retry_after
+            except WatchError:
+                continue
+    # Persistent contention on one bucket: fail open rather than stall the request
+    return True, 0, 0.0
+
+
+def _is_redis():
+    return 'redis' in settings.CACHES['default']['BACKEND'].lower()
+
+
+def consume(schema_name, route_class, per_minute, burst, user_id=None):
+    """Take one token from the bucket and record the outcome in the counters."""
+    interval = 60.0 / per_minute
+    tolerance = interval * burst
+    ttl = max(1, math.ceil(tolerance + interval))
+    key = f'rl:{schema_name}:{route_class}' + (f':{user_id}' if user_id is not None else '')
+
+    consume_fn = _consume_redis if _is_redis() else _consume_local
+    allowed, remaining, retry_after = consume_fn(key, interval, tolerance, ttl)
+
+    with _counters_lock:
+        _counters[(schema_name, route_class)][0 if allowed else 1] += 1
+    return Decision(allowed, per_minute, remaining, retry_after)
+
+
+def get_counters():
+    """Snapshot of allowed/limited counts per (schema, route class) in this process."""
+    with _counters_lock:
+        return [
+            {'schema_name': schema, 'route_class': route_class, 'allowed': allowed, 'limited': limited}
+            for (schema, route_class), (allowed, limited) in sorted(_counters.items())
+        ]
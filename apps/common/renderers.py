@@ -0,0 +1,61 @@
+"""
+orjson-based JSON rendering for hot API endpoints.
+
+Select it per view with `@renderer_classes(FAST_RENDERERS)`. The output
+matches DRF's JSONRenderer for the types our payloads carry: datetimes
+(ISO 8601, "Z" for UTC), dates, UUIDs, Decimals (as numbers), lazy strings
+and querysets. Pair it with `FastReadMixin.fast()` serializers, which leave
+that type conversion to the renderer instead of per-field objects.
+"""
+
+import datetime
+import decimal
+
+import orjson
+from django.db.models.query import QuerySet
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework.renderers import BaseRenderer, BrowsableAPIRenderer
+
+
+OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    """Types orjson does not handle natively, converted as DRF's JSONEncoder does."""
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if isinstance(obj, QuerySet):
+        return list(obj)
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, '__getitem__') and hasattr(obj, 'keys'):
+        return dict(obj)
+    if hasattr(obj, '__iter__'):
+        return list(obj)
+    raise TypeError(f'Type is not JSON serializable: {type(obj).__name__}')
+
+
+class ORJSONRenderer(BaseRenderer):
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        options = OPTIONS
+        # Honour `Accept: application/json; indent=N` like JSONRenderer (orjson only indents by 2)
+        if accepted_media_type and 'indent=' in accepted_media_type:
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_default, option=options)
+
+
+# JSON first, so clients without an explicit Accept get the fast path
+FAST_RENDERERS = [ORJSONRenderer, BrowsableAPIRenderer]
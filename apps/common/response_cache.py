@@ -0,0 +1,129 @@
+"""
+Rendered-response cache for DRF function views.
+
+`@cache_response(name, families=...)` goes directly above the view function
+(below @api_view/@permission_classes/@renderer_classes), so authentication,
+permissions and content negotiation still run on every request. The entry
+holds the rendered bytes, keyed by tenant schema, host, optional user, the
+negotiated format, URL kwargs, the normalized query string, the data
+versions of `families` and the view's generation: a write to any family
+retires it, and a hit returns the bytes without running the view or a
+serializer. All of that costs one cache get_many plus one get.
+
+Writes that bypass model signals (queryset update(), raw SQL) call
+`invalidate(name)` to bump the view's generation for the current tenant.
+
+Without a shared cache (versioning.shared()) views run uncached: a worker
+would keep serving its own entry after another worker's write.
+"""
+
+from functools import wraps
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from . import versioning
+
+
+def generation_key(name, schema_name=None):
+    return f'api_cache:gen:{schema_name or connection.schema_name}:{name}'
+
+
+def invalidate(name, schema_name=None):
+    """Retire every cached response of view `name` for a tenant (the current one by default)."""
+    key = generation_key(name, schema_name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Start from a timestamp so an evicted generation never reuses an old number
+        cache.set(key, time.time_ns(), None)
+
+
+def _normalized_query(request, params):
+    items = sorted(
+        (key, values) for key, values in request.query_params.lists()
+        if params is None or key in params
+    )
+    return '&'.join(f'{key}={value}' for key, values in items for value in values)
+
+
+def response_key(request, name, families=(), per_user=False, params=None, kwargs=None):
+    """Return (cache key, negotiated renderer), or (None, None) when the response must not be cached."""
+    renderer = getattr(request, 'accepted_renderer', None)
+    # The browsable API embeds the user and a CSRF token; only cache data formats
+    if renderer is None or renderer.media_type.startswith('text/html'):
+        return None, None
+
+    keys = versioning.version_keys(*families)
+    gen_key = generation_key(name)
+    found = cache.get_many([*keys, gen_key])
+    if any(key not in found for key in keys):
+        versions = versioning.get_versions(*families)
+    else:
+        versions = {keys[key]: found[key] for key in keys}
+
+    parts = [
+        request.get_host(),
+        renderer.format,
+        '&'.join(f'{k}={v}' for k, v in sorted((kwargs or {}).items())),
+        _normalized_query(request, params),
+        *(f'{family}={versions[family]}' for family in families),
+        f'gen={found.get(gen_key, 0)}',
+    ]
+    user_part = '-'
+    if per_user:
+        user = getattr(request, 'user', None)
+        user_part = str(user.pk) if user is not None and user.is_authenticated else 'anon'
+    digest = hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+    return f'api_cache:{connection.schema_name}:{name}:{user_part}:{digest}', renderer
+
+
+def cache_response(name, families=(), per_user=False, params=None, timeout=None, max_age=0):
+    """
+    Cache the rendered 200 responses of a DRF function view.
+
+    `families` are the data version families the response depends on;
+    per_user=True keys entries by user for views whose output depends on
+    who asks; `params` restricts the query parameters that take part in the
+    key (default: all). Entries live for `timeout` seconds (default
+    API_RESPONSE_CACHE_TTL). Responses carry `Cache-Control: private,
+    max-age=<max_age>`, `Vary: Accept, Authorization, Cookie` and
+    `X-Cache: HIT|MISS`.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or not versioning.shared():
+                return view_func(request, *args, **kwargs)
+            key, renderer = response_key(request, name, families, per_user, params, kwargs)
+            if key is None:
+                return view_func(request, *args, **kwargs)
+
+            entry = cache.get(key)
+            if entry is None:
+                response = view_func(request, *args, **kwargs)
+                if response.status_code != 200 or not hasattr(response, 'data'):
+                    return response
+                content = renderer.render(
+                    response.data, request.accepted_media_type, {'request': request, 'response': response}
+                )
+                entry = (response.status_code, renderer.media_type, content)
+                ttl = timeout if timeout is not None else getattr(settings, 'API_RESPONSE_CACHE_TTL', 300)
+                cache.set(key, entry, ttl)
+                hit = 'MISS'
+            else:
+                hit = 'HIT'
+
+            status_code, content_type, content = entry
+            response = HttpResponse(content, status=status_code, content_type=content_type)
+            response['X-Cache'] = hit
+            patch_cache_control(response, private=True, max_age=max_age)
+            patch_vary_headers(response, ('Accept', 'Authorization', 'Cookie'))
+            return response
+        return wrapper
+    return decorator
@@ -4,13 +4,79 @@ API serializers for common app models and utilities.
 
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db.models.query import QuerySet
 from .models import SystemSetting
 
 
 User = get_user_model()
 
 
-class SystemSettingSerializer(serializers.ModelSerializer):
+def _field_names(serializer_class):
+    meta = getattr(serializer_class, 'Meta', None)
+    return tuple(getattr(meta, 'fields', None) or serializer_class._declared_fields)
+
+
+class SparseFieldsMixin:
+    """Serializer that only builds the fields selected by `?fields=a,b` / `?exclude=c`.
+
+    Dropped fields are never evaluated, so their SerializerMethodField work
+    does not run. Views call `selected_fields(request)` before querying to
+    skip the joins and counts behind fields that will not be rendered.
+    Unknown field names are a 400.
+    """
+
+    @classmethod
+    def selected_fields(cls, request):
+        names = _field_names(cls)
+        params = getattr(request, 'query_params', None) or {}
+        fields = [f for f in params.get('fields', '').split(',') if f]
+        exclude = [f for f in params.get('exclude', '').split(',') if f]
+        unknown = set(fields + exclude) - set(names)
+        if unknown:
+            raise serializers.ValidationError({'fields': f'Unknown field(s): {", ".join(sorted(unknown))}'})
+        selected = set(fields) if fields else set(names)
+        return selected - set(exclude)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is not None:
+            selected = self.selected_fields(request)
+            for name in set(self.fields) - selected:
+                self.fields.pop(name)
+
+
+class FastReadMixin:
+    """Read-only fast path: `Serializer.fast(rows)` instead of `Serializer(rows).data`.
+
+    Maps `values()` rows (or plain dicts) straight to output dicts holding
+    the serializer's field names, without instantiating field objects or
+    calling to_representation. Values keep their Python types (datetime,
+    Decimal, UUID), so render with ORJSONRenderer, which converts them as
+    DRF's encoder would. Unlike the field path, aware datetimes are emitted
+    as stored (UTC, "Z") rather than shifted to TIME_ZONE, and numbers are
+    not coerced (an int stays an int). Only suitable for serializers whose
+    fields are plain columns or keys: no SerializerMethodField, source= or
+    nested serializers.
+    """
+
+    @classmethod
+    def field_names(cls):
+        return _field_names(cls)
+
+    @classmethod
+    def fast(cls, source, many=False, fields=None):
+        """`fields` narrows the output to a subset (e.g. SparseFieldsMixin.selected_fields())."""
+        names = [name for name in cls.field_names() if fields is None or name in fields]
+        if isinstance(source, QuerySet):
+            rows = source.values(*names)
+            return list(rows) if many else rows.first()
+        if many:
+            return [{name: row.get(name) for name in names} for row in source]
+        return {name: source.get(name) for name in names}
+
+
+class SystemSettingSerializer(FastReadMixin, serializers.ModelSerializer):
     """Serializer for system settings with validation."""
     
     class Meta:
@@ -38,8 +104,14 @@ class SystemSettingSerializer(serializers.ModelSerializer):
         return value
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
-    """Serializer for user profile information."""
+class UserProfileSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Serializer for user profile information.
+
+    For lists, build the queryset with `with_subscriptions()` and pass
+    `tenant_count` in the context: the serializer then only reads the
+    prefetched/precomputed values and a page costs the same number of
+    queries whatever its size.
+    """
     
     subscription_status = serializers.SerializerMethodField()
     tenant_count = serializers.SerializerMethodField()
@@ -51,18 +123,37 @@ class UserProfileSerializer(serializers.ModelSerializer):
             'subscription_status', 'tenant_count'
         ]
         read_only_fields = ['id', 'email', 'date_joined']
+
+    @staticmethod
+    def with_subscriptions(queryset):
+        """Prefetch each user's current subscriptions (and plans) in one query."""
+        from django.db.models import Prefetch
+        from apps.billing.models import Subscription
+        from datetime import date
+
+        current = (
+            Subscription.objects.filter(active=True, end_date__gte=date.today())
+            .select_related('plan').order_by('pk')
+        )
+        return queryset.prefetch_related(
+            Prefetch('subscription_set', queryset=current, to_attr='current_subscriptions')
+        )
+
+    @staticmethod
+    def count_tenants():
+        """Number of tenants associated with a user (the same for every user)."""
+        from apps.tenants.models import Client
+        # This is a simplified count - in reality, you'd need to check
+        # which tenants the user has access to
+        return Client.objects.filter(is_active=True).count()
     
     def get_subscription_status(self, obj):
         """Get user's current subscription status."""
         try:
-            from apps.billing.models import Subscription
-            from datetime import date
-            
-            active_sub = Subscription.objects.filter(
-                user=obj, 
-                active=True,
-                end_date__gte=date.today()
-            ).first()
+            current = getattr(obj, 'current_subscriptions', None)
+            if current is None:
+                current = self.with_subscriptions(User.objects.filter(pk=obj.pk))[0].current_subscriptions
+            active_sub = current[0] if current else None
             
             if active_sub:
                 return {
@@ -78,15 +169,14 @@ class UserProfileSerializer(serializers.ModelSerializer):
     def get_tenant_count(self, obj):
         """Get number of tenants associated with user."""
         try:
-            from apps.tenants.models import Client
-            # This is a simplified count - in reality, you'd need to check
-            # which tenants the user has access to
-            return Client.objects.filter(is_active=True).count()
+            if 'tenant_count' not in self.context:
+                self.context['tenant_count'] = self.count_tenants()
+            return self.context['tenant_count']
         except:
             return 0
 
 
-class TenantInfoSerializer(serializers.Serializer):
+class TenantInfoSerializer(SparseFieldsMixin, FastReadMixin, serializers.Serializer):
     """Serializer for tenant information (not model-based)."""
     
     schema_name = serializers.CharField(read_only=True)
@@ -125,23 +215,50 @@ class HealthCheckSerializer(serializers.Serializer):
 
 
 class BulkOperationSerializer(serializers.Serializer):
-    """Serializer for bulk operations on multiple objects."""
+    """Serializer for bulk operations on multiple objects.
+
+    `create` takes `objects` (one dict of field values each); the other
+    operations take `object_ids`, and `update` the field values in `data`.
+    Both lists are capped at BULK_OPERATION_MAX_IDS entries.
+    """
     
     operation = serializers.ChoiceField(
         choices=['create', 'update', 'delete', 'activate', 'deactivate']
     )
     object_ids = serializers.ListField(
         child=serializers.IntegerField(),
-        min_length=1,
-        max_length=100
+        required=False
     )
     data = serializers.DictField(required=False)
+    objects = serializers.ListField(
+        child=serializers.DictField(),
+        required=False
+    )
+
+    @staticmethod
+    def _check_length(value):
+        from .bulk import max_ids
+
+        if len(value) > max_ids():
+            raise serializers.ValidationError(f"At most {max_ids()} entries per request")
+        return value
     
     def validate_object_ids(self, value):
         """Validate that object IDs are unique."""
         if len(value) != len(set(value)):
             raise serializers.ValidationError("Object IDs must be unique")
-        return value
+        return self._check_length(value)
+
+    def validate_objects(self, value):
+        return self._check_length(value)
+
+    def validate(self, attrs):
+        if attrs['operation'] == 'create':
+            if not attrs.get('objects'):
+                raise serializers.ValidationError({'objects': 'create requires at least one object'})
+        elif not attrs.get('object_ids'):
+            raise serializers.ValidationError({'object_ids': f"{attrs['operation']} requires at least one ID"})
+        return attrs
 
 
 class PaginationInfoSerializer(serializers.Serializer):
@@ -165,7 +282,7 @@ class ErrorDetailSerializer(serializers.Serializer):
     request_id = serializers.CharField(read_only=True, required=False)
 
 
-class MetricsSerializer(serializers.Serializer):
+class MetricsSerializer(FastReadMixin, serializers.Serializer):
     """Serializer for application metrics and KPIs."""
     
     metric_name = serializers.CharField(read_only=True)
@@ -1,3 +1,583 @@
-from django.test import TestCase
+from asgiref.sync import sync_to_async
+from django.test import TestCase, RequestFactory, override_settings
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
+from apps.billing.models import Payment, Plan
+from apps.dashboard.models import Project
+from apps.tenants.models import Client, Domain
+from . import authentication, counting, health, metrics, ratelimit, versioning
+from .response_cache import cache_response, invalidate
+from .renderers import ORJSONRenderer
+from .serializers import TenantInfoSerializer
+from .models import RowCount, SystemSetting
+from .middleware import RateLimitMiddleware
+from types import SimpleNamespace
+from unittest import mock
+from datetime import date, timedelta
+from decimal import Decimal
+from rest_framework.renderers import JSONRenderer
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.settings import api_settings
+import csv
+import json
+import uuid
+import os
+import tempfile
+import time
 
-# Create your tests here.
+
+class BulkCreateTenantsCommandTests(TestCase):
+    def test_bulk_create_is_idempotent(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'tenants.csv')
+            with open(path, 'w', newline='') as f:
+                f.write('name,schema_name,domain\n')
+                f.write('Acme,acme,acme.localhost\n')
+                f.write('Bad,Bad-Name,\n')
+
+            call_command('bulk_create_tenants', path, workers=1, verbosity=0)
+            self.assertTrue(Client.objects.filter(schema_name='acme').exists())
+            self.assertTrue(Domain.objects.filter(domain='acme.localhost', is_primary=True).exists())
+
+            # Second run reports the existing tenant instead of failing
+            call_command('bulk_create_tenants', path, workers=1, verbosity=0)
+            with open(f'{path}.report.csv', newline='') as f:
+                statuses = {row['schema_name']: row['status'] for row in csv.DictReader(f)}
+            self.assertEqual(statuses, {'acme': 'exists', 'bad-name': 'invalid'})
+
+    def test_malformed_jsonl_lines_are_reported_per_row(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'tenants.jsonl')
+            with open(path, 'w') as f:
+                f.write('{"name": "Jsonco", "schema_name": "jsonco"}\n')
+                f.write('{"name": "Broken"\n')
+                f.write('["not", "an", "object"]\n')
+
+            call_command('bulk_create_tenants', path, workers=1, verbosity=0)
+            self.assertTrue(Client.objects.filter(schema_name='jsonco').exists())
+            with open(f'{path}.report.csv', newline='') as f:
+                statuses = {row['line']: (row['status'], row['message']) for row in csv.DictReader(f)}
+            self.assertEqual(statuses['1'], ('created', ''))
+            self.assertEqual(statuses['2'][0], 'invalid')
+            self.assertTrue(statuses['2'][1].startswith('Invalid JSON'))
+            self.assertEqual(statuses['3'], ('invalid', 'Record must be a JSON object'))
+
+
+class RateLimitMiddlewareTests(TestCase):
+    def setUp(self) -> None:
+        ratelimit._policies.clear()
+        ratelimit._local_buckets.clear()
+
+    @override_settings(RATE_LIMIT_DEFAULT_PER_MINUTE=2)
+    def test_exhausted_bucket_returns_429_with_retry_after(self):
+        middleware = RateLimitMiddleware(lambda request: HttpResponse('ok'))
+        request = RequestFactory().get('/')
+        request.tenant = SimpleNamespace(schema_name='rl_tenant', plan_id=None)
+
+        self.assertEqual(middleware(request).status_code, 200)
+        self.assertEqual(middleware(request).status_code, 200)
+        resp = middleware(request)
+        self.assertEqual(resp.status_code, 429)
+        self.assertGreaterEqual(int(resp['Retry-After']), 1)
+
+        counters = {c['route_class']: c for c in ratelimit.get_counters() if c['schema_name'] == 'rl_tenant'}
+        self.assertEqual((counters['web']['allowed'], counters['web']['limited']), (2, 1))
+
+
+class AnalyticsSeriesApiTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = get_user_model().objects.create_user(email="series@example.com", password="pass1234")
+        self.client.force_login(self.user)
+
+    def test_columnar_series_and_conditional_get(self):
+        older = Payment.objects.create(user=self.user, amount=10)
+        Payment.objects.create(user=self.user, amount=5)
+        url = reverse("api:analytics_series")
+
+        resp = self.client.get(url, {"metric": "revenue", "granularity": "month"})
+        self.assertEqual(resp.status_code, 200)
+        data = resp.json()
+        self.assertEqual(len(data["t"]), len(data["v"]))
+        self.assertEqual(data["v"][-1], 15.0)
+        self.assertNotIn("Last-Modified", resp)
+        etag = resp["ETag"]
+
+        resp = self.client.get(url, {"metric": "revenue", "granularity": "month"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            older.delete()
+        resp = self.client.get(url, {"metric": "revenue", "granularity": "month"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["v"][-1], 5.0)
+
+        self.assertEqual(self.client.get(url, {"granularity": "hour"}).status_code, 400)
+
+
+@override_settings(CACHE_IS_SHARED=True)
+class ConditionalOnDataTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = get_user_model().objects.create_user(email="etag@example.com", password="pass1234")
+        self.client.force_login(self.user)
+
+    def test_unchanged_page_returns_304_until_family_is_bumped(self):
+        url = reverse("billing:plans")
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        etag = resp["ETag"]
+
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp.content, b"")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Plan.objects.create(name="Etag", price=1)
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp["ETag"], etag)
+
+    def test_no_304_without_shared_cache(self):
+        url = reverse("billing:plans")
+        with self.settings(CACHE_IS_SHARED=False):
+            resp = self.client.get(url)
+            self.assertEqual(resp.status_code, 200)
+            self.assertNotIn("ETag", resp)
+
+    def test_versions_are_monotonic(self):
+        before = versioning.get_versions("plans")["plans"]
+        with self.captureOnCommitCallbacks(execute=True):
+            versioning.bump("plans")
+        self.assertGreater(versioning.get_versions("plans")["plans"], before)
+        with self.assertRaises(ValueError):
+            versioning.get_versions("nope")
+
+
+class RowCountingTests(TestCase):
+    def test_counter_follows_inserts_and_deletes(self):
+        User = get_user_model()
+        base = counting.recount(User)
+        user = User.objects.create_user(email="count@example.com", password="pass1234")
+        self.assertEqual(counting.count(User), base + 1)
+        slots = RowCount.objects.filter(key__in=counting._slot_keys(User))
+        self.assertEqual(sum(slots.values_list("rows", flat=True)), base + 1)
+        user.delete()
+        self.assertEqual(counting.count(User), base)
+
+    def test_missing_counter_falls_back_without_creating_it(self):
+        User = get_user_model()
+        self.assertEqual(counting.count(User), User.objects.count())
+        self.assertFalse(RowCount.objects.filter(key__startswith=counting._key(User)).exists())
+
+    def test_recount_repairs_drift_and_estimates_are_available(self):
+        User = get_user_model()
+        counting.recount(User)
+        counting.add(User, 5)
+        self.assertEqual(counting.count(User), User.objects.count() + 5)
+        self.assertEqual(counting.recount(User), User.objects.count())
+        self.assertIsInstance(counting.count(User, counting.ESTIMATED), int)
+        with self.assertRaises(ValueError):
+            counting.count(User, "roughly")
+
+
+class MetricsEndpointTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_openmetrics_snapshot_is_shared_until_interval(self):
+        staff = get_user_model().objects.create_user(email="ops@example.com", password="pass1234", is_staff=True)
+        self.client.force_login(staff)
+        metrics.observe_request("GET", 200, 0.02)
+        metrics.publish()
+
+        resp = self.client.get(reverse("common:metrics"))
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp["Content-Type"].startswith("application/openmetrics-text"))
+        body = resp.content.decode()
+        self.assertIn('saas_http_request_duration_seconds_bucket{method="GET",status="2xx",le="0.025"}', body)
+        self.assertIn("saas_total_users 1", body)
+        self.assertTrue(body.endswith("# EOF\n"))
+
+        built_at = cache.get(metrics.SNAPSHOT_KEY)["built_at"]
+        self.client.get(reverse("common:metrics"))
+        self.assertEqual(cache.get(metrics.SNAPSHOT_KEY)["built_at"], built_at)
+
+    def test_requires_token_or_staff(self):
+        self.assertEqual(self.client.get(reverse("common:metrics")).status_code, 403)
+        with override_settings(METRICS_TOKEN="s3cret"):
+            resp = self.client.get(reverse("common:metrics"), HTTP_AUTHORIZATION="Bearer s3cret")
+            self.assertEqual(resp.status_code, 200)
+            resp = self.client.get(reverse("common:metrics"), HTTP_AUTHORIZATION="Bearer nope")
+            self.assertEqual(resp.status_code, 403)
+            # Scrapes by pod IP skip the tenant domain lookup
+            resp = self.client.get(reverse("common:metrics"), HTTP_AUTHORIZATION="Bearer s3cret", HTTP_HOST="127.0.0.1")
+            self.assertEqual(resp.status_code, 200)
+
+    def test_failed_business_source_is_reported_not_fatal(self):
+        with mock.patch.object(metrics, "business_gauges", side_effect=RuntimeError("db down")):
+            snapshot = metrics.build_snapshot()
+        self.assertEqual(snapshot["business"], {})
+        self.assertIn('saas_metrics_source_errors{source="business"} 1', snapshot["text"])
+        self.assertTrue(snapshot["text"].endswith("# EOF\n"))
+
+
+class HealthProbeTests(TestCase):
+    def setUp(self) -> None:
+        health._memo.clear()
+
+    def test_livez_and_readyz(self):
+        resp = self.client.get(reverse("common:livez"), HTTP_HOST="127.0.0.1")
+        self.assertEqual(resp.status_code, 200)
+        resp = self.client.get(reverse("common:readyz"))
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.json()["ready"])
+
+    def test_checks_are_concurrent_memoized_and_time_out(self):
+        calls = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(1)
+
+        with self.settings(HEALTH_CHECK_CACHE_SECONDS=60):
+            health.CHECKS["slow"] = slow
+            try:
+                results = health.run_checks(["cache", "slow"], timeout=0.2)
+                self.assertTrue(results["cache"]["healthy"])
+                self.assertFalse(results["slow"]["healthy"])
+                self.assertIs(health.run_checks(["slow", "cache"], timeout=0.2), results)
+                self.assertEqual(len(calls), 1)
+            finally:
+                del health.CHECKS["slow"]
+
+
+# Usage flushes would add queries to whichever request happens to trigger them
+@override_settings(TENANT_USAGE_ENABLED=False)
+class UsersApiTests(TestCase):
+    def setUp(self) -> None:
+        User = get_user_model()
+        self.staff = User.objects.create_user(email="admin-list@example.com", password="pass1234", is_staff=True)
+        # The post_save signal gives each user a trial subscription
+        for i in range(12):
+            User.objects.create_user(email=f"member{i}@example.com", password="pass1234")
+        self.client.force_login(self.staff)
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        url = reverse("api:users")
+        self.client.get(url, {"page_size": 1})  # warm session/auth lookups
+        with CaptureQueriesContext(connection) as small:
+            resp = self.client.get(url, {"page_size": 2})
+        with CaptureQueriesContext(connection) as large:
+            resp = self.client.get(url, {"page_size": 13})
+        self.assertEqual(len(small), len(large))
+
+        data = resp.json()
+        self.assertEqual(data["count"], 13)
+        self.assertEqual(len(data["results"]), 13)
+        member = next(r for r in data["results"] if r["email"] == "member0@example.com")
+        self.assertEqual(member["subscription_status"]["plan_name"], "Free Trial")
+
+    def test_requires_staff(self):
+        self.client.force_login(get_user_model().objects.get(email="member0@example.com"))
+        self.assertEqual(self.client.get(reverse("api:users")).status_code, 403)
+
+
+@override_settings(TENANT_USAGE_ENABLED=False)
+class SystemSettingApiTests(TestCase):
+    def setUp(self) -> None:
+        staff = get_user_model().objects.create_user(email="admin-settings@example.com", password="pass1234", is_staff=True)
+        SystemSetting.objects.bulk_create(
+            [SystemSetting(key=f"feature_{i:02d}", value="on") for i in range(5)]
+            + [SystemSetting(key="ratelimit_default", value="60", description="Requests per minute")]
+        )
+        self.client.force_login(staff)
+
+    def test_list_is_cursor_paginated_by_key(self):
+        url = reverse("api:system-setting-list")
+        first = self.client.get(url, {"page_size": 4}).json()
+        self.assertEqual([s["key"] for s in first["results"]], ["feature_00", "feature_01", "feature_02", "feature_03"])
+        second = self.client.get(first["next"]).json()
+        self.assertEqual([s["key"] for s in second["results"]], ["feature_04", "ratelimit_default"])
+        self.assertIsNone(second["next"])
+
+    def test_search_matches_key_or_description(self):
+        data = self.client.get(reverse("api:system-setting-list"), {"q": "PER MIN"}).json()
+        self.assertEqual([s["key"] for s in data["results"]], ["ratelimit_default"])
+
+    def test_prefix_and_exact_lookup(self):
+        data = self.client.get(reverse("api:system-setting-prefix"), {"q": "feature_0"}).json()
+        self.assertEqual(len(data["results"]), 5)
+        resp = self.client.get(reverse("api:system-setting-by-key", args=["ratelimit_default"]))
+        self.assertEqual(resp.json()["value"], "60")
+        resp = self.client.get(reverse("api:system-setting-by-key", args=["missing"]))
+        self.assertEqual(resp.status_code, 404)
+
+
+class FastRenderingTests(TestCase):
+    def test_orjson_output_matches_drf_encoder(self) -> None:
+        payload = {
+            "at": timezone.now(), "day": date(2024, 5, 1), "amount": Decimal("9.90"), "id": uuid.uuid4(),
+            "elapsed": timedelta(seconds=2), "nested": [{"n": None, "ok": True}], 3: "int key",
+        }
+        self.assertEqual(json.loads(ORJSONRenderer().render(payload)), json.loads(JSONRenderer().render(payload)))
+
+    def test_fast_serializer_picks_declared_fields(self) -> None:
+        row = {"schema_name": "acme", "name": "Acme", "domain_count": 2, "extra": "dropped"}
+        data = TenantInfoSerializer.fast(row)
+        self.assertEqual(set(data), set(TenantInfoSerializer().fields))
+        self.assertEqual(data["domain_count"], 2)
+        self.assertIsNone(data["user_count"])
+
+    def test_fast_view_renders_json(self) -> None:
+        self.client.force_login(get_user_model().objects.create_user(email="fast@example.com", password="pass1234"))
+        resp = self.client.get(reverse("api:tenant_info"), HTTP_ACCEPT="application/json")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["Content-Type"], "application/json")
+        self.assertEqual(resp.json()["schema_name"], "public")
+
+
+@override_settings(CACHE_IS_SHARED=True)
+class ResponseCacheTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.calls = 0
+
+        @api_view(["GET"])
+        @cache_response("cached_view", families=("plans",), params=("q",))
+        def view(request):
+            self.calls += 1
+            return Response({"calls": self.calls, "q": request.query_params.get("q")})
+
+        self.view = view
+        self.factory = APIRequestFactory()
+
+    def get(self, **params):
+        return self.view(self.factory.get("/cached/", params))
+
+    def test_hit_skips_view_until_invalidated(self) -> None:
+        first = self.get(q="a")
+        self.assertEqual(first["X-Cache"], "MISS")
+        second = self.get(q="a", _="ignored")
+        self.assertEqual((second["X-Cache"], second.content), ("HIT", first.content))
+        self.assertIn("private", second["Cache-Control"])
+        self.assertIn("Accept", second["Vary"])
+        self.assertEqual(self.get(q="b")["X-Cache"], "MISS")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            versioning.bump("plans")
+        self.assertEqual(self.get(q="a")["X-Cache"], "MISS")
+        invalidate("cached_view")
+        self.assertEqual(json.loads(self.get(q="a").content)["calls"], 4)
+
+    def test_uncached_without_shared_cache(self) -> None:
+        with self.settings(CACHE_IS_SHARED=False):
+            self.get(q="a")
+            response = self.get(q="a")
+        self.assertNotIn("X-Cache", response)
+        self.assertEqual(self.calls, 2)
+
+
+@override_settings(TENANT_USAGE_ENABLED=False, BULK_OPERATION_CHUNK_SIZE=2)
+class BulkOperationApiTests(TestCase):
+    def setUp(self) -> None:
+        User = get_user_model()
+        self.staff = User.objects.create_user(email="admin-bulk@example.com", password="pass1234", is_staff=True)
+        self.staff.user_permissions.add(*Permission.objects.filter(content_type__app_label__in=["users", "billing", "dashboard"]))
+        self.members = [User.objects.create_user(email=f"bulk{i}@example.com", password="pass1234") for i in range(3)]
+        self.client.force_login(self.staff)
+
+    def post(self, target, payload):
+        return self.client.post(reverse("api:bulk_operation", args=[target]), payload, content_type="application/json")
+
+    def test_deactivate_reports_each_id_and_skips_self(self) -> None:
+        ids = [u.pk for u in self.members] + [self.staff.pk, 999999]
+        data = self.post("users", {"operation": "deactivate", "object_ids": ids}).json()
+        self.assertEqual(data["summary"], {"deactivated": 3, "skipped": 1, "not_found": 1})
+        self.assertEqual(get_user_model().objects.filter(is_active=False).count(), 3)
+
+    def test_delete_adjusts_row_counter_once(self) -> None:
+        before = counting.recount(get_user_model())
+        ids = [u.pk for u in self.members]
+        self.assertEqual(self.post("users", {"operation": "delete", "object_ids": ids}).json()["summary"], {"deleted": 3})
+        self.assertEqual(counting.count(get_user_model()), before - 3)
+
+    def test_create_and_update_plans(self) -> None:
+        data = self.post("plans", {"operation": "create", "objects": [
+            {"name": "Team", "price": "19.00"}, {"name": "Scale", "price": "99.00"},
+        ]}).json()
+        ids = [r["id"] for r in data["results"]]
+        self.post("plans", {"operation": "update", "object_ids": ids, "data": {"price": "49.00"}})
+        self.assertEqual(set(Plan.objects.filter(pk__in=ids).values_list("price", flat=True)), {Decimal("49.00")})
+
+    def test_requires_model_permission_and_protects_superusers(self) -> None:
+        User = get_user_model()
+        root = User.objects.create_superuser(email="root-bulk@example.com", password="pass1234")
+        ids = [root.pk, self.members[0].pk]
+        data = self.post("users", {"operation": "deactivate", "object_ids": ids}).json()
+        self.assertEqual(data["summary"], {"deactivated": 1, "skipped": 1})
+        self.assertTrue(User.objects.get(pk=root.pk).is_active)
+        resp = self.post("users", {"operation": "update", "object_ids": ids, "data": {"is_staff": True}})
+        self.assertEqual(resp.status_code, 403)
+
+        self.client.force_login(User.objects.create_user(email="plain-staff@example.com", password="pass1234", is_staff=True))
+        self.assertEqual(self.post("plans", {"operation": "delete", "object_ids": [1]}).status_code, 403)
+
+    def test_invalid_requests_are_rejected(self) -> None:
+        self.assertEqual(self.post("projects", {"operation": "activate", "object_ids": [1]}).status_code, 400)
+        self.assertEqual(self.post("plans", {"operation": "update", "object_ids": [1], "data": {"id": 5}}).status_code, 400)
+        self.assertEqual(self.post("widgets", {"operation": "delete", "object_ids": [1]}).status_code, 404)
+
+
+@override_settings(TENANT_USAGE_ENABLED=False, CACHE_IS_SHARED=True)
+class JWTAuthenticationTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        get_user_model().objects.create_user(email="jwt@example.com", password="pass1234", is_staff=True)
+        resp = self.client.post(reverse("api:token_obtain"), {"email": "jwt@example.com", "password": "pass1234"})
+        self.tokens = resp.json()
+
+    def bearer(self, token=None):
+        return {"HTTP_AUTHORIZATION": f"Bearer {token or self.tokens['access']}"}
+
+    def test_token_requests_need_no_session_or_user_query(self) -> None:
+        url = reverse("api:projects")
+        self.assertEqual(self.client.get(url, **self.bearer()).status_code, 200)
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(url, **self.bearer())
+        self.assertEqual(resp["X-Cache"], "HIT")
+        sql = " ".join(q["sql"] for q in queries)
+        self.assertNotIn("django_session", sql)
+        self.assertNotIn("users_user", sql)
+
+    def test_non_staff_token_lists_own_projects(self) -> None:
+        User = get_user_model()
+        member = User.objects.create_user(email="jwt-member@example.com", password="pass1234")
+        other = User.objects.create_user(email="jwt-other@example.com", password="pass1234")
+        Project.objects.create(name="Mine", owner=member, tenant_schema_name=connection.schema_name)
+        Project.objects.create(name="Theirs", owner=other, tenant_schema_name=connection.schema_name)
+        access = self.client.post(
+            reverse("api:token_obtain"), {"email": "jwt-member@example.com", "password": "pass1234"}
+        ).json()["access"]
+
+        resp = self.client.get(reverse("api:projects"), **self.bearer(access))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([row["name"] for row in resp.json()["results"]], ["Mine"])
+
+    def test_refresh_and_revoke(self) -> None:
+        self.assertEqual(self.client.post(reverse("api:token_obtain"), {"email": "jwt@example.com", "password": "x"}).status_code, 401)
+        access = self.client.post(reverse("api:token_refresh"), {"refresh": self.tokens["refresh"]}).json()["access"]
+        self.assertEqual(self.client.get(reverse("api:users"), **self.bearer(access)).status_code, 200)
+
+        self.assertEqual(self.client.post(reverse("api:token_revoke"), **self.bearer()).status_code, 204)
+        self.assertEqual(self.client.get(reverse("api:users"), **self.bearer(access)).status_code, 401)
+        self.assertEqual(self.client.post(reverse("api:token_refresh"), {"refresh": self.tokens["refresh"]}).status_code, 401)
+
+    def test_password_change_revokes_earlier_tokens(self) -> None:
+        user = get_user_model().objects.get(email="jwt@example.com")
+        user.full_name = "JWT"
+        user.save()
+        user.refresh_from_db()
+        self.assertIsNone(user.tokens_revoked_at)
+
+        user.set_password("new-pass1234")
+        user.save()
+        user.refresh_from_db()
+        self.assertEqual(self.client.get(reverse("api:users"), **self.bearer()).status_code, 401)
+        self.assertEqual(self.client.post(reverse("api:token_refresh"), {"refresh": self.tokens["refresh"]}).status_code, 401)
+
+        # Millisecond precision: only tokens issued after the change survive, even within the same second
+        revoked_ms = authentication._epoch_ms(user.tokens_revoked_at)
+        claims = {"sid": "family", api_settings.USER_ID_CLAIM: user.pk}
+        for issued_ms, revoked in ((revoked_ms, True), (revoked_ms + 1, False)):
+            token = {**claims, "iat": issued_ms // 1000, "iat_ms": issued_ms}
+            self.assertEqual(authentication.is_revoked(token), revoked)
+            self.assertEqual(authentication.is_refresh_revoked(token, user), revoked)
+
+    def test_revocation_is_durable_without_shared_cache(self) -> None:
+        with self.settings(CACHE_IS_SHARED=False):
+            self.assertEqual(self.client.post(reverse("api:token_revoke"), **self.bearer()).status_code, 204)
+            self.assertEqual(self.client.post(reverse("api:token_refresh"), {"refresh": self.tokens["refresh"]}).status_code, 401)
+
+            tokens = self.client.post(reverse("api:token_obtain"), {"email": "jwt@example.com", "password": "pass1234"}).json()
+            self.assertEqual(self.client.post(reverse("api:token_revoke"), {"all": True}, **self.bearer(tokens["access"])).status_code, 204)
+            self.assertEqual(self.client.post(reverse("api:token_refresh"), {"refresh": tokens["refresh"]}).status_code, 401)
+
+
+@override_settings(TENANT_USAGE_ENABLED=False)
+class SparseFieldsetTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.staff = get_user_model().objects.create_user(email="sparse@example.com", password="pass1234", is_staff=True)
+        self.client.force_login(self.staff)
+
+    def get_sql(self, name, params):
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(reverse(name), params)
+        self.assertEqual(resp.status_code, 200)
+        return resp.json(), " ".join(q["sql"] for q in queries)
+
+    def test_cheap_fields_skip_computed_work(self) -> None:
+        data, sql = self.get_sql("api:user_profile", {"fields": "id,email"})
+        self.assertEqual(data, {"id": self.staff.pk, "email": "sparse@example.com"})
+        self.assertNotIn("billing_subscription", sql)
+        self.assertNotIn("tenants_client", sql)
+
+        data, sql = self.get_sql("api:users", {"exclude": "subscription_status,tenant_count"})
+        self.assertNotIn("subscription_status", data["results"][0])
+        self.assertNotIn("billing_subscription", sql)
+
+    def test_unknown_field_is_rejected(self) -> None:
+        self.assertEqual(self.client.get(reverse("api:user_profile"), {"fields": "password"}).status_code, 400)
+        self.assertEqual(self.client.get(reverse("api:tenant_info"), {"fields": "bogus"}).status_code, 400)
+
+
+@override_settings(TENANT_USAGE_ENABLED=False)
+class AsyncEndpointTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        health._memo.clear()
+        User = get_user_model()
+        User.objects.create_user(email="async-staff@example.com", password="pass1234", is_staff=True)
+        User.objects.create_user(email="async-member@example.com", password="pass1234")
+
+    def bearer(self, email):
+        resp = self.client.post(reverse("api:token_obtain"), {"email": email, "password": "pass1234"})
+        return {"AUTHORIZATION": f"Bearer {resp.json()['access']}"}
+
+    async def test_status_and_health(self) -> None:
+        resp = await self.async_client.get(reverse("api:status"))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["status"], "OK")
+
+        self.assertEqual((await self.async_client.get(reverse("api:health"))).status_code, 401)
+        headers = await sync_to_async(self.bearer)("async-member@example.com")
+        resp = await self.async_client.get(reverse("api:health"), headers=headers)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(set(resp.json()["checks"]), set(health.CHECKS))
+        resp = await self.async_client.get(reverse("api:health"), {"component": "nope"}, headers=headers)
+        self.assertEqual(resp.status_code, 400)
+
+    async def test_cache_stats_requires_staff(self) -> None:
+        headers = await sync_to_async(self.bearer)("async-member@example.com")
+        self.assertEqual((await self.async_client.get(reverse("api:cache_stats"), headers=headers)).status_code, 403)
+        headers = await sync_to_async(self.bearer)("async-staff@example.com")
+        resp = await self.async_client.get(reverse("api:cache_stats"), headers=headers)
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("backend_type", resp.json())
+
+    @override_settings(TENANT_MEMO_SECONDS=60)
+    def test_known_host_skips_domain_lookup(self) -> None:
+        self.client.get(reverse("api:status"))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(reverse("api:status")).status_code, 200)
+        self.assertNotIn("tenants_domain", " ".join(q["sql"] for q in queries))
@@ -3,6 +3,9 @@ from .views import (
     system_settings_view,
     system_settings_create_view,
     system_settings_delete_view,
+    metrics_view,
+    livez_view,
+    readyz_view,
 )
 
 app_name = 'common'
@@ -11,6 +14,9 @@ urlpatterns = [
     path('system-settings/', system_settings_view, name='system_settings'),
     path('system-settings/create/', system_settings_create_view, name='system_settings_create'),
     path('system-settings/<int:pk>/delete/', system_settings_delete_view, name='system_settings_delete'),
+    path('metrics', metrics_view, name='metrics'),
+    path('livez', livez_view, name='livez'),
+    path('readyz', readyz_view, name='readyz'),
 ]
 
 
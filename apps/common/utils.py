@@ -1,3 +1,5 @@
+import zlib
+
 from django.conf import settings
 from django.core.cache import cache
 
@@ -28,3 +30,20 @@ def get_setting_cached(key: str, default: str | None = None) -> str | None:
 
     cache.set(cache_key, value, getattr(settings, 'SYSTEM_SETTINGS_CACHE_TTL', 600))
     return value
+
+
+def gzip_chunks(lines, chunk_size=64 * 1024):
+    """Gzip a stream of text lines into bytes chunks, for StreamingHttpResponse."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    pending, size = [], 0
+    for line in lines:
+        pending.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            data = compressor.compress(''.join(pending).encode('utf-8'))
+            pending, size = [], 0
+            if data:
+                yield data
+    if pending:
+        yield compressor.compress(''.join(pending).encode('utf-8'))
+    yield compressor.flush()
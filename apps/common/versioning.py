@@ -0,0 +1,158 @@
+"""
+Per-tenant data version vectors.
+
+Every model family in DATA_VERSION_FAMILIES has a version number in the cache
+per schema, bumped by post_save/post_delete of any of its models. Versions only
+move forward, so they can go straight into cache keys and ETags: a write
+retires everything derived from the old version without deleting anything.
+Reading any number of families is one get_many.
+
+Families of shared apps (SHARED_APPS only) are versioned under the public
+schema, because their tables live there whichever tenant wrote the row.
+Queryset update()/bulk_create() bypass signals; call bump() after those.
+Inside `deferred()` bumps are collected and each family is bumped once on
+exit, so set-based writes touching many rows invalidate once.
+
+A bump lands when the writer's transaction commits, never before: a reader
+that saw the new version while the rows were still uncommitted would cache
+the old rows under it until the next write.
+
+Versions are only as shared as the cache: with the default LocMemCache
+(no REDIS_URL) every process has its own, so a write in one worker does not
+retire anything another worker derived. Consumers that would otherwise serve
+stale data indefinitely (conditional GETs, cached API responses) check
+shared() and step aside when it is False.
+"""
+
+from contextlib import contextmanager
+import hashlib
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+from django.middleware.csrf import get_token
+from django.utils import timezone
+from django_tenants.utils import get_public_schema_name
+
+
+_families = None  # family -> is shared (versioned under public)
+_model_families = {}  # model -> [family, ...]
+_local = threading.local()
+
+
+def _registry():
+    global _families
+    if _families is None:
+        tenant_apps = set(getattr(settings, 'TENANT_APPS', ()))
+        families = {}
+        for family, labels in getattr(settings, 'DATA_VERSION_FAMILIES', {}).items():
+            models = [apps.get_model(label) for label in labels]
+            families[family] = all(m._meta.app_config.name not in tenant_apps for m in models)
+            for model in models:
+                _model_families.setdefault(model, []).append(family)
+        _families = families
+    return _families
+
+
+def _key(family):
+    try:
+        shared = _registry()[family]
+    except KeyError:
+        raise ValueError(f'Unknown data version family "{family}"')
+    schema_name = get_public_schema_name() if shared else connection.schema_name
+    return f'dataver:{schema_name}:{family}'
+
+
+def shared():
+    """True when versions are seen by every process (CACHE_IS_SHARED)."""
+    return getattr(settings, 'CACHE_IS_SHARED', False)
+
+
+def version_keys(*families):
+    """Return {cache key: family} for the current tenant, for callers batching their own get_many."""
+    return {_key(family): family for family in families}
+
+
+def get_versions(*families):
+    """Return {family: version} for the current tenant in one cache round trip."""
+    keys = version_keys(*families)
+    found = cache.get_many(list(keys))
+    missing = {key: time.time_ns() for key in keys if key not in found}
+    if missing:
+        # Start from a timestamp so an evicted version never reuses an old number
+        cache.set_many(missing, None)
+        found.update(missing)
+    return {keys[key]: version for key, version in found.items()}
+
+
+def families_of(model):
+    _registry()
+    return tuple(_model_families.get(model, ()))
+
+
+def _incr(keys):
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def bump(*families):
+    """Move `families` forward when the current transaction commits (at once in autocommit)."""
+    pending = getattr(_local, 'pending', None)
+    if pending is not None:
+        pending.update(families)
+        return
+    # Resolve keys now: the schema may have changed by the time the transaction commits
+    keys = [_key(family) for family in families]
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: _incr(keys))
+    else:
+        _incr(keys)
+
+
+@contextmanager
+def deferred():
+    """Collect bump() calls made in the block and bump each family once when it exits."""
+    if getattr(_local, 'pending', None) is not None:
+        yield
+        return
+    _local.pending = set()
+    try:
+        yield
+    finally:
+        families, _local.pending = _local.pending, None
+        bump(*families)
+
+
+def etag_for(request, families, per_user=True, daily=False):
+    """Strong ETag for a response that depends only on `families` (and the viewer)."""
+    versions = get_versions(*families)
+    parts = [connection.schema_name]
+    parts += [f'{family}={versions[family]}' for family in families]
+    if per_user:
+        # Rendered pages embed the user and a CSRF token tied to the cookie secret;
+        # get_token() issues the secret now, so the first and second visit agree
+        user = getattr(request, 'user', None)
+        parts.append(str(user.pk) if user is not None and user.is_authenticated else 'anon')
+        get_token(request)
+        parts.append(request.META['CSRF_COOKIE'])
+    if daily:
+        parts.append(timezone.localdate().isoformat())
+    return '"%s"' % hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+def _on_change(sender, **kwargs):
+    bump(*_model_families.get(sender, ()))
+
+
+def connect_signals():
+    _registry()
+    for model in _model_families:
+        post_save.connect(_on_change, sender=model, dispatch_uid=f'dataver_save_{model._meta.label_lower}')
+        post_delete.connect(_on_change, sender=model, dispatch_uid=f'dataver_delete_{model._meta.label_lower}')
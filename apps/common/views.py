@@ -2,8 +2,12 @@ from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import csrf_protect
 from django.contrib import messages
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
 from .models import SystemSetting
 from .forms import SystemSettingForm
+from . import health, metrics
+import hmac
 
 
 @login_required
@@ -41,3 +45,38 @@ def system_settings_delete_view(request, pk: int):
 from django.shortcuts import render
 
 
+def metrics_view(request):
+    """OpenMetrics scrape endpoint.
+
+    Authenticates with `Authorization: Bearer <METRICS_TOKEN>`, or a staff
+    session when no token is configured. Serves the shared snapshot, so a
+    scrape is one cache read.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token:
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        allowed = hmac.compare_digest(supplied.encode(), token.encode())
+    else:
+        allowed = request.user.is_authenticated and request.user.is_staff
+    if not allowed:
+        return HttpResponse('Forbidden\n', status=403, content_type='text/plain')
+    response = HttpResponse(metrics.get_snapshot()['text'], content_type=metrics.CONTENT_TYPE)
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+def livez_view(request):
+    """Liveness probe: the process serves requests. Touches neither database nor cache."""
+    return HttpResponse('ok\n', content_type='text/plain')
+
+
+def readyz_view(request):
+    """Readiness probe: database and cache answer within HEALTH_CHECK_TIMEOUT (memoized)."""
+    results = health.run_checks(health.READINESS_CHECKS)
+    ready = all(result['healthy'] for result in results.values())
+    response = JsonResponse({
+        'ready': ready,
+        'checks': {name: {'healthy': r['healthy'], 'issues': r['issues']} for name, r in results.items()},
+    }, status=200 if ready else 503)
+    response['Cache-Control'] = 'no-store'
+    return response
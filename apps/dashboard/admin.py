@@ -1,10 +1,32 @@
 from django.contrib import admin
-from .models import Project
+from django.contrib.postgres.search import SearchQuery
+from apps.common.admin import EstimatedCountAdmin
+from .models import Project, ReportJob
 
 
 @admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
+class ProjectAdmin(EstimatedCountAdmin):
     list_display = ("name", "owner", "tenant_schema_name", "created_at")
-    search_fields = ("name", "description", "tenant_schema_name")
+    list_select_related = ("owner",)
+    # Searched through the GIN index (see get_search_results); a schema name narrows by exact match
+    search_fields = ("name",)
+    search_help_text = "Full-text search on name and description, or an exact tenant schema name."
+    ordering = ("-created_at", "-id")
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        if queryset.filter(tenant_schema_name=search_term).exists():
+            return queryset.filter(tenant_schema_name=search_term), False
+        query = SearchQuery(search_term, search_type="websearch", config="english")
+        return queryset.filter(search_vector=query), False
+
+
+@admin.register(ReportJob)
+class ReportJobAdmin(EstimatedCountAdmin):
+    list_display = ("id", "user", "tenant_schema_name", "status", "rows", "size", "created_at", "finished_at")
+    list_filter = ("status",)
+    search_fields = ("params_hash", "tenant_schema_name")
 
 # Register your models here.
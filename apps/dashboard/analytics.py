@@ -0,0 +1,128 @@
+"""
+Time-series analytics for the JSON API.
+
+A series is one grouped range query per (metric, granularity, window): the
+range filter is on the raw indexed column (no `__date` transform, which
+would defeat the index) and buckets come from Trunc. Results are returned
+columnar, as parallel arrays with empty buckets zero-filled, and cached per
+tenant schema and data version together with their ETag. There is no
+Last-Modified: the newest row in range does not move when an older row is
+edited or deleted, so only the ETag tells clients whether a series changed.
+"""
+
+from datetime import date, datetime, time, timedelta
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, DateField, DateTimeField, Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from apps.billing.models import Payment, Subscription
+from apps.common import versioning
+from apps.users.models import User
+
+
+# metric -> (model, timestamp field, aggregate, data version family)
+METRICS = {
+    'revenue': (Payment, 'date', Sum('amount'), 'payments'),
+    'payments': (Payment, 'date', Count('id'), 'payments'),
+    'signups': (User, 'date_joined', Count('id'), 'users'),
+    'subscriptions': (Subscription, 'start_date', Count('id'), 'subscriptions'),
+}
+GRANULARITIES = ('day', 'week', 'month')
+
+
+def bucket_start(day, granularity):
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def buckets(start, end, granularity):
+    """Every bucket start between start and end, inclusive."""
+    current = bucket_start(start, granularity)
+    while current <= end:
+        yield current
+        if granularity == 'day':
+            current += timedelta(days=1)
+        elif granularity == 'week':
+            current += timedelta(weeks=1)
+        else:
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _range_filter(model, field, start, end):
+    if not isinstance(model._meta.get_field(field), DateTimeField):
+        return {f'{field}__gte': start, f'{field}__lte': end}
+    tz = timezone.get_current_timezone()
+    return {
+        f'{field}__gte': timezone.make_aware(datetime.combine(start, time.min), tz),
+        f'{field}__lt': timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min), tz),
+    }
+
+
+def compute_series(metric, start, end, granularity):
+    model, field, aggregate, _ = METRICS[metric]
+    filters = _range_filter(model, field, start, end)
+    rows = (
+        model.objects.filter(**filters)
+        .annotate(bucket=Trunc(field, granularity, output_field=DateField()))
+        .values('bucket')
+        .annotate(value=aggregate)
+        .order_by('bucket')
+    )
+    values = {row['bucket']: row['value'] for row in rows}
+
+    keys = list(buckets(start, end, granularity))
+    return {
+        'metric': metric,
+        'granularity': granularity,
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        't': [key.isoformat() for key in keys],
+        'v': [float(values.get(key) or 0) for key in keys],
+    }
+
+
+def get_series(metric, start, end, granularity):
+    """Return (payload, etag) for the current tenant, cached."""
+    schema_name = getattr(connection, 'schema_name', 'public')
+    family = METRICS[metric][3]
+    version = versioning.get_versions(family)[family]
+    key = f'analytics:series:{schema_name}:{version}:{metric}:{granularity}:{start.isoformat()}:{end.isoformat()}'
+
+    def build():
+        payload = compute_series(metric, start, end, granularity)
+        etag = hashlib.md5(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+        return payload, f'"{etag}"'
+
+    return cache.get_or_set(key, build, getattr(settings, 'ANALYTICS_CACHE_TTL', 300))
+
+
+def parse_series_params(query, today=None):
+    """Return (metric, start, end, granularity) from query params; raises ValueError."""
+    today = today or timezone.localdate()
+    metric = query.get('metric', 'revenue')
+    if metric not in METRICS:
+        raise ValueError(f'metric must be one of {", ".join(METRICS)}')
+    granularity = query.get('granularity', 'day')
+    if granularity not in GRANULARITIES:
+        raise ValueError(f'granularity must be one of {", ".join(GRANULARITIES)}')
+    try:
+        end = date.fromisoformat(query['to']) if query.get('to') else today
+        start = date.fromisoformat(query['from']) if query.get('from') else end - timedelta(days=30)
+    except ValueError:
+        raise ValueError('from and to must be dates (YYYY-MM-DD)')
+    if start > end:
+        raise ValueError('from must not be after to')
+    max_points = getattr(settings, 'ANALYTICS_SERIES_MAX_POINTS', 1000)
+    span = {'day': 1, 'week': 7, 'month': 28}[granularity]
+    if (end - start).days // span + 1 > max_points:
+        raise ValueError(f'Range too large: at most {max_points} {granularity} buckets')
+    return metric, start, end, granularity
@@ -0,0 +1,163 @@
+"""
+Background report jobs.
+
+A request enqueues a ReportJob row; the run_report_jobs command claims queued
+jobs with SELECT ... FOR UPDATE SKIP LOCKED (so several workers can run side
+by side), streams the report rows into a gzip file under
+MEDIA_ROOT/reports/ and marks the job done. Jobs are keyed by a hash of
+(schema, user, parameters): an identical request while a job is queued or
+running, or within REPORT_JOB_REUSE_SECONDS of it finishing, gets the
+existing job and its artifact instead of a new one. A partial unique
+constraint allows one queued/running job per key, so concurrent identical
+requests cannot both enqueue.
+"""
+
+from datetime import date, timedelta
+import csv
+import gzip
+import hashlib
+import json
+import os
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django_tenants.utils import schema_context
+
+from .models import ReportJob
+from .reports import report_rows
+
+
+def normalize_params(sections, start=None, end=None):
+    return {
+        'sections': list(sections),
+        'start': start.isoformat() if start else None,
+        'end': end.isoformat() if end else None,
+    }
+
+
+def params_hash(schema_name, user_id, params):
+    payload = json.dumps([schema_name, user_id, params], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def artifact_path(job):
+    return os.path.join(settings.MEDIA_ROOT, job.file)
+
+
+def _reusable_job(digest):
+    """The pending job for `digest`, or a finished one whose artifact is recent and present."""
+    reuse_after = timezone.now() - timedelta(seconds=getattr(settings, 'REPORT_JOB_REUSE_SECONDS', 900))
+    existing = (
+        ReportJob.objects.filter(params_hash=digest)
+        .exclude(status=ReportJob.STATUS_FAILED)
+        .order_by('-created_at')
+        .first()
+    )
+    if existing is not None:
+        if existing.status in (ReportJob.STATUS_QUEUED, ReportJob.STATUS_RUNNING):
+            return existing
+        if existing.finished_at >= reuse_after and os.path.exists(artifact_path(existing)):
+            return existing
+    return None
+
+
+def enqueue(user, schema_name, params, attempts=3):
+    """Return (job, created), reusing a pending or recent identical job."""
+    digest = params_hash(schema_name, user.pk, params)
+    for attempt in range(attempts):
+        existing = _reusable_job(digest)
+        if existing is not None:
+            return existing, False
+        try:
+            # Savepoint, so losing the race leaves the caller's transaction usable
+            with transaction.atomic():
+                job = ReportJob.objects.create(
+                    user=user,
+                    tenant_schema_name=schema_name,
+                    params=params,
+                    params_hash=digest,
+                )
+            return job, True
+        except IntegrityError:
+            # A concurrent identical request enqueued first (report_job_one_pending_per_hash);
+            # look again, as that job may already have finished
+            if attempt == attempts - 1:
+                raise
+
+
+def claim_next():
+    """Mark the oldest queued job running and return it, or None."""
+    with transaction.atomic():
+        job = (
+            ReportJob.objects.select_for_update(skip_locked=True)
+            .filter(status=ReportJob.STATUS_QUEUED)
+            .order_by('created_at')
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = ReportJob.STATUS_RUNNING
+        job.started_at = timezone.now()
+        job.save(update_fields=['status', 'started_at'])
+    return job
+
+
+def requeue_stale(timeout_seconds=None):
+    """Requeue jobs whose worker died mid-run."""
+    if timeout_seconds is None:
+        timeout_seconds = getattr(settings, 'REPORT_JOB_TIMEOUT_SECONDS', 3600)
+    return ReportJob.objects.filter(
+        status=ReportJob.STATUS_RUNNING,
+        started_at__lt=timezone.now() - timedelta(seconds=timeout_seconds),
+    ).update(status=ReportJob.STATUS_QUEUED, started_at=None)
+
+
+def run_job(job):
+    """Generate the artifact for a claimed job."""
+    params = job.params
+    start = date.fromisoformat(params['start']) if params.get('start') else None
+    end = date.fromisoformat(params['end']) if params.get('end') else None
+    job.file = os.path.join('reports', job.tenant_schema_name, f'{job.params_hash[:16]}-{job.pk}.csv.gz')
+    path = artifact_path(job)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    rows = 0
+    try:
+        with schema_context(job.tenant_schema_name):
+            with gzip.open(f'{path}.partial', 'wt', encoding='utf-8', newline='') as out:
+                writer = csv.writer(out)
+                for row in report_rows(job.user, params['sections'], start, end):
+                    writer.writerow(row)
+                    rows += 1
+        os.replace(f'{path}.partial', path)
+    except Exception as exc:
+        if os.path.exists(f'{path}.partial'):
+            os.remove(f'{path}.partial')
+        job.status = ReportJob.STATUS_FAILED
+        job.error = str(exc)
+        job.file = ''
+    else:
+        job.status = ReportJob.STATUS_DONE
+        job.size = os.path.getsize(path)
+        job.rows = rows
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'file', 'size', 'rows', 'finished_at'])
+    return job
+
+
+def purge_expired(retention_seconds=None):
+    """Delete finished jobs and artifacts older than REPORT_JOB_RETENTION_SECONDS."""
+    if retention_seconds is None:
+        retention_seconds = getattr(settings, 'REPORT_JOB_RETENTION_SECONDS', 86400)
+    expired = ReportJob.objects.filter(
+        status__in=[ReportJob.STATUS_DONE, ReportJob.STATUS_FAILED],
+        finished_at__lt=timezone.now() - timedelta(seconds=retention_seconds),
+    )
+    count = 0
+    for job in expired.iterator():
+        if job.file and os.path.exists(artifact_path(job)):
+            os.remove(artifact_path(job))
+        job.delete()
+        count += 1
+    return count
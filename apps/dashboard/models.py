@@ -1,5 +1,7 @@
 from django.db import models
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 
 
 class Project(models.Model):
@@ -8,6 +10,68 @@ class Project(models.Model):
     owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='projects')
     tenant_schema_name = models.CharField(max_length=63, help_text='Schema name this project belongs to')
     created_at = models.DateTimeField(auto_now_add=True)
+    # Maintained by PostgreSQL on every write; searched through project_search_gin
+    search_vector = models.GeneratedField(
+        expression=SearchVector('name', weight='A', config='english')
+        + SearchVector('description', weight='B', config='english'),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            # Keyset pagination: WHERE tenant [AND owner] ORDER BY created_at DESC, id DESC
+            models.Index(
+                fields=['tenant_schema_name', 'owner', '-created_at', '-id'],
+                name='project_tenant_owner_created',
+            ),
+            models.Index(fields=['tenant_schema_name', '-created_at', '-id'], name='project_tenant_created'),
+            GinIndex(fields=['search_vector'], name='project_search_gin'),
+        ]
 
     def __str__(self) -> str:
         return self.name
+
+
+class ReportJob(models.Model):
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='report_jobs')
+    tenant_schema_name = models.CharField(max_length=63)
+    params = models.JSONField(default=dict)
+    # sha256 of (schema, user, params); identical requests reuse the same job/artifact
+    params_hash = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    file = models.CharField(max_length=255, blank=True, help_text='Artifact path relative to MEDIA_ROOT')
+    size = models.BigIntegerField(default=0)
+    rows = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['params_hash', 'status']),
+        ]
+        constraints = [
+            # At most one queued/running job per request key; enqueue() relies on it under concurrency
+            models.UniqueConstraint(
+                fields=['params_hash'],
+                condition=models.Q(status__in=['queued', 'running']),
+                name='report_job_one_pending_per_hash',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f'Report {self.pk} ({self.status})'
@@ -0,0 +1,90 @@
+"""
+Project listing and search for the JSON API.
+
+Projects of every tenant share one table in the public schema, so every
+query is scoped by tenant_schema_name first and served from the composite
+(tenant_schema_name, owner, created_at, id) indexes. Pages are keyset
+paginated on (created_at, id) descending: the cursor carries the last row's
+position, so page N costs the same as page 1 (no OFFSET scan, no COUNT).
+Search uses the generated `search_vector` column and its GIN index.
+"""
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery
+from django.db import connection
+from django.db.models import Q
+
+from .models import Project
+
+
+FIELDS = ('id', 'name', 'description', 'owner_id', 'owner__email', 'created_at')
+
+
+def encode_cursor(created_at, pk):
+    return urlsafe_b64encode(f'{created_at.isoformat()}|{pk}'.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Return (created_at, pk) from an opaque cursor; raises ValueError."""
+    try:
+        created_at, pk = urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|')
+        return datetime.fromisoformat(created_at), int(pk)
+    except (UnicodeError, ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+
+
+def project_queryset(user, q=None, owner=None):
+    """Projects of the current tenant visible to `user`, newest first.
+
+    Staff see the whole tenant (optionally one owner), everyone else only
+    their own projects.
+    """
+    projects = Project.objects.filter(tenant_schema_name=connection.schema_name)
+    if not user.is_staff:
+        # By pk: token-authenticated callers are TokenUsers, not model instances
+        projects = projects.filter(owner_id=user.pk)
+    elif owner is not None:
+        projects = projects.filter(owner_id=owner)
+    if q:
+        projects = projects.filter(search_vector=SearchQuery(q, search_type='websearch', config='english'))
+    return projects.order_by('-created_at', '-id')
+
+
+def page_size(value=None):
+    default = getattr(settings, 'PROJECT_PAGE_SIZE', 50)
+    if value in (None, ''):
+        return default
+    size = int(value)
+    if size < 1:
+        raise ValueError('limit must be positive')
+    return min(size, getattr(settings, 'PROJECT_PAGE_SIZE_MAX', 200))
+
+
+def list_projects(user, q=None, owner=None, cursor=None, limit=None):
+    """Return (rows, next_cursor) for one page; next_cursor is None on the last page."""
+    limit = page_size(limit)
+    projects = project_queryset(user, q=q, owner=owner)
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        # The plain <= bound gives the planner an index range; the OR only trims ties
+        projects = projects.filter(created_at__lte=created_at).filter(
+            Q(created_at__lt=created_at) | Q(id__lt=pk)
+        )
+    rows = list(projects.values(*FIELDS)[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]['created_at'], rows[-1]['id'])
+    return [
+        {
+            'id': row['id'],
+            'name': row['name'],
+            'description': row['description'],
+            'owner': {'id': row['owner_id'], 'email': row['owner__email']},
+            'created_at': row['created_at'],
+        }
+        for row in rows
+    ], next_cursor
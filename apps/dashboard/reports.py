@@ -0,0 +1,128 @@
+"""
+Row generators for the CSV report export.
+
+Each section streams straight from the database with
+`.values_list(...).iterator(chunk_size=...)` (a server-side cursor on
+PostgreSQL), so export_report_view sends the first bytes immediately and
+holds at most one chunk of rows in memory.
+"""
+
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Sum
+from django.utils.dateparse import parse_date
+from django.utils.timezone import now
+
+from apps.billing.models import Payment, Subscription
+from apps.common.counting import count
+from apps.users.models import User
+from .models import Project
+
+
+SECTIONS = ('kpis', 'projects', 'payments', 'subscriptions')
+
+
+def _chunk_size():
+    return getattr(settings, 'REPORT_EXPORT_CHUNK_SIZE', 2000)
+
+
+def _in_range(queryset, field, start, end):
+    if start:
+        queryset = queryset.filter(**{f'{field}__gte': start})
+    if end:
+        queryset = queryset.filter(**{f'{field}__lte': end})
+    return queryset
+
+
+def kpi_rows(user, start, end):
+    today = now().date()
+    month_start = today.replace(day=1)
+    revenue_month = (
+        Payment.objects.filter(date__date__gte=month_start)
+        .aggregate(total=Sum('amount')).get('total') or Decimal('0.00')
+    )
+    yield ["Section", "Metric", "Value"]
+    yield ["KPIs", "Revenue (month)", revenue_month]
+    yield ["KPIs", "Users (total)", count(User)]
+
+
+def project_rows(user, start, end):
+    yield ["Projects for", user.email]
+    yield ["Name", "Description", "Created At"]
+    projects = Project.objects.filter(tenant_schema_name=connection.schema_name, owner=user)
+    projects = _in_range(projects, 'created_at__date', start, end)
+    for name, description, created_at in (
+        projects.order_by('-created_at', '-id')
+        .values_list('name', 'description', 'created_at')
+        .iterator(chunk_size=_chunk_size())
+    ):
+        yield [name, description, created_at.isoformat()]
+
+
+def payment_rows(user, start, end):
+    # Staff see every payment in the tenant, everyone else only their own
+    payments = Payment.objects.all() if user.is_staff else Payment.objects.filter(user=user)
+    payments = _in_range(payments, 'date__date', start, end)
+    yield ["Payments"]
+    yield ["User", "Amount", "Date", "Status"]
+    for email, amount, date, status in (
+        payments.order_by('-date')
+        .values_list('user__email', 'amount', 'date', 'status')
+        .iterator(chunk_size=_chunk_size())
+    ):
+        yield [email, amount, date.isoformat(), status]
+
+
+def subscription_rows(user, start, end):
+    subscriptions = Subscription.objects.all() if user.is_staff else Subscription.objects.filter(user=user)
+    subscriptions = _in_range(subscriptions, 'start_date', start, end)
+    yield ["Subscriptions"]
+    yield ["User", "Plan", "Start Date", "End Date", "Active"]
+    for email, plan_name, start_date, end_date, active in (
+        subscriptions.order_by('-start_date')
+        .values_list('user__email', 'plan__name', 'start_date', 'end_date', 'active')
+        .iterator(chunk_size=_chunk_size())
+    ):
+        yield [email, plan_name or '', start_date.isoformat(), end_date.isoformat() if end_date else '', active]
+
+
+SECTION_ROWS = {
+    'kpis': kpi_rows,
+    'projects': project_rows,
+    'payments': payment_rows,
+    'subscriptions': subscription_rows,
+}
+
+
+def parse_report_params(query):
+    """Return (sections, start, end) from request parameters; raises ValueError."""
+    sections = query.get('sections')
+    if sections:
+        requested = {s.strip() for s in sections.split(',') if s.strip()}
+        if not requested <= set(SECTIONS):
+            raise ValueError(f"Unknown section(s): {', '.join(sorted(requested - set(SECTIONS)))}")
+        sections = [s for s in SECTIONS if s in requested]
+    else:
+        sections = list(SECTIONS)
+
+    dates = []
+    for key in ('start', 'end'):
+        value = query.get(key)
+        try:
+            parsed = parse_date(value) if value else None
+        except ValueError:
+            parsed = None
+        if value and parsed is None:
+            raise ValueError('start and end must be dates (YYYY-MM-DD)')
+        dates.append(parsed)
+    return sections, dates[0], dates[1]
+
+
+def report_rows(user, sections=SECTIONS, start=None, end=None):
+    """Yield CSV rows for the requested sections, separated by blank rows."""
+    for index, section in enumerate(sections):
+        if index:
+            yield []
+        yield from SECTION_ROWS[section](user, start, end)
@@ -1,7 +1,19 @@
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth import get_user_model
-from .models import Project
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.utils import timezone
+from django.core.cache import cache
+from apps.billing.models import Payment
+from .models import Project, ReportJob
+from . import jobs, widgets
+from django.core.management import call_command
+from io import StringIO
+from unittest import mock
+import gzip
+import tempfile
 
 
 class DashboardViewsTests(TestCase):
@@ -37,5 +49,161 @@ class DashboardViewsTests(TestCase):
         resp = self.client.get(reverse("dashboard:export_report"))
         self.assertEqual(resp.status_code, 200)
         self.assertIn("text/csv", resp.headers.get("Content-Type", ""))
+        body = b"".join(resp.streaming_content).decode()
+        self.assertIn("My Project", body)
+        self.assertIn("Payments", body)
+
+    def test_export_report_sections_dates_and_gzip(self):
+        self.client.force_login(self.user)
+        resp = self.client.get(reverse("dashboard:export_report"), {"sections": "payments", "start": "2024-01-01"})
+        body = b"".join(resp.streaming_content).decode()
+        self.assertTrue(body.startswith("Payments"))
+        self.assertNotIn("Projects for", body)
+
+        resp = self.client.get(reverse("dashboard:export_report"), {"start": "not-a-date"})
+        self.assertEqual(resp.status_code, 400)
+
+        resp = self.client.get(reverse("dashboard:export_report"), {"gzip": "1"})
+        self.assertEqual(resp["Content-Type"], "application/gzip")
+        self.assertIn(b"Projects for", gzip.decompress(b"".join(resp.streaming_content)))
+
+
+class ReportJobTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(email="jobs@example.com", password="pass1234")
+        self.client.force_login(self.user)
+
+    def test_job_is_deduplicated_generated_and_downloadable_by_range(self):
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            params = {"sections": "payments"}
+            url = reverse("dashboard:report_job_create")
+            self.assertEqual(self.client.get(reverse("dashboard:export_report"), {**params, "async": "1"}).status_code, 400)
+            self.assertEqual(self.client.get(url, params).status_code, 405)
+            first = self.client.post(url, params)
+            self.assertEqual(first.status_code, 202)
+            second = self.client.post(url, params)
+            self.assertEqual(second.status_code, 200)
+            self.assertEqual(first.json()["id"], second.json()["id"])
+
+            job = jobs.run_job(jobs.claim_next())
+            self.assertEqual(job.status, ReportJob.STATUS_DONE)
+            status = self.client.get(reverse("dashboard:report_job_status", args=[job.pk])).json()
+            self.assertIn("download_url", status)
+
+            full = b"".join(self.client.get(status["download_url"]).streaming_content)
+            self.assertTrue(gzip.decompress(full).startswith(b"Payments"))
+            partial = self.client.get(status["download_url"], HTTP_RANGE="bytes=0-9")
+            self.assertEqual(partial.status_code, 206)
+            self.assertEqual(b"".join(partial.streaming_content), full[:10])
+
+            # A finished artifact is reused within the window
+            again = self.client.post(url, params)
+            self.assertEqual(again.json()["id"], job.pk)
+
+    def race(self, winner_finishes=False):
+        """Make enqueue() miss the winner's job on its first lookup, as the loser of a race does."""
+        real_lookup, calls = jobs._reusable_job, []
+
+        def lookup(digest):
+            calls.append(digest)
+            if len(calls) == 1:
+                return None
+            if winner_finishes:
+                ReportJob.objects.update(status=ReportJob.STATUS_DONE, finished_at=timezone.now())
+            return real_lookup(digest)
+
+        return mock.patch.object(jobs, "_reusable_job", side_effect=lookup)
+
+    def test_racing_identical_enqueue_reuses_pending_job(self):
+        params = jobs.normalize_params(["payments"])
+        job, created = jobs.enqueue(self.user, connection.schema_name, params)
+        self.assertTrue(created)
+        # The loser's INSERT hits the constraint, and its second lookup finds the pending job
+        with self.race():
+            again, created = jobs.enqueue(self.user, connection.schema_name, params)
+        self.assertEqual((again.pk, created), (job.pk, False))
+        self.assertEqual(ReportJob.objects.count(), 1)
+
+    def test_racing_enqueue_after_winner_finished_creates_a_job(self):
+        params = jobs.normalize_params(["payments"])
+        job, _ = jobs.enqueue(self.user, connection.schema_name, params)
+        # The winner finished between the failed INSERT and the second lookup (no artifact to reuse)
+        with self.race(winner_finishes=True):
+            again, created = jobs.enqueue(self.user, connection.schema_name, params)
+        self.assertTrue(created)
+        self.assertNotEqual(again.pk, job.pk)
+
+
+class DashboardWidgetCacheTests(TestCase):
+    def test_cached_widgets_skip_queries_until_data_changes(self):
+        cache.clear()
+        # The post_save signal gives new users an active trial subscription
+        user = get_user_model().objects.create_user(email="frag@example.com", password="pass1234")
+        self.client.force_login(user)
+        Payment.objects.create(user=user, amount=7)
+
+        with CaptureQueriesContext(connection) as cold:
+            self.client.get(reverse("dashboard:dashboard"))
+        with CaptureQueriesContext(connection) as warm:
+            resp = self.client.get(reverse("dashboard:dashboard"))
+        self.assertEqual(resp.status_code, 200)
+        self.assertLess(len(warm), len(cold))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Payment.objects.create(user=user, amount=9)
+        self.assertContains(self.client.get(reverse("dashboard:dashboard")), "paid $9")
+
+
+class ProjectApiTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(email="proj@example.com", password="pass1234")
+        other = get_user_model().objects.create_user(email="other@example.com", password="pass1234")
+        self.client.force_login(self.user)
+        schema = connection.schema_name
+        for i in range(5):
+            Project.objects.create(name=f"Rocket {i}", description="launch pad", owner=self.user, tenant_schema_name=schema)
+        Project.objects.create(name="Garden", description="tomatoes", owner=self.user, tenant_schema_name=schema)
+        Project.objects.create(name="Rocket elsewhere", owner=self.user, tenant_schema_name="another_tenant")
+        Project.objects.create(name="Rocket of someone else", owner=other, tenant_schema_name=schema)
+
+    def test_keyset_pages_cover_tenant_projects_once(self):
+        url = reverse("api:projects")
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 4, **({"cursor": cursor} if cursor else {})}
+            data = self.client.get(url, params).json()
+            seen += [row["name"] for row in data["results"]]
+            cursor = data["next"]
+            if not cursor:
+                break
+        self.assertEqual(len(seen), 6)
+        self.assertEqual(len(set(seen)), 6)
+        self.assertEqual(self.client.get(url, {"cursor": "garbage"}).status_code, 400)
+
+    def test_full_text_search(self):
+        data = self.client.get(reverse("api:projects"), {"q": "rockets"}).json()
+        self.assertEqual(len(data["results"]), 5)
+        data = self.client.get(reverse("api:projects"), {"q": "tomato"}).json()
+        self.assertEqual([row["name"] for row in data["results"]], ["Garden"])
+
+
+class CacheWarmingTests(TestCase):
+    def test_warm_rebuilds_missing_and_stale_payloads_only(self):
+        cache.clear()
+        user = get_user_model().objects.create_user(email="warm@example.com", password="pass1234")
+        self.assertEqual(widgets.warm("dashboard"), "miss")
+        self.assertEqual(widgets.warm("dashboard"), "fresh")
+        self.assertEqual(widgets.warm("dashboard", refresh_ratio=0), "stale")
+
+        # A write moves the data version, so the next pass rebuilds under a new key
+        with self.captureOnCommitCallbacks(execute=True):
+            Payment.objects.create(user=user, amount=3)
+        self.assertEqual(widgets.warm("dashboard"), "miss")
+        self.assertEqual(widgets.get_payload("dashboard")["recent_payments"][0]["email"], "warm@example.com")
+
+    def test_command_reports_coverage(self):
+        out = StringIO()
+        call_command("warm_caches", concurrency=1, stdout=out)
+        self.assertIn("coverage", out.getvalue())
 
 # Create your tests here.
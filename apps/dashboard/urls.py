@@ -1,9 +1,20 @@
 from django.urls import path
-from .views import dashboard_view, analytics_view, export_report_view, create_project_view
+from .views import (
+    dashboard_view,
+    analytics_view,
+    export_report_view,
+    create_project_view,
+    report_job_create_view,
+    report_job_status_view,
+    report_job_download_view,
+)
 
 urlpatterns = [
     path('', dashboard_view, name='dashboard'),
     path('analytics/', analytics_view, name='analytics'),
     path('export-report/', export_report_view, name='export_report'),
     path('projects/create/', create_project_view, name='create_project'),
+    path('reports/jobs/', report_job_create_view, name='report_job_create'),
+    path('reports/jobs/<int:pk>/', report_job_status_view, name='report_job_status'),
+    path('reports/jobs/<int:pk>/download/', report_job_download_view, name='report_job_download'),
 ]
@@ -1,21 +1,28 @@
-from decimal import Decimal
 from django.db import connection
-from django.db.models import Sum, Count
-from django.db.models.functions import TruncDate
 from django.utils.timezone import now
-from django.shortcuts import render, redirect
+from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.urls import reverse
-from apps.users.models import User
-from apps.billing.models import Subscription, Payment
-from .models import Project
+from apps.billing.models import Subscription
+from apps.common.decorators import conditional_on_data
+from .models import ReportJob
 from .forms import ProjectForm
-from django.http import HttpResponse
+from .reports import parse_report_params, report_rows
+from .widgets import get_payload
+from . import jobs as report_jobs
+from apps.common.utils import gzip_chunks
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse,
+)
+from django.views.decorators.http import require_POST
 from django.views.decorators.csrf import csrf_protect
-from django.core.cache import cache
-from django.conf import settings
 import csv
+import os
+import re
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
 
 @login_required
 def dashboard_view(request):
@@ -37,37 +44,16 @@ def dashboard_view(request):
     if hasattr(sub, 'plan') and sub.plan:
         is_trial = 'trial' in sub.plan.name.lower()
 
-    # Real data metrics (cached)
-    cache_ttl = getattr(settings, 'DASHBOARD_CACHE_TTL', 120)
-    users_count = cache.get_or_set('dash:users_count', lambda: User.objects.count(), cache_ttl)
-    active_subscriptions_count = cache.get_or_set(
-        'dash:active_subscriptions_count',
-        lambda: Subscription.objects.filter(active=True, end_date__gte=now().date()).count(),
-        cache_ttl,
-    )
-    monthly_revenue = cache.get_or_set(
-        'dash:monthly_revenue',
-        lambda: (
-            Payment.objects.filter(date__year=now().year, date__month=now().month)
-            .aggregate(total=Sum('amount')).get('total') or Decimal('0.00')
-        ),
-        cache_ttl,
-    )
-    recent_payments = (
-        Payment.objects.select_related('user').only('user__email', 'amount', 'date').order_by('-date')[:5]
-    )
-    recent_users = User.objects.order_by('-date_joined')[:5]
+    # KPI cards and recent activity come from one cached payload per tenant and
+    # data version, kept warm by warm_caches
+    widgets = get_payload('dashboard')
     days_left = (sub.end_date - now().date()).days if sub and sub.end_date else None
 
     context = {
         'user': request.user,
         'subscription': sub,
         'is_trial': is_trial,
-        'users_count': users_count,
-        'active_subscriptions_count': active_subscriptions_count,
-        'monthly_revenue': monthly_revenue,
-        'recent_payments': recent_payments,
-        'recent_users': recent_users,
+        'widgets': widgets,
         'days_left': days_left,
         'schema_name': getattr(connection, 'schema_name', 'public'),
     }
@@ -75,88 +61,137 @@ def dashboard_view(request):
 
 
 @login_required
+@conditional_on_data('users', 'payments', 'subscriptions', daily=True)
 def analytics_view(request):
-    today = now().date()
-    month_start = today.replace(day=1)
-
-    cache_ttl = getattr(settings, 'ANALYTICS_CACHE_TTL', 300)
-    users_total = cache.get_or_set('analytics:users_total', lambda: User.objects.count(), cache_ttl)
-    users_new_month = cache.get_or_set(
-        'analytics:users_new_month',
-        lambda: User.objects.filter(date_joined__date__gte=month_start).count(),
-        cache_ttl,
-    )
-    active_subscriptions = cache.get_or_set(
-        'analytics:active_subs',
-        lambda: Subscription.objects.filter(active=True, end_date__gte=today).count(),
-        cache_ttl,
-    )
-    revenue_month = cache.get_or_set(
-        'analytics:revenue_month',
-        lambda: (Payment.objects.filter(date__date__gte=month_start).aggregate(total=Sum('amount')).get('total') or Decimal('0.00')),
-        cache_ttl,
-    )
-
-    revenue_series = cache.get_or_set(
-        'analytics:revenue_series',
-        lambda: list(
-            Payment.objects.filter(date__date__gte=month_start)
-            .annotate(day=TruncDate('date'))
-            .values('day')
-            .annotate(total=Sum('amount'))
-            .order_by('day')
-        ),
-        cache_ttl,
-    )
-
-    signups_series = cache.get_or_set(
-        'analytics:signups_series',
-        lambda: list(
-            User.objects.filter(date_joined__date__gte=month_start)
-            .annotate(day=TruncDate('date_joined'))
-            .values('day')
-            .annotate(count=Count('id'))
-            .order_by('day')
-        ),
-        cache_ttl,
-    )
-
-    context = {
-        'users_total': users_total,
-        'users_new_month': users_new_month,
-        'active_subscriptions': active_subscriptions,
-        'revenue_month': revenue_month,
-        'revenue_series': revenue_series,
-        'signups_series': signups_series,
-    }
+    # One cache entry per tenant, date and data version; warm_caches keeps it built
+    context = get_payload('analytics')
     return render(request, 'dashboard/analytics.html', context)
 
 
+class Echo:
+    """File-like object whose write() returns the value, so csv.writer yields lines."""
+
+    def write(self, value):
+        return value
+
+
 @login_required
 def export_report_view(request):
-    # Simple CSV export for projects and revenue this month
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="report.csv"'
-    writer = csv.writer(response)
-
-    writer.writerow(["Section", "Metric", "Value"]) 
-    # KPIs
-    today = now().date()
-    month_start = today.replace(day=1)
-    revenue_month = (
-        Payment.objects.filter(date__date__gte=month_start)
-        .aggregate(total=Sum('amount')).get('total') or Decimal('0.00')
-    )
-    writer.writerow(["KPIs", "Revenue (month)", revenue_month])
-    writer.writerow(["KPIs", "Users (total)", User.objects.count()])
-
-    # Projects for user
-    writer.writerow([])
-    writer.writerow(["Projects for", request.user.email])
-    writer.writerow(["Name", "Description", "Created At"]) 
-    for p in Project.objects.filter(owner=request.user).order_by('-created_at'):
-        writer.writerow([p.name, p.description, p.created_at.isoformat()])
+    """Stream the CSV report section by section.
+
+    Query params: sections (comma separated, default all of
+    kpis,projects,payments,subscriptions), start/end (YYYY-MM-DD), gzip=1.
+    Background jobs are enqueued with a POST to report_job_create_view.
+    """
+    try:
+        sections, start, end = parse_report_params(request.GET)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+
+    if request.GET.get('async') == '1':
+        # A GET must not create jobs
+        return HttpResponseBadRequest(f'POST to {reverse("dashboard:report_job_create")} to run the report in the background')
+
+    writer = csv.writer(Echo())
+    lines = (writer.writerow(row) for row in report_rows(request.user, sections, start, end))
+    if request.GET.get('gzip') == '1':
+        response = StreamingHttpResponse(gzip_chunks(lines), content_type='application/gzip')
+        response['Content-Disposition'] = 'attachment; filename="report.csv.gz"'
+    else:
+        response = StreamingHttpResponse(lines, content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="report.csv"'
+    return response
+
+
+def _report_job_payload(job):
+    payload = {
+        'id': job.pk,
+        'status': job.status,
+        'params': job.params,
+        'created_at': job.created_at.isoformat(),
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'status_url': reverse('dashboard:report_job_status', args=[job.pk]),
+    }
+    if job.status == ReportJob.STATUS_DONE:
+        payload.update({
+            'rows': job.rows,
+            'size': job.size,
+            'download_url': reverse('dashboard:report_job_download', args=[job.pk]),
+        })
+    elif job.status == ReportJob.STATUS_FAILED:
+        payload['error'] = job.error
+    return payload
 
+
+def _enqueue_report_job(request, sections, start, end):
+    schema_name = getattr(connection, 'schema_name', 'public')
+    job, created = report_jobs.enqueue(request.user, schema_name, report_jobs.normalize_params(sections, start, end))
+    return JsonResponse(_report_job_payload(job), status=202 if created else 200)
+
+
+@login_required
+@csrf_protect
+@require_POST
+def report_job_create_view(request):
+    try:
+        sections, start, end = parse_report_params(request.POST)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return _enqueue_report_job(request, sections, start, end)
+
+
+@login_required
+def report_job_status_view(request, pk: int):
+    job = get_object_or_404(ReportJob, pk=pk, user=request.user)
+    return JsonResponse(_report_job_payload(job))
+
+
+@login_required
+def report_job_download_view(request, pk: int):
+    job = get_object_or_404(ReportJob, pk=pk, user=request.user, status=ReportJob.STATUS_DONE)
+    path = report_jobs.artifact_path(job)
+    if not os.path.exists(path):
+        raise Http404('Report artifact has expired')
+    return ranged_file_response(request, path, f'report-{job.pk}.csv.gz', 'application/gzip')
+
+
+def ranged_file_response(request, path, filename, content_type, block_size=64 * 1024):
+    """Serve a file honouring a single `Range: bytes=` request (206/416), else 200."""
+    size = os.path.getsize(path)
+    match = RANGE_RE.match(request.headers.get('Range', ''))
+    if not match:
+        response = FileResponse(open(path, 'rb'), as_attachment=True, filename=filename, content_type=content_type)
+        response['Accept-Ranges'] = 'bytes'
+        return response
+
+    first, last = match.groups()
+    if first:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    elif last:
+        start, end = max(0, size - int(last)), size - 1
+    else:
+        start, end = 0, -1
+    if start > end or start >= size:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    def read_range():
+        with open(path, 'rb') as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                block = f.read(min(block_size, remaining))
+                if not block:
+                    break
+                remaining -= len(block)
+                yield block
+
+    response = StreamingHttpResponse(read_range(), status=206, content_type=content_type)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = str(end - start + 1)
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
     return response
 
 
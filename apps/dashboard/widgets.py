@@ -0,0 +1,123 @@
+"""
+Cached payloads behind the dashboard and analytics pages.
+
+Each page reads one cache entry per tenant, keyed by schema, date and the
+users/payments/subscriptions data versions, so a write retires it
+immediately and the TTL only bounds time-dependent values. Entries carry
+their build time: `warm_caches` rebuilds them ahead of expiry, so requests
+only build inline when the warmer has not reached the tenant yet.
+"""
+
+from decimal import Decimal
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from apps.billing.models import Payment, Subscription
+from apps.common import counting, versioning
+from apps.users.models import User
+
+
+FAMILIES = ('users', 'payments', 'subscriptions')
+
+
+def build_dashboard():
+    today = timezone.localdate()
+    return {
+        'users_count': counting.count(User),
+        'active_subscriptions_count': Subscription.objects.filter(active=True, end_date__gte=today).count(),
+        'monthly_revenue': (
+            Payment.objects.filter(date__year=today.year, date__month=today.month)
+            .aggregate(total=Sum('amount')).get('total') or Decimal('0.00')
+        ),
+        'recent_payments': list(
+            Payment.objects.order_by('-date').values('amount', 'date', email=F('user__email'))[:5]
+        ),
+    }
+
+
+def build_analytics():
+    today = timezone.localdate()
+    month_start = today.replace(day=1)
+    return {
+        'users_total': counting.count(User),
+        'users_new_month': User.objects.filter(date_joined__date__gte=month_start).count(),
+        'active_subscriptions': Subscription.objects.filter(active=True, end_date__gte=today).count(),
+        'revenue_month': (
+            Payment.objects.filter(date__date__gte=month_start)
+            .aggregate(total=Sum('amount')).get('total') or Decimal('0.00')
+        ),
+        'revenue_series': list(
+            Payment.objects.filter(date__date__gte=month_start)
+            .annotate(day=TruncDate('date'))
+            .values('day')
+            .annotate(total=Sum('amount'))
+            .order_by('day')
+        ),
+        'signups_series': list(
+            User.objects.filter(date_joined__date__gte=month_start)
+            .annotate(day=TruncDate('date_joined'))
+            .values('day')
+            .annotate(count=Count('id'))
+            .order_by('day')
+        ),
+    }
+
+
+# name -> (builder, TTL setting, default TTL)
+PAYLOADS = {
+    'dashboard': (build_dashboard, 'DASHBOARD_FRAGMENT_TTL', 600),
+    'analytics': (build_analytics, 'ANALYTICS_CACHE_TTL', 300),
+}
+
+
+def _ttl(name):
+    _, setting, default = PAYLOADS[name]
+    return getattr(settings, setting, default)
+
+
+def payload_key(name):
+    versions = versioning.get_versions(*FAMILIES)
+    parts = [connection.schema_name, timezone.localdate().isoformat()] + [str(versions[f]) for f in FAMILIES]
+    return f'widgets:{name}:' + ':'.join(parts)
+
+
+def refresh(name, key=None):
+    key = key or payload_key(name)
+    entry = {'built_at': time.time(), 'data': PAYLOADS[name][0]()}
+    cache.set(key, entry, _ttl(name))
+    return entry
+
+
+def get_payload(name):
+    """Return the current tenant's payload, building it inline on a miss."""
+    key = payload_key(name)
+    entry = cache.get(key)
+    if entry is None:
+        entry = refresh(name, key)
+    return entry['data']
+
+
+def warm(name, refresh_ratio=0.8, jitter=0.1):
+    """Rebuild the payload if missing or past refresh_ratio of its TTL.
+
+    Returns 'fresh', 'stale' (rebuilt before expiry) or 'miss' (rebuilt,
+    a request would have paid for it). The refresh point is jittered so
+    tenants warmed together do not all come due in the same pass.
+    """
+    key = payload_key(name)
+    entry = cache.get(key)
+    if entry is None:
+        refresh(name, key)
+        return 'miss'
+    refresh_after = _ttl(name) * refresh_ratio * random.uniform(1 - jitter, 1)
+    if time.time() - entry['built_at'] < refresh_after:
+        return 'fresh'
+    refresh(name, key)
+    return 'stale'
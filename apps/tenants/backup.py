@@ -0,0 +1,251 @@
+"""
+Per-tenant schema backups and single-tenant restore.
+
+Each tenant schema is dumped on its own with `pg_dump --schema --format=custom`
+on a thread pool (the work happens in the pg_dump processes). A manifest next
+to the dumps records size, SHA-256 and a change signature per dump. The change
+signature is the schema's cumulative insert/update/delete count from
+pg_stat_user_tables plus its table count. A schema whose signature matches the
+last successful dump (whose file is still intact) is skipped, so a nightly
+run costs one catalog query plus a dump per tenant that actually changed.
+Resetting the statistics changes every signature, which just forces full dumps.
+
+Restoring under a new name goes through a scratch database: the dump is
+restored there, the schema renamed, then piped into the live database with
+pg_dump | pg_restore. Other schemas, including the original, are never touched.
+
+Scope: a dump is the tenant schema only (the TENANT_APPS tables). The
+tenant's rows in the public schema (users, billing, projects) are covered by
+the full database backup (devops/docker/backup.sh full).
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import tempfile
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from django_tenants.utils import get_public_schema_name
+
+
+MANIFEST_NAME = 'manifest.json'
+
+logger = logging.getLogger(__name__)
+
+
+def _pg_env():
+    db = settings.DATABASES['default']
+    env = dict(os.environ)
+    env.update({
+        'PGHOST': str(db.get('HOST') or 'localhost'),
+        'PGPORT': str(db.get('PORT') or '5432'),
+        'PGUSER': str(db.get('USER') or ''),
+        'PGPASSWORD': str(db.get('PASSWORD') or ''),
+    })
+    return env
+
+
+def _run(args):
+    result = subprocess.run(args, env=_pg_env(), capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f'{args[0]} exited with {result.returncode}')
+
+
+def sha256_file(path, block_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while block := f.read(block_size):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def schema_signatures(schema_names=None):
+    """Return {schema: [writes, tables]} for tenant schemas in one catalog query."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT n.nspname,
+                   COALESCE(SUM(s.n_tup_ins + s.n_tup_upd + s.n_tup_del), 0),
+                   COUNT(s.relid)
+            FROM pg_namespace n
+            LEFT JOIN pg_stat_user_tables s ON s.schemaname = n.nspname
+            WHERE n.nspname = ANY(%s)
+            GROUP BY n.nspname
+            """,
+            [list(schema_names)]
+        )
+        return {schema: [int(writes), tables] for schema, writes, tables in cursor.fetchall()}
+
+
+def load_manifest(backup_dir):
+    path = os.path.join(backup_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {'schemas': {}}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(backup_dir, manifest):
+    path = os.path.join(backup_dir, MANIFEST_NAME)
+    with open(f'{path}.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(f'{path}.tmp', path)
+
+
+def dump_schema(schema_name, path, compress=6):
+    """pg_dump one schema to path (custom format), written atomically."""
+    db_name = settings.DATABASES['default']['NAME']
+    _run([
+        'pg_dump', '--dbname', db_name, '--schema', schema_name,
+        '--format=custom', f'--compress={compress}',
+        '--no-owner', '--no-privileges', '--file', f'{path}.partial',
+    ])
+    os.replace(f'{path}.partial', path)
+
+
+def _is_unchanged(backup_dir, entry, signature):
+    if not entry or not entry.get('backups'):
+        return False
+    latest = entry['backups'][0]
+    path = os.path.join(backup_dir, latest['file'])
+    return (
+        latest.get('signature') == signature
+        and os.path.exists(path)
+        and os.path.getsize(path) == latest['size']
+    )
+
+
+def _backup_one(backup_dir, schema_name, signature, compress):
+    stamp = timezone.now().strftime('%Y%m%dT%H%M%SZ')
+    relative = os.path.join(schema_name, f'{stamp}.dump')
+    path = os.path.join(backup_dir, relative)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        dump_schema(schema_name, path, compress)
+    except Exception as exc:
+        return schema_name, None, str(exc)
+    return schema_name, {
+        'file': relative,
+        'size': os.path.getsize(path),
+        'sha256': sha256_file(path),
+        'signature': signature,
+        'created_at': timezone.now().isoformat(),
+    }, None
+
+
+def backup_tenants(backup_dir, schema_names, workers=4, compress=6, keep=7, force=False, dry_run=False):
+    """Dump changed schemas in parallel and update the manifest.
+
+    Returns {schema: 'dumped' | 'unchanged' | 'would dump' | 'failed: ...'}.
+    """
+    os.makedirs(backup_dir, exist_ok=True)
+    manifest = load_manifest(backup_dir)
+    entries = manifest.setdefault('schemas', {})
+    # Signatures are read before dumping, so writes made during a dump show up next run
+    signatures = schema_signatures(schema_names)
+
+    results, todo = {}, []
+    for schema_name in schema_names:
+        signature = signatures.get(schema_name)
+        if signature is None:
+            results[schema_name] = 'failed: schema does not exist'
+        elif not force and _is_unchanged(backup_dir, entries.get(schema_name), signature):
+            results[schema_name] = 'unchanged'
+        elif dry_run:
+            results[schema_name] = 'would dump'
+        else:
+            todo.append((schema_name, signature))
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(_backup_one, backup_dir, s, sig, compress) for s, sig in todo]
+        for future in futures:
+            schema_name, backup, error = future.result()
+            if error:
+                results[schema_name] = f'failed: {error}'
+                continue
+            entry = entries.setdefault(schema_name, {'backups': []})
+            entry['backups'].insert(0, backup)
+            for expired in entry['backups'][keep:]:
+                expired_path = os.path.join(backup_dir, expired['file'])
+                if os.path.exists(expired_path):
+                    os.remove(expired_path)
+            del entry['backups'][keep:]
+            results[schema_name] = 'dumped'
+
+    if not dry_run:
+        manifest['updated_at'] = timezone.now().isoformat()
+        save_manifest(backup_dir, manifest)
+    return results
+
+
+def find_backup(backup_dir, schema_name, at=None):
+    """Return the newest manifest entry for schema_name created at or before `at` (ISO string)."""
+    entry = load_manifest(backup_dir)['schemas'].get(schema_name)
+    for backup in (entry or {}).get('backups', []):
+        if at is None or backup['created_at'] <= at:
+            return backup
+    return None
+
+
+def verify_backup(backup_dir, backup):
+    path = os.path.join(backup_dir, backup['file'])
+    if not os.path.exists(path):
+        raise ValueError(f'Backup file {path} is missing')
+    if sha256_file(path) != backup['sha256']:
+        raise ValueError(f'Checksum mismatch for {path}')
+    return path
+
+
+def restore_schema(dump_path, source_schema, target_schema):
+    """Restore source_schema from a custom-format dump as target_schema."""
+    if target_schema == get_public_schema_name():
+        raise ValueError('Refusing to restore over the public schema')
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_namespace WHERE nspname = %s", [target_schema])
+        if cursor.fetchone() is not None:
+            raise ValueError(f'Schema "{target_schema}" already exists')
+
+    db_name = settings.DATABASES['default']['NAME']
+    scratch = f'{db_name}_restore_{os.getpid()}'
+    quoted_source = connection.ops.quote_name(source_schema)
+    quoted_target = connection.ops.quote_name(target_schema)
+    _run(['createdb', scratch])
+    try:
+        _run(['pg_restore', '--dbname', scratch, '--no-owner', '--no-privileges', '--exit-on-error', dump_path])
+        if source_schema != target_schema:
+            _run(['psql', '--dbname', scratch, '-v', 'ON_ERROR_STOP=1', '-c',
+                  f'ALTER SCHEMA {quoted_source} RENAME TO {quoted_target}'])
+
+        env = _pg_env()
+        # pg_dump's stderr goes to a file: a pipe nobody reads until pg_restore exits
+        # would block pg_dump once it fills, and pg_restore would wait on pg_dump forever
+        with tempfile.TemporaryFile() as dump_stderr:
+            dump = subprocess.Popen(
+                ['pg_dump', '--dbname', scratch, '--schema', target_schema, '--format=custom',
+                 '--no-owner', '--no-privileges'],
+                env=env, stdout=subprocess.PIPE, stderr=dump_stderr,
+            )
+            restore = subprocess.run(
+                ['pg_restore', '--dbname', db_name, '--no-owner', '--no-privileges',
+                 '--exit-on-error', '--single-transaction'],
+                env=env, stdin=dump.stdout, capture_output=True, text=True,
+            )
+            dump.stdout.close()
+            dump_failed = dump.wait() != 0
+            dump_stderr.seek(0)
+            dump_error = dump_stderr.read().decode(errors='replace').strip()
+        if dump_failed:
+            raise RuntimeError(dump_error or 'pg_dump from the scratch database failed')
+        if restore.returncode != 0:
+            raise RuntimeError(restore.stderr.strip() or 'pg_restore into the live database failed')
+    finally:
+        # A failed cleanup must not mask the restore's own outcome
+        try:
+            _run(['dropdb', '--if-exists', scratch])
+        except Exception:
+            logger.exception('Could not drop scratch database %s; drop it by hand', scratch)
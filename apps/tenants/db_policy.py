@@ -0,0 +1,83 @@
+"""
+Per-tenant database resource policies.
+
+Each tenant gets a statement_timeout, lock_timeout and work_mem, resolved from
+(in order) its own Client fields, its Plan, then the TENANT_DB_* settings. The
+public schema, and schemas selected by name before any Client for them has
+been seen in this process, run with the server defaults.
+
+The policy is applied by apps.tenants.postgresql_backend at the same point
+django-tenants sets search_path, and only when it differs from what the
+connection already has, so a reused connection serving the same tenant pays
+nothing and switching tenants costs one extra statement.
+
+Remembered policies are dropped when a Client or Plan is saved or deleted in
+this process; other processes pick up the change the next time they see the
+real tenant.
+"""
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+
+
+POLICY_PARAMETERS = ('statement_timeout', 'lock_timeout', 'work_mem')
+
+# schema -> policy, so schema_context()/set_schema() on a known tenant keeps its policy
+_policies_by_schema = {}
+
+
+def resolve_policy(tenant):
+    """Return (statement_timeout, lock_timeout, work_mem) as set_config strings."""
+    plan = tenant.plan if tenant.plan_id else None
+
+    def pick(field, default):
+        value = getattr(tenant, field)
+        if value in (None, '') and plan is not None:
+            value = getattr(plan, field)
+        return default if value in (None, '') else value
+
+    return (
+        str(pick('statement_timeout_ms', getattr(settings, 'TENANT_DB_STATEMENT_TIMEOUT_MS', 30000))),
+        str(pick('lock_timeout_ms', getattr(settings, 'TENANT_DB_LOCK_TIMEOUT_MS', 10000))),
+        str(pick('work_mem', getattr(settings, 'TENANT_DB_WORK_MEM', '4MB'))),
+    )
+
+
+def policy_for_tenant(tenant):
+    """Policy for whatever set_tenant() received; None means server defaults.
+
+    Real tenants are resolved and remembered by schema; FakeTenants (from
+    schema_context/set_schema) reuse the remembered policy if there is one.
+    """
+    if not getattr(settings, 'TENANT_DB_POLICIES_ENABLED', True):
+        return None
+    if not hasattr(tenant, 'statement_timeout_ms'):
+        return _policies_by_schema.get(tenant.schema_name)
+    policy = resolve_policy(tenant)
+    _policies_by_schema[tenant.schema_name] = policy
+    return policy
+
+
+def forget(schema_name=None):
+    """Drop remembered policies, e.g. after editing a tenant or plan."""
+    if schema_name is None:
+        _policies_by_schema.clear()
+    else:
+        _policies_by_schema.pop(schema_name, None)
+
+
+def _on_client_change(sender, instance, **kwargs):
+    forget(instance.schema_name)
+
+
+def _on_plan_change(sender, **kwargs):
+    forget()
+
+
+def connect_signals():
+    from apps.billing.models import Plan
+    from .models import Client
+
+    for signal, kind in ((post_save, 'save'), (post_delete, 'delete')):
+        signal.connect(_on_client_change, sender=Client, dispatch_uid=f'db_policy_client_{kind}')
+        signal.connect(_on_plan_change, sender=Plan, dispatch_uid=f'db_policy_plan_{kind}')
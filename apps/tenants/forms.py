@@ -31,7 +31,11 @@ class EditTenantForm(forms.ModelForm):
             'name',
             'on_trial',
             'is_active',
+            'plan',
         ]
+        widgets = {
+            'plan': forms.Select(attrs={'class': 'form-select'}),
+        }
 
 
 class AddDomainForm(forms.Form):
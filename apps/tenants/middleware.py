@@ -0,0 +1,66 @@
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django_tenants.middleware.main import TenantMainMiddleware
+
+from apps.common import versioning
+
+
+# Families whose writes can change what a hostname resolves to
+TENANT_FAMILIES = ('tenants', 'plans')
+
+
+class TenantMiddleware(TenantMainMiddleware):
+    """TenantMainMiddleware that loads the tenant's plan in the same query.
+
+    set_tenant() resolves the tenant's DB policy (and RateLimitMiddleware its
+    rate limit) from the plan, which would otherwise cost a second query.
+    With a shared cache, resolved tenants are kept per process by hostname
+    for TENANT_MEMO_SECONDS and revalidated against the tenants/plans data
+    versions, so a known host costs one cache get_many instead of the domain
+    query. The TTL bounds how long a deleted domain or deactivated tenant
+    can keep resolving if a bump is lost (e.g. evicted with the cache).
+
+    Under ASGI, MiddlewareMixin runs process_request() in one hop to the
+    request's thread-sensitive sync thread. That is the thread its ORM calls
+    (sync views and the async ORM alike) use, so set_tenant() lands on the
+    connection the request's queries will run on, never on the event loop.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self._tenants = {}  # hostname -> (data versions, expiry, tenant)
+        self._tenants_lock = threading.Lock()
+
+    def process_request(self, request):
+        # Probes arrive on pod IPs and must not cost a domain lookup
+        if request.path in getattr(settings, 'HEALTH_PROBE_PATHS', ()):
+            connection.set_schema_to_public()
+            return None
+        return super().process_request(request)
+
+    def get_tenant(self, domain_model, hostname):
+        ttl = getattr(settings, 'TENANT_MEMO_SECONDS', 0)
+        if ttl <= 0:
+            return self.load_tenant(domain_model, hostname)
+
+        # Read versions before the lookup, so a concurrent write retires what we store
+        versions = versioning.get_versions(*TENANT_FAMILIES)
+        memo = self._tenants.get(hostname)
+        if memo is not None and memo[0] == versions and memo[1] > time.monotonic():
+            # Each request gets its own copy; views may set attributes on request.tenant
+            return copy.copy(memo[2])
+
+        tenant = self.load_tenant(domain_model, hostname)
+        with self._tenants_lock:
+            if len(self._tenants) >= getattr(settings, 'TENANT_MEMO_SIZE', 1000):
+                self._tenants.clear()
+            self._tenants[hostname] = (versions, time.monotonic() + ttl, copy.copy(tenant))
+        return tenant
+
+    def load_tenant(self, domain_model, hostname):
+        domain = domain_model.objects.select_related('tenant', 'tenant__plan').get(domain=hostname)
+        return domain.tenant
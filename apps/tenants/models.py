@@ -6,7 +6,14 @@ class Client(TenantMixin):
     paid_until = models.DateField(null=True, blank=True)
     on_trial = models.BooleanField(default=True)
     is_active = models.BooleanField(default=True)
+    plan = models.ForeignKey('billing.Plan', on_delete=models.SET_NULL, null=True, blank=True, related_name='tenants')
     created_on = models.DateField(auto_now_add=True)
+    # Per-tenant database policy overrides; null/blank falls back to the plan, then TENANT_DB_* settings
+    statement_timeout_ms = models.PositiveIntegerField(null=True, blank=True)
+    lock_timeout_ms = models.PositiveIntegerField(null=True, blank=True)
+    work_mem = models.CharField(max_length=16, blank=True, help_text='e.g. 4MB, 64MB')
+    # Set when the tenant is deleted; the schema is dropped later by reap_schemas
+    pending_drop_since = models.DateTimeField(null=True, blank=True, db_index=True)
 
     auto_create_schema = True 
 
@@ -16,3 +23,26 @@ class Client(TenantMixin):
 
 class Domain(DomainMixin):
     pass
+
+
+class TenantUsage(models.Model):
+    """Per-tenant request resource usage, aggregated to one row per minute."""
+    schema_name = models.CharField(max_length=63)
+    minute = models.DateTimeField()
+    requests = models.PositiveIntegerField(default=0)
+    wall_ms = models.FloatField(default=0)
+    db_ms = models.FloatField(default=0)
+    queries = models.PositiveIntegerField(default=0)
+    response_bytes = models.BigIntegerField(default=0)
+    cache_ops = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["minute"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["schema_name", "minute"], name="unique_tenant_usage_minute"),
+        ]
+
+    def __str__(self):
+        return f"{self.schema_name} @ {self.minute:%Y-%m-%d %H:%M}"
@@ -0,0 +1,70 @@
+"""
+django-tenants PostgreSQL backend that also applies per-tenant resource
+policies (statement_timeout, lock_timeout, work_mem) when a cursor is handed
+out, alongside search_path. See apps.tenants.db_policy.
+"""
+
+import django.db.utils
+from django_tenants.postgresql_backend.base import DatabaseWrapper as TenantDatabaseWrapper
+
+from apps.tenants.db_policy import policy_for_tenant
+
+
+# Session state after a rollback may or may not include our last SET
+_UNKNOWN = object()
+
+_SET_POLICY_SQL = (
+    "SELECT set_config('statement_timeout', %s, false), "
+    "set_config('lock_timeout', %s, false), "
+    "set_config('work_mem', %s, false)"
+)
+_RESET_POLICY_SQL = 'RESET statement_timeout; RESET lock_timeout; RESET work_mem'
+
+
+class DatabaseWrapper(TenantDatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        # set_tenant() runs inside the parent __init__
+        self.db_policy = None
+        self.applied_db_policy = None
+        super().__init__(*args, **kwargs)
+
+    def set_tenant(self, tenant, include_public=True):
+        super().set_tenant(tenant, include_public)
+        self.db_policy = policy_for_tenant(tenant)
+
+    def close(self):
+        # A fresh session starts from the server defaults
+        self.applied_db_policy = None
+        super().close()
+
+    def _rollback(self):
+        # Rolling back can undo SETs made inside the transaction, including
+        # search_path, so re-apply both on the next cursor
+        self.applied_db_policy = _UNKNOWN
+        self.search_path_set_schemas = None
+        super()._rollback()
+
+    def _savepoint_rollback(self, sid):
+        self.applied_db_policy = _UNKNOWN
+        self.search_path_set_schemas = None
+        super()._savepoint_rollback(sid)
+
+    def _cursor(self, name=None):
+        cursor = super()._cursor(name=name)
+        policy = self.db_policy
+        if policy != self.applied_db_policy:
+            raw_cursor = self.connection.cursor()
+            # Same reasoning as django-tenants' search_path: inside a failed
+            # transaction just retry on the next cursor
+            try:
+                if policy is None:
+                    raw_cursor.execute(_RESET_POLICY_SQL)
+                else:
+                    raw_cursor.execute(_SET_POLICY_SQL, policy)
+            except (django.db.utils.DatabaseError, self.Database.Error):
+                self.applied_db_policy = _UNKNOWN
+            else:
+                self.applied_db_policy = policy
+            finally:
+                raw_cursor.close()
+        return cursor
@@ -0,0 +1,132 @@
+"""
+Tombstone-and-reap support for deleted tenant schemas.
+
+Deleting a tenant only detaches its domains and marks it pending-drop, so the
+request never waits on DROP SCHEMA. The reap_schemas command drops the schemas
+later in small, throttled batches.
+"""
+
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+from django_tenants.utils import get_public_schema_name
+
+from apps.common import versioning
+
+from .models import Client, Domain
+
+
+def mark_pending_drop(client):
+    """Detach the tenant from routing and tombstone its schema for the reaper."""
+    with transaction.atomic():
+        Domain.objects.filter(tenant=client).delete()
+        Client.objects.filter(pk=client.pk).update(
+            is_active=False,
+            pending_drop_since=timezone.now(),
+        )
+        # update() sends no signals; retire cached tenant lookups
+        versioning.bump('tenants')
+
+
+def is_protected_schema(schema_name: str) -> bool:
+    """Return True for schemas the reaper must never touch."""
+    protected = {get_public_schema_name(), 'information_schema'}
+    protected.update(getattr(settings, 'SCHEMA_REAPER_PROTECTED_SCHEMAS', ()))
+    return schema_name in protected or schema_name.startswith('pg_')
+
+
+def drop_schema(schema_name: str, lock_timeout_ms: int | None = None) -> None:
+    """Drop a schema, giving up instead of queueing behind long-held locks."""
+    if is_protected_schema(schema_name):
+        raise ValueError(f"Refusing to drop protected schema '{schema_name}'")
+    if lock_timeout_ms is None:
+        lock_timeout_ms = getattr(settings, 'SCHEMA_REAPER_LOCK_TIMEOUT_MS', 5000)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SET LOCAL lock_timeout = %s", [f"{int(lock_timeout_ms)}ms"])
+        cursor.execute(f"DROP SCHEMA IF EXISTS {connection.ops.quote_name(schema_name)} CASCADE")
+
+
+def _throttle(index: int, pause: float) -> None:
+    if index and pause:
+        time.sleep(pause)
+
+
+def reap_pending(batch_size: int | None = None, lock_timeout_ms: int | None = None,
+                 pause: float | None = None) -> list[tuple[str, str | None]]:
+    """Drop schemas of up to batch_size tombstoned tenants, oldest first.
+
+    Returns (schema_name, error) pairs; error is None on success. Tenants whose
+    drop fails stay tombstoned and are retried on the next run.
+    """
+    if batch_size is None:
+        batch_size = getattr(settings, 'SCHEMA_REAPER_BATCH_SIZE', 5)
+    if pause is None:
+        pause = getattr(settings, 'SCHEMA_REAPER_PAUSE_SECONDS', 1.0)
+
+    pending = list(
+        Client.objects.filter(pending_drop_since__isnull=False)
+        .order_by('pending_drop_since')
+        .values_list('pk', 'schema_name')[:batch_size]
+    )
+
+    results = []
+    for index, (pk, schema_name) in enumerate(pending):
+        _throttle(index, pause)
+        try:
+            drop_schema(schema_name, lock_timeout_ms)
+        except (DatabaseError, ValueError) as exc:
+            results.append((schema_name, str(exc)))
+            continue
+        Client.objects.filter(pk=pk).delete()
+        results.append((schema_name, None))
+    return results
+
+
+def find_orphan_schemas() -> list[str]:
+    """List former tenant schemas that no Client row points at.
+
+    Only schemas holding a django_migrations table count: migrate_schemas
+    creates one in every tenant schema, while extension schemas and other
+    non-tenant namespaces never have it.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT n.nspname
+            FROM pg_namespace n
+            WHERE EXISTS (
+                SELECT 1 FROM pg_class t
+                WHERE t.relnamespace = n.oid AND t.relname = 'django_migrations' AND t.relkind = 'r'
+            )
+            AND NOT EXISTS (
+                SELECT 1 FROM {connection.ops.quote_name(Client._meta.db_table)} c
+                WHERE c.schema_name = n.nspname
+            )
+            ORDER BY n.nspname
+            """
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    return [name for name in names if not is_protected_schema(name)]
+
+
+def reap_orphans(batch_size: int | None = None, lock_timeout_ms: int | None = None,
+                 pause: float | None = None) -> list[tuple[str, str | None]]:
+    """Drop up to batch_size orphan schemas. Same result shape as reap_pending."""
+    if batch_size is None:
+        batch_size = getattr(settings, 'SCHEMA_REAPER_BATCH_SIZE', 5)
+    if pause is None:
+        pause = getattr(settings, 'SCHEMA_REAPER_PAUSE_SECONDS', 1.0)
+
+    results = []
+    for index, schema_name in enumerate(find_orphan_schemas()[:batch_size]):
+        _throttle(index, pause)
+        try:
+            drop_schema(schema_name, lock_timeout_ms)
+        except (DatabaseError, ValueError) as exc:
+            results.append((schema_name, str(exc)))
+            continue
+        results.append((schema_name, None))
+    return results
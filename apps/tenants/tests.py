@@ -1,8 +1,20 @@
 from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection
 from django.urls import reverse
 from django.contrib.auth import get_user_model
-from .models import Client, Domain
+from django_tenants.utils import schema_exists
+from .models import Client, Domain, TenantUsage
 from .forms import CreateTenantForm
+from .reaper import find_orphan_schemas, reap_pending
+from .transfer import export_schema, import_schema
+from . import backup
+from apps.billing.models import Payment, Plan
+from apps.dashboard.models import Project
+from . import usage
+from . import db_policy
+import os
+import tempfile
 
 
 class TenantViewsTests(TestCase):
@@ -34,4 +46,137 @@ class TenantViewsTests(TestCase):
         })
         self.assertEqual(resp.status_code, 302)
 
+    def test_delete_marks_pending_and_reaper_drops_schema(self):
+        self.client.force_login(self.user)
+        tenant = Client(schema_name='tenantdel', name='Tenant Del')
+        tenant.save()
+        Domain.objects.create(domain='tenantdel.localhost', tenant=tenant, is_primary=True)
+
+        resp = self.client.post(reverse('tenants:delete', args=[tenant.pk]))
+        self.assertEqual(resp.status_code, 302)
+        tenant.refresh_from_db()
+        self.assertIsNotNone(tenant.pending_drop_since)
+        self.assertFalse(tenant.domains.exists())
+        self.assertTrue(schema_exists('tenantdel'))
+        self.assertNotContains(self.client.get(reverse('tenants:list')), 'Tenant Del')
+
+        self.assertEqual(reap_pending(batch_size=10, pause=0), [('tenantdel', None)])
+        self.assertFalse(Client.objects.filter(pk=tenant.pk).exists())
+        self.assertFalse(schema_exists('tenantdel'))
+
+    def test_orphans_are_former_tenant_schemas_only(self):
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE SCHEMA orphan_tenant')
+            cursor.execute('CREATE TABLE orphan_tenant.django_migrations (id serial PRIMARY KEY)')
+            cursor.execute('CREATE SCHEMA extension_stuff')
+        orphans = find_orphan_schemas()
+        self.assertIn('orphan_tenant', orphans)
+        self.assertNotIn('extension_stuff', orphans)
+        with self.settings(SCHEMA_REAPER_PROTECTED_SCHEMAS=('orphan_tenant',)):
+            self.assertNotIn('orphan_tenant', find_orphan_schemas())
+
+
+class TenantUsageTests(TestCase):
+    def test_requests_are_buffered_then_flushed_in_one_batch(self):
+        usage.flush()
+        request_usage = usage.RequestUsage()
+        request_usage.queries, request_usage.db_ms, request_usage.cache_ops = 3, 12.5, 2
+        usage.record('tenant_a', 40.0, request_usage, 1024)
+        usage.record('tenant_a', 20.0, request_usage, 1024)
+        usage.record('tenant_b', 5.0, usage.RequestUsage(), 10)
+        self.assertFalse(TenantUsage.objects.exists())
+
+        self.assertEqual(usage.flush(), 2)
+        top = usage.top_tenants(minutes=5, metric='db_ms')
+        self.assertEqual(top[0]['schema_name'], 'tenant_a')
+        self.assertEqual(top[0]['total_requests'], 2)
+        self.assertEqual(top[0]['total_queries'], 6)
+        self.assertEqual(top[0]['total_cache_ops'], 4)
+
+
+class TenantDbPolicyTests(TestCase):
+    def test_policy_applied_on_switch_and_reset_on_public(self):
+        plan = Plan.objects.create(name='Policy Pro', price=10, statement_timeout_ms=1500, work_mem='8MB')
+        tenant = Client(schema_name='tenantpolicy', name='Tenant Policy', plan=plan, lock_timeout_ms=700)
+        tenant.save()
+
+        def current():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT current_setting('statement_timeout'), current_setting('lock_timeout'), "
+                    "current_setting('work_mem')"
+                )
+                return cursor.fetchone()
+
+        default = current()
+        connection.set_tenant(tenant)
+        try:
+            self.assertEqual(current(), ('1500ms', '700ms', '8MB'))
+        finally:
+            connection.set_schema_to_public()
+        self.assertEqual(current(), default)
+
+    def test_remembered_policy_dropped_on_plan_and_client_change(self):
+        plan = Plan.objects.create(name='Policy Basic', price=5, work_mem='8MB')
+        tenant = Client(schema_name='tenantforget', name='Tenant Forget', plan=plan)
+        tenant.save()
+        db_policy.policy_for_tenant(tenant)
+        self.assertIn('tenantforget', db_policy._policies_by_schema)
+
+        plan.work_mem = '16MB'
+        plan.save()
+        self.assertNotIn('tenantforget', db_policy._policies_by_schema)
+
+        db_policy.policy_for_tenant(tenant)
+        tenant.lock_timeout_ms = 900
+        tenant.save()
+        self.assertNotIn('tenantforget', db_policy._policies_by_schema)
+
+
+class TenantTransferTests(TestCase):
+    def test_export_then_import_round_trips_rows(self):
+        tenant = Client(schema_name='tenantexport', name='Tenant Export')
+        tenant.save()
+        owner = get_user_model().objects.create_user(email='export-owner@example.com', password='pass1234')
+        get_user_model().objects.create_user(email='export-other@example.com', password='pass1234')
+        Project.objects.create(name='Exported', owner=owner, tenant_schema_name='tenantexport')
+        Payment.objects.create(user=owner, amount=10)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            exported = export_schema('tenantexport', tmp, 'jsonl', itersize=10)
+            self.assertGreater(exported['django_content_type'], 0)
+            self.assertEqual(exported['public.dashboard_project'], 1)
+            self.assertEqual(exported['public.users_user'], 1)
+            self.assertEqual(exported['public.billing_payment'], 1)
+            schema_tables = {table: rows for table, rows in exported.items() if not table.startswith('public.')}
+
+            imported = import_schema(os.path.join(tmp, 'tenantexport.jsonl.gz'), replace=True)
+            self.assertEqual(imported, schema_tables)
+
+            call_command('export_tenant', 'tenantexport', output=tmp, format='csv', workers=1, verbosity=0)
+            self.assertEqual(import_schema(os.path.join(tmp, 'tenantexport'), replace=True), schema_tables)
+
+
+class TenantBackupTests(TestCase):
+    def test_unchanged_schemas_are_skipped(self):
+        Client(schema_name='tenantbackup', name='Tenant Backup').save()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertEqual(backup.backup_tenants(tmp, ['tenantbackup'], dry_run=True), {'tenantbackup': 'would dump'})
+
+            # Pretend the previous run dumped the schema at its current signature
+            dump_path = os.path.join(tmp, 'tenantbackup.dump')
+            with open(dump_path, 'wb') as f:
+                f.write(b'dump')
+            backup.save_manifest(tmp, {'schemas': {'tenantbackup': {'backups': [{
+                'file': 'tenantbackup.dump',
+                'size': 4,
+                'sha256': backup.sha256_file(dump_path),
+                'signature': backup.schema_signatures(['tenantbackup'])['tenantbackup'],
+                'created_at': '2025-01-01T00:00:00+00:00',
+            }]}}})
+            self.assertEqual(backup.backup_tenants(tmp, ['tenantbackup'], dry_run=True), {'tenantbackup': 'unchanged'})
+            self.assertIsNotNone(backup.find_backup(tmp, 'tenantbackup', at='2025-06-01'))
+            self.assertIsNone(backup.find_backup(tmp, 'tenantbackup', at='2024-12-31'))
+
 # Create your tests here.
@@ -0,0 +1,343 @@
+"""
+Per-tenant logical export and import.
+
+Exports read every table in one schema through named (server-side) cursors,
+fetching TENANT_EXPORT_ITERSIZE rows at a time, and write gzip-compressed
+output as they go, so memory stays flat however large the tenant is. Values
+are exported in their PostgreSQL text representation (NULL stays null), which
+keeps JSONL and CSV lossless and lets imports feed them straight to COPY.
+
+An export is all of the tenant's data: every table in its schema, plus its
+rows in the public-schema business tables (see shared_sources(): projects
+with its tenant_schema_name, and their owners' users, payments and
+subscriptions). Imports load the schema tables only; the public rows of a
+live tenant are still in place, and ids from another database could
+collide with existing ones.
+
+Formats:
+  jsonl  one stream: a {"schema": ...} line, then per table a
+         {"table": ..., "columns": [...]} line followed by one JSON array per row
+         (public-schema tables come last, with "shared": true in their header)
+  csv    a directory with manifest.json and one <table>.csv.gz per table,
+         in COPY's CSV dialect (NULL is an empty unquoted field); public-schema
+         tables are public.<table>.csv.gz, listed under "shared_tables"
+"""
+
+import gzip
+import json
+import os
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.utils import timezone
+from django_tenants.utils import get_public_schema_name
+
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+
+
+def _qn(name):
+    return connection.ops.quote_name(name)
+
+
+def _itersize():
+    return getattr(settings, 'TENANT_EXPORT_ITERSIZE', 2000)
+
+
+def schema_exists(schema_name):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_namespace WHERE nspname = %s", [schema_name])
+        return cursor.fetchone() is not None
+
+
+def list_tables(schema_name):
+    """Return [(table, [column, ...])] for the schema, in name order.
+
+    Generated columns are skipped: they cannot be written by COPY and are
+    recomputed on import.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname, array_agg(a.attname ORDER BY a.attnum)
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            JOIN pg_attribute a ON a.attrelid = c.oid
+            WHERE n.nspname = %s AND c.relkind IN ('r', 'p')
+              AND a.attnum > 0 AND NOT a.attisdropped AND a.attgenerated = ''
+            GROUP BY c.relname
+            ORDER BY c.relname
+            """,
+            [schema_name]
+        )
+        return [(table, list(columns)) for table, columns in cursor.fetchall()]
+
+
+def shared_sources(schema_name):
+    """Return [(table, columns, where, params)] selecting the tenant's rows in public-schema tables.
+
+    User rows leave out the password hash and token revocation time.
+    """
+    from apps.billing.models import Payment, Subscription
+    from apps.dashboard.models import Project
+
+    def columns(model, exclude=()):
+        return [f.column for f in model._meta.concrete_fields if not f.generated and f.name not in exclude]
+
+    owners = (
+        f'SELECT owner_id FROM {_qn(get_public_schema_name())}.{_qn(Project._meta.db_table)} '
+        f'WHERE tenant_schema_name = %s'
+    )
+    User = get_user_model()
+    return [
+        (Project._meta.db_table, columns(Project), 'tenant_schema_name = %s', [schema_name]),
+        (User._meta.db_table, columns(User, exclude=('password', 'tokens_revoked_at')), f'id IN ({owners})', [schema_name]),
+        (Payment._meta.db_table, columns(Payment), f'user_id IN ({owners})', [schema_name]),
+        (Subscription._meta.db_table, columns(Subscription), f'user_id IN ({owners})', [schema_name]),
+    ]
+
+
+def export_sources(schema_name):
+    """Return [(name, source schema, table, columns, where, params)] for everything an export holds.
+
+    Schema tables are named as they are; public-schema tables as public.<table>.
+    """
+    public = get_public_schema_name()
+    sources = [(table, schema_name, table, columns, None, ()) for table, columns in list_tables(schema_name)]
+    sources += [
+        (f'{public}.{table}', public, table, columns, where, params)
+        for table, columns, where, params in shared_sources(schema_name)
+    ]
+    return sources
+
+
+def iter_rows(schema_name, table, columns, itersize=None, where=None, params=()):
+    """Yield rows of text/None values using a server-side cursor."""
+    itersize = itersize or _itersize()
+    select = ', '.join(f'{_qn(column)}::text' for column in columns)
+    sql = f'SELECT {select} FROM {_qn(schema_name)}.{_qn(table)}'
+    if where:
+        sql += f' WHERE {where}'
+    cursor = connection.chunked_cursor()
+    try:
+        cursor.execute(sql, params or None)
+        while rows := cursor.fetchmany(itersize):
+            yield from rows
+    finally:
+        cursor.close()
+
+
+def csv_line(values):
+    """Format one row in COPY's CSV dialect: None is an unquoted empty field."""
+    return ','.join(
+        '' if value is None else '"' + value.replace('"', '""') + '"'
+        for value in values
+    ) + '\n'
+
+
+def iter_jsonl(schema_name, itersize=None):
+    """Yield the whole schema as JSONL bundle lines."""
+    yield json.dumps({
+        'schema': schema_name,
+        'version': FORMAT_VERSION,
+        'exported_at': timezone.now().isoformat(),
+    }) + '\n'
+    for name, source, table, columns, where, params in export_sources(schema_name):
+        header = {'table': table, 'columns': columns}
+        if source != schema_name:
+            header['shared'] = True
+        yield json.dumps(header) + '\n'
+        for row in iter_rows(source, table, columns, itersize, where, params):
+            yield json.dumps(row) + '\n'
+
+
+def iter_csv(schema_name, table, columns, itersize=None, where=None, params=()):
+    """Yield one table as CSV lines, header first."""
+    yield csv_line(columns)
+    for row in iter_rows(schema_name, table, columns, itersize, where, params):
+        yield csv_line(row)
+
+
+def export_schema(schema_name, output_dir, fmt='jsonl', itersize=None):
+    """Export one tenant under output_dir and return {table: rows} (public.<table> for shared rows)."""
+    if not schema_exists(schema_name):
+        raise ValueError(f'Schema "{schema_name}" does not exist')
+
+    counts = {}
+    os.makedirs(output_dir, exist_ok=True)
+    if fmt == 'jsonl':
+        path = os.path.join(output_dir, f'{schema_name}.jsonl.gz')
+        with gzip.open(path, 'wt', encoding='utf-8', newline='') as out:
+            name = None
+            for line in iter_jsonl(schema_name, itersize):
+                if line.startswith('{"table"'):
+                    header = json.loads(line)
+                    name = f'{get_public_schema_name()}.{header["table"]}' if header.get('shared') else header['table']
+                    counts[name] = 0
+                elif name is not None:
+                    counts[name] += 1
+                out.write(line)
+        return counts
+
+    schema_dir = os.path.join(output_dir, schema_name)
+    os.makedirs(schema_dir, exist_ok=True)
+    manifest = {
+        'schema': schema_name,
+        'version': FORMAT_VERSION,
+        'exported_at': timezone.now().isoformat(),
+        'tables': [],
+        'shared_tables': [],
+    }
+    for name, source, table, columns, where, params in export_sources(schema_name):
+        with gzip.open(os.path.join(schema_dir, f'{name}.csv.gz'), 'wt', encoding='utf-8', newline='') as out:
+            out.write(csv_line(columns))
+            rows = 0
+            for row in iter_rows(source, table, columns, itersize, where, params):
+                out.write(csv_line(row))
+                rows += 1
+        counts[name] = rows
+        entry = {'name': table, 'columns': columns, 'rows': rows}
+        manifest['tables' if source == schema_name else 'shared_tables'].append(entry)
+    with open(os.path.join(schema_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return counts
+
+
+class _CopyReader:
+    """File-like object that feeds rows to COPY ... FROM STDIN as CSV."""
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._pending = ''
+        self.rows = 0
+
+    def read(self, size=-1):
+        parts, length = [self._pending], len(self._pending)
+        while size < 0 or length < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            line = csv_line(row)
+            parts.append(line)
+            length += len(line)
+            self.rows += 1
+        data = ''.join(parts)
+        if size < 0:
+            self._pending = ''
+            return data
+        self._pending = data[size:]
+        return data[:size]
+
+
+class _Bundle:
+    """Sequential reader for a JSONL bundle; each table's rows must be consumed in order."""
+
+    def __init__(self, fileobj):
+        self._records = (json.loads(line) for line in fileobj if line.strip())
+        self.meta = next(self._records, None) or {}
+        self._next = next(self._records, None)
+
+    def _rows(self):
+        for record in self._records:
+            if isinstance(record, dict):
+                self._next = record
+                return
+            yield record
+
+    def tables(self):
+        while self._next is not None:
+            header, self._next = self._next, None
+            yield header['table'], header['columns'], header.get('shared', False), self._rows()
+
+
+def _copy_in(cursor, schema_name, table, columns, fileobj, header):
+    cursor.copy_expert(
+        f'COPY {_qn(schema_name)}.{_qn(table)} ({", ".join(_qn(c) for c in columns)}) '
+        f'FROM STDIN WITH (FORMAT csv, HEADER {"true" if header else "false"})',
+        fileobj
+    )
+
+
+def _reset_sequences(cursor, schema_name):
+    """Move every sequence owned by a column in the schema past the imported max."""
+    cursor.execute(
+        """
+        SELECT s.relname, t.relname, a.attname
+        FROM pg_class s
+        JOIN pg_namespace n ON n.oid = s.relnamespace
+        JOIN pg_depend d ON d.objid = s.oid AND d.classid = 'pg_class'::regclass
+            AND d.refclassid = 'pg_class'::regclass
+        JOIN pg_class t ON t.oid = d.refobjid
+        JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = d.refobjsubid
+        WHERE s.relkind = 'S' AND n.nspname = %s
+        """,
+        [schema_name]
+    )
+    for sequence, table, column in cursor.fetchall():
+        cursor.execute(
+            f'SELECT setval(%s, COALESCE(MAX({_qn(column)}), 1), MAX({_qn(column)}) IS NOT NULL) '
+            f'FROM {_qn(schema_name)}.{_qn(table)}',
+            [f'{_qn(schema_name)}.{_qn(sequence)}']
+        )
+
+
+def import_schema(path, schema_name=None, replace=False):
+    """Load an export into an existing schema with COPY and return {table: rows}.
+
+    Runs in one transaction, so a failed import leaves the schema untouched.
+    With replace=True the target tables are truncated first (a freshly
+    migrated tenant already has content types and permissions). Public-schema
+    tables in the export are left out.
+    """
+    if os.path.isdir(path):
+        with open(os.path.join(path, MANIFEST_NAME), encoding='utf-8') as f:
+            manifest = json.load(f)
+        schema_name = schema_name or manifest['schema']
+        sources = [(t['name'], t['columns'], os.path.join(path, f'{t["name"]}.csv.gz'), t['rows'])
+                   for t in manifest['tables']]
+        return _import(schema_name, replace, csv_sources=sources)
+
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        bundle = _Bundle(f)
+        schema_name = schema_name or bundle.meta.get('schema')
+        return _import(schema_name, replace, bundle=bundle)
+
+
+def _import(schema_name, replace, csv_sources=None, bundle=None):
+    if not schema_name or not schema_exists(schema_name):
+        raise ValueError(f'Schema "{schema_name}" does not exist; create the tenant first')
+    target = dict(list_tables(schema_name))
+
+    def check(table, columns):
+        if table not in target:
+            raise ValueError(f'Table "{table}" does not exist in schema "{schema_name}"')
+        missing = set(columns) - set(target[table])
+        if missing:
+            raise ValueError(f'Table "{table}" has no column(s) {", ".join(sorted(missing))}')
+
+    counts = {}
+    # Django creates foreign keys DEFERRABLE INITIALLY DEFERRED, so table order does not matter
+    with transaction.atomic(), connection.cursor() as cursor:
+        if replace and target:
+            cursor.execute('TRUNCATE ' + ', '.join(f'{_qn(schema_name)}.{_qn(t)}' for t in target))
+        if csv_sources is not None:
+            for table, columns, file_path, rows in csv_sources:
+                check(table, columns)
+                with gzip.open(file_path, 'rt', encoding='utf-8', newline='') as f:
+                    _copy_in(cursor, schema_name, table, columns, f, header=True)
+                counts[table] = rows
+        else:
+            for table, columns, shared, rows in bundle.tables():
+                if shared:
+                    # Public-schema rows are part of the handoff, not of the schema restore
+                    for _ in rows:
+                        pass
+                    continue
+                check(table, columns)
+                reader = _CopyReader(rows)
+                _copy_in(cursor, schema_name, table, columns, reader, header=False)
+                counts[table] = reader.rows
+        _reset_sequences(cursor, schema_name)
+    return counts
@@ -8,6 +8,7 @@ from .views import (
     set_primary_domain_view,
     delete_domain_view,
     delete_tenant_view,
+    export_tenant_view,
 )
 
 app_name = 'tenants'
@@ -21,5 +22,6 @@ urlpatterns = [
     path('<int:pk>/domains/<int:domain_id>/primary/', set_primary_domain_view, name='domain_primary'),
     path('<int:pk>/domains/<int:domain_id>/delete/', delete_domain_view, name='domain_delete'),
     path('<int:pk>/delete/', delete_tenant_view, name='delete'),
+    path('<int:pk>/export/', export_tenant_view, name='export'),
 ]
 
@@ -0,0 +1,145 @@
+"""
+Per-tenant resource accounting.
+
+TimingMiddleware opens a RequestUsage for every request, counts DB time and
+queries through a connection execute_wrapper and cache operations through the
+counting cache backends, then folds the totals into an in-process buffer keyed
+by (schema, minute). The buffer is written to TenantUsage in one upsert at most
+once per TENANT_USAGE_FLUSH_INTERVAL, so requests never write usage rows.
+"""
+
+from contextvars import ContextVar
+from datetime import timedelta
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Sum
+from django.utils import timezone
+from django_tenants.utils import get_public_schema_name, schema_context
+
+from .models import TenantUsage
+
+
+logger = logging.getLogger(__name__)
+
+USAGE_FIELDS = ('requests', 'wall_ms', 'db_ms', 'queries', 'response_bytes', 'cache_ops')
+
+_current = ContextVar('tenant_usage', default=None)
+_buffer: dict[tuple[str, object], list] = {}
+_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+class RequestUsage:
+    """Counters for a single request."""
+
+    __slots__ = ('db_ms', 'queries', 'cache_ops')
+
+    def __init__(self):
+        self.db_ms = 0.0
+        self.queries = 0
+        self.cache_ops = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_ms += (time.perf_counter() - start) * 1000
+            self.queries += 1
+
+
+def start_request():
+    usage = RequestUsage()
+    return usage, _current.set(usage)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def count_cache_op(n: int = 1) -> None:
+    """Called by the counting cache backends; no-op outside a request."""
+    usage = _current.get()
+    if usage is not None:
+        usage.cache_ops += n
+
+
+def record(schema_name: str, wall_ms: float, usage: RequestUsage, response_bytes: int) -> None:
+    """Fold one finished request into the in-memory buffer."""
+    minute = timezone.now().replace(second=0, microsecond=0)
+    key = (schema_name, minute)
+    with _lock:
+        row = _buffer.get(key)
+        if row is None:
+            row = _buffer[key] = [0, 0.0, 0.0, 0, 0, 0]
+        row[0] += 1
+        row[1] += wall_ms
+        row[2] += usage.db_ms
+        row[3] += usage.queries
+        row[4] += response_bytes
+        row[5] += usage.cache_ops
+
+
+def flush_due() -> bool:
+    return time.monotonic() - _last_flush >= getattr(settings, 'TENANT_USAGE_FLUSH_INTERVAL', 60)
+
+
+def maybe_flush() -> None:
+    """Flush the buffer if the flush interval has elapsed."""
+    if flush_due():
+        flush()
+
+
+def flush() -> int:
+    """Write buffered usage to TenantUsage in a single upsert. Returns rows written."""
+    global _buffer, _last_flush
+    with _lock:
+        pending, _buffer = _buffer, {}
+        _last_flush = time.monotonic()
+    if not pending:
+        return 0
+
+    table = connection.ops.quote_name(TenantUsage._meta.db_table)
+    columns = ', '.join(USAGE_FIELDS)
+    updates = ', '.join(f'{f} = {table}.{f} + EXCLUDED.{f}' for f in USAGE_FIELDS)
+    placeholders = ', '.join(['(%s, %s, %s, %s, %s, %s, %s, %s)'] * len(pending))
+    params = []
+    for (schema_name, minute), row in pending.items():
+        params.extend([schema_name, minute, *row])
+
+    try:
+        with schema_context(get_public_schema_name()), connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} (schema_name, minute, {columns}) VALUES {placeholders} "
+                f"ON CONFLICT (schema_name, minute) DO UPDATE SET {updates}",
+                params,
+            )
+    except Exception:
+        logger.warning("Failed to flush tenant usage (%d rows)", len(pending), exc_info=True)
+        return 0
+    return len(pending)
+
+
+def top_tenants(minutes: int = 60, metric: str = 'db_ms', limit: int = 10) -> list[dict]:
+    """Aggregate usage over the last `minutes` and rank tenants by `metric`.
+
+    Rows carry `schema_name` plus `total_<field>` for every usage field.
+    """
+    if metric not in USAGE_FIELDS:
+        raise ValueError(f"Unknown metric '{metric}'. Choose one of: {', '.join(USAGE_FIELDS)}")
+    since = timezone.now() - timedelta(minutes=minutes)
+    return list(
+        TenantUsage.objects.filter(minute__gte=since)
+        .values('schema_name')
+        .annotate(**{f'total_{f}': Sum(f) for f in USAGE_FIELDS})
+        .order_by(f'-total_{metric}')[:limit]
+    )
+
+
+atexit.register(flush)
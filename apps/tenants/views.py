@@ -1,9 +1,16 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_protect
 from django.contrib import messages
+from apps.common import counting
+from apps.common.decorators import conditional_on_data
 from .forms import CreateTenantForm, EditTenantForm, AddDomainForm
 from .models import Client, Domain
+from .reaper import mark_pending_drop
+from apps.common.utils import gzip_chunks
+from .transfer import export_sources, iter_csv, iter_jsonl
 from django_tenants.utils import tenant_context
 from apps.users.models import User
 from apps.billing.models import Subscription, Payment
@@ -39,8 +46,12 @@ def create_tenant_view(request):
 
 
 @login_required
+@conditional_on_data('tenants')
 def list_tenants_view(request):
-    clients = Client.objects.all().prefetch_related('domains').order_by('-created_on')
+    clients = (
+        Client.objects.filter(pending_drop_since__isnull=True)
+        .prefetch_related('domains').order_by('-created_on')
+    )
     return render(request, 'tenants/list_tenants.html', {
         'clients': clients,
     })
@@ -60,7 +71,7 @@ def tenant_detail_view(request, pk: int):
     # Try to read tenant-specific stats inside the tenant schema
     try:
         with tenant_context(client):
-            metrics['users_count'] = User.objects.count()
+            metrics['users_count'] = counting.count(User)
             metrics['active_subscriptions_count'] = Subscription.objects.filter(active=True, end_date__gte=now().date()).count()
             metrics['monthly_revenue'] = (
                 Payment.objects.filter(date__year=now().year, date__month=now().month)
@@ -143,10 +154,32 @@ def delete_domain_view(request, pk: int, domain_id: int):
 @csrf_protect
 def delete_tenant_view(request, pk: int):
     client = get_object_or_404(Client, pk=pk)
-    name = client.name
-    # WARNING: This does not drop the DB schema. For full cleanup, integrate schema drop if desired.
-    client.domains.all().delete()
-    client.delete()
-    messages.success(request, f"Tenant '{name}' deleted.")
+    # The schema itself is dropped asynchronously by the reap_schemas command
+    mark_pending_drop(client)
+    messages.success(request, f"Tenant '{client.name}' deleted.")
     return redirect('tenants:list')
 
+
+@staff_member_required
+def export_tenant_view(request, pk: int):
+    """Stream a tenant's data: everything as JSONL, or one table as CSV (?format=csv&table=).
+
+    `table` is a schema table name, or public.<table> for the tenant's public-schema rows.
+    """
+    client = get_object_or_404(Client, pk=pk)
+    schema_name = client.schema_name
+    if request.GET.get('format') == 'csv':
+        name = request.GET.get('table')
+        sources = {source[0]: source[1:] for source in export_sources(schema_name)}
+        if name not in sources:
+            raise Http404('Unknown table')
+        source, table, columns, where, params = sources[name]
+        lines = iter_csv(source, table, columns, where=where, params=params)
+        filename = f'{schema_name}-{name}.csv.gz'
+    else:
+        lines = iter_jsonl(schema_name)
+        filename = f'{schema_name}.jsonl.gz'
+
+    response = StreamingHttpResponse(gzip_chunks(lines), content_type='application/gzip')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
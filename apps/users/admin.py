@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from apps.common.counting import EstimatedCountPaginator
 from .models import User
 
 class UserAdmin(BaseUserAdmin):
@@ -18,5 +19,7 @@ class UserAdmin(BaseUserAdmin):
     )
     search_fields = ['email']
     filter_horizontal = ()
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 admin.site.register(User, UserAdmin)
@@ -24,6 +24,10 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
     date_joined = models.DateTimeField(auto_now_add=True)
+    tokens_revoked_at = models.DateTimeField(
+        null=True, blank=True, editable=False,
+        help_text='API tokens issued at or before this time are refused on refresh.',
+    )
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
@@ -1,4 +1,5 @@
 import os
+from datetime import timedelta
 from pathlib import Path
 
 
@@ -68,11 +69,12 @@ INSTALLED_APPS = [
 ]
 
 # Caching (locmem by default; swap for Redis in production)
+# Counting backends feed cache ops into per-tenant usage accounting
 REDIS_URL = os.environ.get('REDIS_URL')
 if REDIS_URL:
     CACHES = {
         'default': {
-            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'BACKEND': 'apps.common.cache_backends.CountingRedisCache',
             'LOCATION': REDIS_URL,
             'TIMEOUT': 300,
         }
@@ -80,16 +82,131 @@ if REDIS_URL:
 else:
     CACHES = {
         'default': {
-            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'BACKEND': 'apps.common.cache_backends.CountingLocMemCache',
             'LOCATION': 'multitenant-saas-cache',
             'TIMEOUT': 300,
         }
     }
+# Whether every process sees the same cache; anything that must notice another worker's
+# writes through it (data versions, memos) is only trusted across processes when it does
+CACHE_IS_SHARED = bool(REDIS_URL)
 
 # Cache TTLs (seconds)
 DASHBOARD_CACHE_TTL = int(os.environ.get('DASHBOARD_CACHE_TTL', '120'))
+# Data version families (apps.common.versioning): bumped on writes to any listed model,
+# used in cache keys and conditional-GET ETags
+DATA_VERSION_FAMILIES = {
+    'users': ['users.User'],
+    'payments': ['billing.Payment'],
+    'subscriptions': ['billing.Subscription'],
+    'plans': ['billing.Plan'],
+    'tenants': ['tenants.Client', 'tenants.Domain'],
+    'projects': ['dashboard.Project'],
+    'settings': ['common.SystemSetting'],
+}
+# The dashboard widget payload is keyed by data version, so this only bounds time-dependent values
+DASHBOARD_FRAGMENT_TTL = int(os.environ.get('DASHBOARD_FRAGMENT_TTL', '600'))
 ANALYTICS_CACHE_TTL = int(os.environ.get('ANALYTICS_CACHE_TTL', '300'))
+# warm_caches rebuilds dashboard/analytics payloads once they are past this share of their TTL
+CACHE_WARM_REFRESH_RATIO = float(os.environ.get('CACHE_WARM_REFRESH_RATIO', '0.8'))
+ANALYTICS_SERIES_MAX_POINTS = int(os.environ.get('ANALYTICS_SERIES_MAX_POINTS', '1000'))
 SYSTEM_SETTINGS_CACHE_TTL = int(os.environ.get('SYSTEM_SETTINGS_CACHE_TTL', '600'))
+# Rendered API responses (apps.common.response_cache); keyed by data version, so this bounds time-dependent values
+API_RESPONSE_CACHE_TTL = int(os.environ.get('API_RESPONSE_CACHE_TTL', '300'))
+# /api/bulk/<target>/: IDs (or objects) accepted per request, and IDs per UPDATE/DELETE statement
+BULK_OPERATION_MAX_IDS = int(os.environ.get('BULK_OPERATION_MAX_IDS', '1000'))
+BULK_OPERATION_CHUNK_SIZE = int(os.environ.get('BULK_OPERATION_CHUNK_SIZE', '500'))
+
+# API authentication: tenant-bound JWTs (apps.common.authentication) need no session or user
+# query per request; sessions still work for the browsable API
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'apps.common.authentication.TenantJWTAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+    ],
+}
+SIMPLE_JWT = {
+    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=int(os.environ.get('JWT_ACCESS_TOKEN_MINUTES', '5'))),
+    'REFRESH_TOKEN_LIFETIME': timedelta(hours=int(os.environ.get('JWT_REFRESH_TOKEN_HOURS', '24'))),
+    'SIGNING_KEY': os.environ.get('JWT_SIGNING_KEY', SECRET_KEY),
+    'AUTH_HEADER_TYPES': ('Bearer',),
+    'UPDATE_LAST_LOGIN': False,
+}
+
+# Rows fetched per server-side cursor round trip in the streamed CSV report
+REPORT_EXPORT_CHUNK_SIZE = int(os.environ.get('REPORT_EXPORT_CHUNK_SIZE', '2000'))
+# Background report jobs (run_report_jobs); identical requests reuse an artifact for REPORT_JOB_REUSE_SECONDS
+REPORT_JOB_REUSE_SECONDS = int(os.environ.get('REPORT_JOB_REUSE_SECONDS', '900'))
+REPORT_JOB_RETENTION_SECONDS = int(os.environ.get('REPORT_JOB_RETENTION_SECONDS', '86400'))
+REPORT_JOB_TIMEOUT_SECONDS = int(os.environ.get('REPORT_JOB_TIMEOUT_SECONDS', '3600'))
+# Exact row counts kept in RowCount rows (apps.common.counting); admin changelists switch to
+# planner estimates once a table passes ADMIN_ESTIMATED_COUNT_THRESHOLD rows
+ROW_COUNTED_MODELS = ['users.User', 'billing.Payment', 'billing.Subscription', 'tenants.Client']
+# Rows per counter; writers spread over them instead of serialising on one (recount_rows after changing)
+ROW_COUNT_SLOTS = int(os.environ.get('ROW_COUNT_SLOTS', '16'))
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(os.environ.get('ADMIN_ESTIMATED_COUNT_THRESHOLD', '100000'))
+# /metrics (OpenMetrics): snapshot rebuilt at most once per METRICS_INTERVAL across all workers;
+# scrapers send `Authorization: Bearer <METRICS_TOKEN>` (staff sessions only when unset)
+METRICS_INTERVAL = int(os.environ.get('METRICS_INTERVAL', '15'))
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_TENANT_LABEL_LIMIT = int(os.environ.get('METRICS_TENANT_LABEL_LIMIT', '50'))
+# Health checks (apps.common.health): per-check timeout, results memoized per process
+HEALTH_CHECK_TIMEOUT = float(os.environ.get('HEALTH_CHECK_TIMEOUT', '2'))
+HEALTH_CHECK_CACHE_SECONDS = float(os.environ.get('HEALTH_CHECK_CACHE_SECONDS', '5'))
+# Served on any host without a tenant lookup (load balancer/orchestrator probes, scrapes by pod IP)
+HEALTH_PROBE_PATHS = ('/livez', '/readyz', '/metrics')
+# Keyset-paginated project API (/api/projects/)
+PROJECT_PAGE_SIZE = int(os.environ.get('PROJECT_PAGE_SIZE', '50'))
+PROJECT_PAGE_SIZE_MAX = int(os.environ.get('PROJECT_PAGE_SIZE_MAX', '200'))
+
+# Per-tenant usage accounting (TimingMiddleware -> TenantUsage)
+TENANT_USAGE_ENABLED = os.environ.get('TENANT_USAGE_ENABLED', 'True') == 'True'
+TENANT_USAGE_FLUSH_INTERVAL = int(os.environ.get('TENANT_USAGE_FLUSH_INTERVAL', '60'))
+# Hostnames whose resolved tenant TenantMiddleware keeps per process, revalidated by data
+# version and dropped after TENANT_MEMO_SECONDS; off (0) unless the cache is shared (Redis),
+# since LocMem versions never see another worker's writes
+TENANT_MEMO_SIZE = int(os.environ.get('TENANT_MEMO_SIZE', '1000'))
+TENANT_MEMO_SECONDS = int(os.environ.get('TENANT_MEMO_SECONDS', '30')) if CACHE_IS_SHARED else 0
+
+# Per-tenant rate limiting (RateLimitMiddleware); limits resolve from the
+# ratelimit_<schema> SystemSetting, the tenant's Plan, then these defaults
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'True') == 'True'
+RATE_LIMIT_DEFAULT_PER_MINUTE = int(os.environ.get('RATE_LIMIT_DEFAULT_PER_MINUTE', '600'))
+RATE_LIMIT_PER_USER = os.environ.get('RATE_LIMIT_PER_USER', 'False') == 'True'
+RATE_LIMIT_POLICY_TTL = int(os.environ.get('RATE_LIMIT_POLICY_TTL', '60'))
+RATE_LIMIT_EXEMPT_PREFIXES = ('/static/', '/media/', '/metrics', '/livez', '/readyz')
+# (path prefix, route class, share of the tenant limit)
+RATE_LIMIT_ROUTE_CLASSES = (
+    ('/export-report/', 'export', 0.05),
+    ('/api/', 'api', 1.0),
+)
+
+# Per-tenant DB policies (apps.tenants.postgresql_backend); Client fields
+# override Plan fields, which override these defaults
+TENANT_DB_POLICIES_ENABLED = os.environ.get('TENANT_DB_POLICIES_ENABLED', 'True') == 'True'
+TENANT_DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('TENANT_DB_STATEMENT_TIMEOUT_MS', '30000'))
+TENANT_DB_LOCK_TIMEOUT_MS = int(os.environ.get('TENANT_DB_LOCK_TIMEOUT_MS', '10000'))
+TENANT_DB_WORK_MEM = os.environ.get('TENANT_DB_WORK_MEM', '4MB')
+# Only SET search_path when the schema changes; the backend re-applies it after rollbacks
+TENANT_LIMIT_SET_CALLS = True
+
+# Tenant export/import (export_tenant, import_tenant, tenants:export)
+TENANT_EXPORT_ITERSIZE = int(os.environ.get('TENANT_EXPORT_ITERSIZE', '2000'))
+
+# Per-schema backups (backup_tenants, restore_tenant)
+TENANT_BACKUP_DIR = os.environ.get('TENANT_BACKUP_DIR', str(BASE_DIR / 'backups' / 'tenants'))
+TENANT_BACKUP_WORKERS = int(os.environ.get('TENANT_BACKUP_WORKERS', '4'))
+TENANT_BACKUP_KEEP = int(os.environ.get('TENANT_BACKUP_KEEP', '7'))
+
+# Schema reaper (reap_schemas command)
+SCHEMA_REAPER_BATCH_SIZE = int(os.environ.get('SCHEMA_REAPER_BATCH_SIZE', '5'))
+SCHEMA_REAPER_LOCK_TIMEOUT_MS = int(os.environ.get('SCHEMA_REAPER_LOCK_TIMEOUT_MS', '5000'))
+SCHEMA_REAPER_PAUSE_SECONDS = float(os.environ.get('SCHEMA_REAPER_PAUSE_SECONDS', '1'))
+# Comma-separated schemas never dropped, on top of public, information_schema and pg_*
+SCHEMA_REAPER_PROTECTED_SCHEMAS = tuple(
+    name.strip() for name in os.environ.get('SCHEMA_REAPER_PROTECTED_SCHEMAS', '').split(',') if name.strip()
+)
 
 # Dev email backend
 if DEBUG:
@@ -138,7 +255,7 @@ TENANT_DOMAIN_MODEL = "tenants.Domain"
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django_tenants.postgresql_backend',
+        'ENGINE': 'apps.tenants.postgresql_backend',
         'NAME': os.environ.get('DB_NAME', 'multitenant_saas'),
         'USER': os.environ.get('DB_USER', 'saasadmin'),
         'PASSWORD': os.environ.get('DB_PASSWORD', 'admin'),
@@ -154,12 +271,13 @@ DATABASE_ROUTERS = (
 
 MIDDLEWARE = [
     'apps.common.middleware.TimingMiddleware',
-    'django_tenants.middleware.main.TenantMainMiddleware', 
+    'apps.tenants.middleware.TenantMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.common.middleware.RateLimitMiddleware',
     'allauth.account.middleware.AccountMiddleware', 
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
@@ -25,5 +25,6 @@ urlpatterns = [
     path('', include(('apps.dashboard.urls', 'dashboard'), namespace='dashboard')),
     path('billing/', include('apps.billing.urls')),
     path('tenants/', include('apps.tenants.urls')),
+    path('api/', include('apps.common.api_urls')),
     path('', include('apps.common.urls')),
 ]
@@ -0,0 +1,85 @@
+"""
+Benchmark for the cached dashboard widget payload.
+
+Renders dashboard_view (the heaviest locust task) against a throwaway test
+database, once with the cache cleared before every render (cold) and once
+with the widget payload cached (warm), and reports render time and query
+count per request for both. Needs a reachable PostgreSQL (DB_* env vars).
+
+Usage: python devops/benchmarks/bench_dashboard.py [--requests 200] [--payments 5000] [--keepdb]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--payments', type=int, default=5000)
+    parser.add_argument('--keepdb', action='store_true')
+    args = parser.parse_args()
+
+    project_root = Path(__file__).resolve().parents[2]
+    sys.path.insert(0, str(project_root))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+    import django
+    django.setup()
+
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test import RequestFactory
+    from django.test.utils import CaptureQueriesContext, setup_test_environment
+    from apps.billing.models import Payment
+    from apps.common import counting, versioning
+    from apps.dashboard.views import dashboard_view
+    from apps.users.models import User
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, keepdb=args.keepdb)
+    try:
+        user = User.objects.filter(email='bench@example.com').first()
+        if user is None:
+            # The post_save signal gives the user an active trial subscription
+            user = User.objects.create_user(email='bench@example.com', password='bench1234')
+            Payment.objects.bulk_create([
+                Payment(user=user, amount=(i % 100) + 1) for i in range(args.payments)
+            ])
+            counting.add(Payment, args.payments)
+            versioning.bump('payments')
+
+        request = RequestFactory().get('/')
+        request.user = user
+
+        def run(clear_cache):
+            elapsed, queries = 0.0, 0
+            for _ in range(args.requests):
+                if clear_cache:
+                    cache.clear()
+                with CaptureQueriesContext(connection) as ctx:
+                    start = time.perf_counter()
+                    response = dashboard_view(request)
+                    elapsed += time.perf_counter() - start
+                assert response.status_code == 200, response.status_code
+                queries += len(ctx.captured_queries)
+            return elapsed / args.requests * 1000, queries / args.requests
+
+        cold_ms, cold_queries = run(clear_cache=True)
+        dashboard_view(request)  # prime the payload
+        warm_ms, warm_queries = run(clear_cache=False)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=args.keepdb)
+
+    print(f'requests:  {args.requests} ({args.payments} payments)')
+    print(f'cold:      {cold_ms:8.2f} ms/render  {cold_queries:5.1f} queries/render')
+    print(f'warm:      {warm_ms:8.2f} ms/render  {warm_queries:5.1f} queries/render')
+    print(f'reduction: {(1 - warm_ms / cold_ms) * 100:7.1f}% time  {cold_queries - warm_queries:5.1f} queries')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
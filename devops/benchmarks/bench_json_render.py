@@ -0,0 +1,82 @@
+"""
+Microbenchmark for the fast JSON rendering path.
+
+Serializes and renders the payloads of status_api, tenant_info_api and
+metrics_api (plus a 100-row list) two ways: DRF serializer fields with
+JSONRenderer, and FastReadMixin.fast() with ORJSONRenderer, then reports
+throughput of each and the speedup. No database is needed.
+
+Usage: python devops/benchmarks/bench_json_render.py [--iterations 20000] [--min-speedup 1.0]
+"""
+
+import argparse
+import os
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument('--min-speedup', type=float, default=1.0)
+    args = parser.parse_args()
+
+    project_root = Path(__file__).resolve().parents[2]
+    sys.path.insert(0, str(project_root))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+    import django
+    django.setup()
+
+    from django.utils import timezone
+    from rest_framework.renderers import JSONRenderer
+    from apps.common.renderers import ORJSONRenderer
+    from apps.common.serializers import MetricsSerializer, TenantInfoSerializer
+
+    now = timezone.now()
+    tenant = {
+        'schema_name': 'acme', 'name': 'Acme Corp', 'is_active': True, 'on_trial': False,
+        'paid_until': now.date(), 'created_on': now.date(), 'domain_count': 2, 'user_count': 1375,
+    }
+    metrics = [
+        {'metric_name': name, 'metric_value': value, 'metric_unit': 'count',
+         'timestamp': now, 'tags': {'category': 'billing'}}
+        for name, value in (('total_users', 1375), ('active_subscriptions', 912),
+                            ('total_tenants', 88), ('monthly_revenue', Decimal('48210.50')))
+    ]
+    status = {'status': 'OK', 'timestamp': now.isoformat(), 'version': '1.0.0'}
+
+    slow, fast = JSONRenderer(), ORJSONRenderer()
+    cases = [
+        ('status', lambda: slow.render(status), lambda: fast.render(status)),
+        ('tenant_info', lambda: slow.render(TenantInfoSerializer(tenant).data),
+         lambda: fast.render(TenantInfoSerializer.fast(tenant))),
+        ('metrics', lambda: slow.render({'metrics': MetricsSerializer(metrics, many=True).data, 'generated_at': now}),
+         lambda: fast.render({'metrics': MetricsSerializer.fast(metrics, many=True), 'generated_at': now})),
+        ('metrics x25 (100 rows)', lambda: slow.render(MetricsSerializer(metrics * 25, many=True).data),
+         lambda: fast.render(MetricsSerializer.fast(metrics * 25, many=True))),
+    ]
+
+    def run(func, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        return iterations / (time.perf_counter() - start)
+
+    worst = float('inf')
+    print(f'{"payload":<24}{"drf ops/s":>12}{"fast ops/s":>12}{"speedup":>10}')
+    for name, baseline, candidate in cases:
+        # Fewer iterations for the large payload keep the run short
+        iterations = args.iterations // 25 if 'rows' in name else args.iterations
+        baseline_ops = run(baseline, iterations)
+        candidate_ops = run(candidate, iterations)
+        speedup = candidate_ops / baseline_ops
+        worst = min(worst, speedup)
+        print(f'{name:<24}{baseline_ops:>12.0f}{candidate_ops:>12.0f}{speedup:>9.1f}x')
+    return 0 if worst >= args.min_speedup else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Microbenchmark for RateLimitMiddleware overhead.
+
+Runs a no-op view through the middleware with and without rate limiting and
+reports the added cost per request. Uses whatever cache CACHES points at
+(locmem by default, Redis when REDIS_URL is set). No database is needed once
+the tenant policy is memoized.
+
+Usage: python devops/benchmarks/bench_ratelimit.py [--requests 20000] [--max-overhead-us 50]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--max-overhead-us', type=float, default=50.0)
+    args = parser.parse_args()
+
+    project_root = Path(__file__).resolve().parents[2]
+    sys.path.insert(0, str(project_root))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+    import django
+    django.setup()
+
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+    from django.test.utils import override_settings
+    from apps.common import ratelimit
+    from apps.common.middleware import RateLimitMiddleware
+
+    def view(request):
+        return HttpResponse('ok')
+
+    tenant = SimpleNamespace(schema_name='bench', plan_id=None)
+    request = RequestFactory().get('/')
+    request.tenant = tenant
+
+    # Memoize a limit high enough that the benchmark never gets throttled
+    ratelimit._policies[tenant.schema_name] = (float('inf'), (10 ** 9, 10 ** 9))
+
+    def run(handler):
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            handler(request)
+        return (time.perf_counter() - start) / args.requests * 1e6
+
+    with override_settings(RATE_LIMIT_ENABLED=False):
+        baseline = run(RateLimitMiddleware(view))
+    limited = run(RateLimitMiddleware(view))
+    overhead = limited - baseline
+
+    print(f'requests:      {args.requests}')
+    print(f'baseline:      {baseline:8.2f} us/request')
+    print(f'rate limited:  {limited:8.2f} us/request')
+    print(f'overhead:      {overhead:8.2f} us/request (budget {args.max_overhead_us} us)')
+    return 0 if overhead <= args.max_overhead_us else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
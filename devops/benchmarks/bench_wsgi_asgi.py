@@ -0,0 +1,108 @@
+"""
+WSGI vs. ASGI throughput under the locust AsyncApiUser profile.
+
+Starts the app twice on the same port with the same worker count, first
+as gunicorn sync workers (config.wsgi), then as gunicorn uvicorn workers
+(config.asgi), drives each with a headless locust run of AsyncApiUser
+(api/status, api/health, api/cache/stats) and reports requests/s, median
+and p95 latency and failures. Under WSGI a slow health or cache check
+holds a worker for its whole duration; under ASGI the async views yield
+the event loop while they wait.
+
+Needs gunicorn, uvicorn and locust installed, a migrated database and
+cache, a tenant domain matching --host and a staff user for
+LOCUST_EMAIL / LOCUST_PASSWORD.
+
+Usage: python devops/benchmarks/bench_wsgi_asgi.py [--host http://localhost:8000] [--workers 2]
+           [--users 100] [--run-time 60s] [--min-speedup 1.0]
+"""
+
+import argparse
+import csv
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from urllib.parse import urlparse
+
+
+SERVERS = {
+    'wsgi': ['config.wsgi:application'],
+    'asgi': ['config.asgi:application', '--worker-class', 'uvicorn.workers.UvicornWorker'],
+}
+
+
+def wait_until_up(url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1)
+            return True
+        except urllib.error.HTTPError:
+            return True  # Up, even if the host is not a tenant
+        except OSError:
+            time.sleep(0.5)
+    return False
+
+
+def run_profile(name, args, project_root, locustfile, workdir):
+    port = urlparse(args.host).port or 80
+    server = subprocess.Popen(
+        ['gunicorn', *SERVERS[name], '--bind', f'0.0.0.0:{port}', '--workers', str(args.workers),
+         '--log-level', 'warning'],
+        cwd=project_root, stdout=subprocess.DEVNULL,
+    )
+    try:
+        if not wait_until_up(f'{args.host}/api/status/'):
+            raise RuntimeError(f'{name} server did not come up on {args.host}')
+        prefix = os.path.join(workdir, name)
+        subprocess.run(
+            ['locust', '-f', str(locustfile), 'AsyncApiUser', '--headless', '-u', str(args.users),
+             '-r', str(args.users), '-t', args.run_time, '--host', args.host, '--csv', prefix,
+             '--only-summary'],
+            cwd=project_root, check=True, stdout=subprocess.DEVNULL,
+        )
+        with open(f'{prefix}_stats.csv', newline='') as f:
+            row = next(r for r in csv.DictReader(f) if r['Name'] == 'Aggregated')
+        return {
+            'rps': float(row['Requests/s']),
+            'p50': float(row['50%']),
+            'p95': float(row['95%']),
+            'failures': int(row['Failure Count']),
+        }
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='http://localhost:8000')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--run-time', default='60s')
+    parser.add_argument('--min-speedup', type=float, default=1.0)
+    args = parser.parse_args()
+
+    project_root = Path(__file__).resolve().parents[2]
+    locustfile = project_root / 'devops' / 'loadtest' / 'locustfile.py'
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in SERVERS:
+            results[name] = run_profile(name, args, project_root, locustfile, workdir)
+
+    print(f'{"server":<8}{"req/s":>10}{"p50 ms":>10}{"p95 ms":>10}{"failures":>10}')
+    for name, r in results.items():
+        print(f'{name:<8}{r["rps"]:>10.1f}{r["p50"]:>10.0f}{r["p95"]:>10.0f}{r["failures"]:>10}')
+    speedup = results['asgi']['rps'] / results['wsgi']['rps'] if results['wsgi']['rps'] else float('inf')
+    print(f'asgi/wsgi throughput: {speedup:.2f}x')
+    return 0 if speedup >= args.min_speedup else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
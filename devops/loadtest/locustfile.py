@@ -1,4 +1,5 @@
 from locust import HttpUser, task, between
+import os
 import random
 import string
 
@@ -123,6 +124,37 @@ class ApiUser(HttpUser):
         self.client.get("/", name="Dashboard AJAX")
 
 
+class AsyncApiUser(HttpUser):
+    """I/O-bound API calls served by the native async views (api/status, api/health, api/cache/stats).
+
+    Authenticates with a JWT for LOCUST_EMAIL / LOCUST_PASSWORD (a staff user,
+    for cache stats). Used by devops/benchmarks/bench_wsgi_asgi.py; enable
+    manually.
+    """
+    wait_time = between(0.05, 0.2)
+    weight = 0  # Disabled by default, enable manually
+
+    def on_start(self):
+        response = self.client.post("/api/token/", json={
+            "email": os.environ.get("LOCUST_EMAIL", "admin@example.com"),
+            "password": os.environ.get("LOCUST_PASSWORD", "admin"),
+        })
+        token = response.json().get("access", "") if response.status_code == 200 else ""
+        self.client.headers["Authorization"] = f"Bearer {token}"
+
+    @task(5)
+    def status(self):
+        self.client.get("/api/status/")
+
+    @task(3)
+    def health(self):
+        self.client.get("/api/health/")
+
+    @task(1)
+    def cache_stats(self):
+        self.client.get("/api/cache/stats/")
+
+
 # Custom load test scenarios
 class BurstTraffic(HttpUser):
     """Simulates sudden traffic spikes"""